@@ -8,14 +8,15 @@ to the target). Today the only implementation is Android over adb
 
 Public surface::
 
-    from framework import resolve_devices, keys
+    from framework import resolve_devices, keys, Macro
     for device in resolve_devices(spec, use_all):
         device.navigate("example.com")
         device.key(keys.DPAD_DOWN)
+        device.play(Macro().key(keys.DPAD_DOWN, repeat=20, interval=0.03))
 
-Runner/session configuration (restart-between-tests, tab hygiene) is exposed here
-as thin functions so the runner has one import; they currently delegate to the
-adb layer's process-wide state.
+Runner/session configuration (restart-between-tests, tab hygiene, the screen
+store) is exposed here as thin functions so the runner has one import; they
+delegate to the adb layer's and framework.screens' process-wide state.
 """
 from __future__ import annotations
 
@@ -25,15 +26,17 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 import adb
 
-from . import keys
+from . import keys, screens
 from .android import AndroidDevice
 from .device import Device, Node
+from .macro import Macro
 from .transport import AdbTransport, Transport
 
 __all__ = [
     "keys",
     "Device",
     "Node",
+    "Macro",
     "AndroidDevice",
     "Transport",
     "AdbTransport",
@@ -43,6 +46,10 @@ __all__ = [
     "reset_tab_counter",
     "tabs_opened",
     "keep_tabs",
+    "set_screen_store",
+    "begin_test",
+    "screen_checks",
+    "prune_screens",
     "ORIENTATIONS",
 ]
 
@@ -87,3 +94,23 @@ def tabs_opened() -> int:
 def keep_tabs() -> bool:
     """Whether the runner should leave test-created tabs open."""
     return adb.KEEP_TABS
+
+
+def set_screen_store(root: str | None = None, update: bool = False) -> None:
+    """Point Device.assert_screen at a screen store; ``update`` rewrites the baselines."""
+    screens.configure(root or screens.DEFAULT_ROOT, update)
+
+
+def begin_test(name: str) -> None:
+    """Name the running test, which keys the screen baselines (called by the runner)."""
+    screens.begin_test(name)
+
+
+def screen_checks() -> list[dict]:
+    """The screen checks the current test made, for its results record."""
+    return screens.checks()
+
+
+def prune_screens() -> int:
+    """Drop stored screens no baseline references (called by the runner after a run)."""
+    return screens.prune()
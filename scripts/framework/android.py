@@ -13,13 +13,17 @@ the base ``Device``.
 """
 from __future__ import annotations
 
+import contextlib
 import os
 import sys
+import time
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 import adb
 
 from .device import Device, Node
+from .macro import Macro
+from .prefs import SharedPrefs
 from .transport import AdbTransport
 
 
@@ -39,6 +43,9 @@ class AndroidDevice(Device):
     def package(self) -> str:
         return self._package
 
+    def app_fingerprint(self) -> str | None:
+        return adb.installed_apk_sha256(self.serial, self._package)
+
     @property
     def platform(self) -> str:
         return "android"
@@ -60,6 +67,10 @@ class AndroidDevice(Device):
     def key(self, code: int, wait: float = 0.5) -> None:
         adb.key(self.serial, code, wait)
 
+    def key_sequence(self, codes: list[int], repeat: int = 1, inter_key_ms: int = 0,
+                     wait: float = 0.5) -> None:
+        adb.key_sequence(self.serial, codes, repeat, inter_key_ms, wait)
+
     def key_longpress(self, code: int, wait: float = 0.8) -> None:
         adb.key_longpress(self.serial, code, wait)
 
@@ -72,6 +83,11 @@ class AndroidDevice(Device):
     def ctrl_tab(self, wait: float = 0.9) -> None:
         adb.ctrl_tab(self.serial, wait)
 
+    def play(self, macro: Macro, wait: float = 0.3) -> None:
+        script = adb.input_script(self.serial, macro.steps)
+        adb.play_script(self.serial, script)
+        time.sleep(wait)
+
     def tap(self, x: int, y: int, wait: float = 0.7) -> None:
         adb.tap(self.serial, x, y, wait)
 
@@ -171,9 +187,51 @@ class AndroidDevice(Device):
     def screen_size(self) -> tuple[int, int]:
         return adb.screen_size(self.serial)
 
+    def density(self) -> int:
+        return adb.wm_density(self.serial)
+
     def screenshot(self, path: str) -> None:
         adb.screenshot(self.serial, path)
 
+    def frame(self, roi: tuple[int, int, int, int] | None = None, step: int = 1):
+        """Raw ``screencap`` pixels wrapped as a :class:`~framework.vision.Frame`."""
+        from .vision import Frame  # NumPy only when frames are grabbed
+        raw = adb.screencap_raw(self.serial)
+        return Frame.from_raw(raw, roi, step) if raw else None
+
+    def frame_stream(self, roi: tuple[int, int, int, int] | None = None, step: int = 1,
+                     maxlen: int = 16):
+        """A device-side ``screencap`` loop on one exec-out pipe, decoded into Frames."""
+        from .stream import FrameStream
+        from .vision import Frame
+        header_size = adb.screencap_header_size(self.serial)
+        proc = adb.screencap_stream(self.serial)
+
+        def read():
+            raw = adb.read_raw_frame(proc.stdout, header_size)
+            return Frame.from_raw(raw, roi, step) if raw else None
+
+        def close():
+            proc.kill()
+            proc.wait()
+
+        return FrameStream(read, close, maxlen)
+
+    # --- performance -------------------------------------------------------
+
+    @contextlib.contextmanager
+    def frame_stats(self, budget_ms: float | None = None):
+        """``dumpsys gfxinfo`` reset before the block, ``framestats`` parsed after it.
+
+        Only the last ~120 frames keep per-frame timestamps, so wrap the burst of
+        interest rather than a whole test.
+        """
+        from .frames import FrameStats  # NumPy only when frame timing is used
+        stats = FrameStats()
+        adb.gfxinfo_reset(self.serial, self._package)
+        yield stats
+        stats.load(adb.gfxinfo_framestats(self.serial, self._package), budget_ms)
+
     # --- orientation -------------------------------------------------------
 
     def orientation_state(self):
@@ -194,23 +252,97 @@ class AndroidDevice(Device):
     def reverse_remove(self, remote_port: int) -> None:
         self.transport.reverse_remove(remote_port)
 
+    def view_present(self, view_id: str) -> bool:
+        """Fast (``dumpsys activity top``) check for a view id in the top activity."""
+        return adb.view_present(self.serial, view_id)
+
+    def logcat(self, grep: str, clear: bool = False) -> str:
+        """Device log lines containing ``grep`` (optionally clearing the log first)."""
+        return adb.logcat(self.serial, grep, clear)
+
+    def logcat_window(self, seconds: float) -> str:
+        """The whole device log of the last ``seconds``."""
+        return adb.logcat_window(self.serial, seconds)
+
+    def flight_start(self, segment_s: int, keep: int) -> None:
+        """Start the rolling screenrecord loop (see framework/flight.py)."""
+        adb.flight_start(self.serial, segment_s, keep)
+
+    def flight_stop(self) -> None:
+        adb.flight_stop(self.serial)
+
+    def flight_pull(self, dest_dir: str) -> list[str]:
+        return adb.flight_pull(self.serial, dest_dir)
+
+    def flight_clear(self) -> None:
+        adb.flight_clear(self.serial)
+
+    def trace_mode(self, wanted: str = "atrace") -> str:
+        """The capture mode this device supports (perfetto needs Android 9)."""
+        return adb.trace_mode(self.serial, wanted)
+
+    def trace_start(self, mode: str = "atrace", categories: tuple[str, ...] | None = None) -> None:
+        """Start an atrace / perfetto capture of the app and ``categories`` (see framework/trace.py)."""
+        adb.trace_start(self.serial, self._package, mode, categories or adb.TRACE_CATEGORIES)
+
+    def trace_stop(self, mode: str, dest: str) -> str | None:
+        return adb.trace_stop(self.serial, mode, dest)
+
+    def trace_cancel(self, mode: str) -> None:
+        adb.trace_cancel(self.serial, mode)
+
+    def app_pids(self) -> list[int]:
+        return adb.app_pids(self.serial, self._package)
+
+    def meminfo(self) -> dict[str, int]:
+        """The app's memory summary in kB (``pss_kb``, ``java_heap_kb``, …); see adb.meminfo."""
+        return adb.meminfo(self.serial, self._package)
+
+    def webview_pss(self) -> int:
+        """Total PSS (kB) of the WebView renderer processes."""
+        return adb.webview_pss(self.serial)
+
+    def meminfo_checkin(self) -> dict[str, int]:
+        """Heap allocations and PSS in kB from ``dumpsys meminfo --checkin``; see adb.meminfo_checkin."""
+        return adb.meminfo_checkin(self.serial, self._package)
+
+    def trim_memory(self, level: str = "COMPLETE") -> None:
+        """Send onTrimMemory and force a GC in the app (before a memory reading)."""
+        adb.trim_memory(self.serial, self._package, level)
+
+    def proc_sample(self, with_meminfo: bool = False) -> dict:
+        """One sample of the app's CPU time, RSS and threads (and meminfo); see framework/sampler.py."""
+        return adb.proc_sample(self.serial, self._package, with_meminfo)
+
     def read_prefs(self, rel_path: str) -> str:
         """Read a file from the app sandbox via ``run-as`` (e.g. a shared-prefs XML)."""
-        return self.transport.shell(["shell", "run-as", self._package, "cat", rel_path])
+        return adb.read_app_file(self.serial, self._package, rel_path)
 
     def write_prefs(self, rel_path: str, content: str) -> None:
-        """Write ``content`` into the app sandbox at ``rel_path`` via a pushed temp file."""
-        import subprocess
-        import tempfile
-        fd, local = tempfile.mkstemp(suffix=".xml")
-        try:
-            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
-                f.write(content)
-            dev_tmp = "/data/local/tmp/fw_prefs.xml"
-            subprocess.run(["adb", "-s", self.serial, "push", local, dev_tmp], capture_output=True)
-            subprocess.run(
-                ["adb", "-s", self.serial, "shell", "run-as", self._package, "cp", dev_tmp, rel_path],
-                capture_output=True,
-            )
-        finally:
-            os.remove(local)
+        """Write ``content`` into the app sandbox at ``rel_path`` (one streamed ``run-as`` write)."""
+        if not adb.write_app_file(self.serial, self._package, rel_path, content):
+            raise RuntimeError(f"could not write {rel_path} on {self.serial}")
+
+    def list_app_files(self, rel_dir: str) -> list[str]:
+        return adb.list_app_files(self.serial, self._package, rel_dir)
+
+    def read_app_bytes(self, rel_path: str) -> bytes | None:
+        """A binary file of the app sandbox (e.g. a saved session), None if unreadable."""
+        return adb.read_app_bytes(self.serial, self._package, rel_path)
+
+    def write_app_bytes(self, rel_path: str, data: bytes) -> None:
+        if not adb.write_app_bytes(self.serial, self._package, rel_path, data):
+            raise RuntimeError(f"could not write {rel_path} on {self.serial}")
+
+    def cold_start(self) -> float:
+        """Clear the log and start the stopped app; the device clock at the start (see adb.cold_start)."""
+        return adb.cold_start(self.serial, self._package)
+
+    def logcat_epoch(self, grep: str) -> list[tuple[float, str]]:
+        """Log lines containing ``grep`` with their device-clock epoch times."""
+        return adb.logcat_epoch(self.serial, grep)
+
+    def prefs(self, name: str | None = None, restore: bool = False) -> SharedPrefs:
+        """A :class:`~framework.prefs.SharedPrefs` transaction on ``shared_prefs/<name>.xml``
+        (default: the app's default prefs file, ``<package>_preferences``)."""
+        return SharedPrefs(self, f"shared_prefs/{name or self._package + '_preferences'}.xml", restore)
@@ -0,0 +1,261 @@
+"""Record real websites into an on-disk archive and replay them from the host.
+
+The field test (tests/toolbar_field_test.py) loads bbc.com, wikipedia.org and
+youtube.com: live pages change every run, can take minutes on the TV and need
+the internet. A :class:`WebArchive` puts those sites behind the host server
+(framework/server.py) under ``/web/<scheme>/<host>/<path>``::
+
+    srv = server.acquire(device)
+    web = archive.install(srv, "record", root)        # or "replay"
+    device.navigate(web.url("https://www.bbc.com/"))  # http://localhost:8899/web/https/www.bbc.com/
+    ...
+    web.save()
+
+In ``record`` mode each request is fetched from the real site and stored; in
+``replay`` mode it is answered from the archive only, so the run is the same
+every time and works offline. Absolute links in HTML, CSS, JavaScript and JSON
+(``https://host/...``, ``//host/...`` and the JSON-escaped ``https:\\/\\/host``)
+are rewritten to ``/web/...`` as they are served, so the page's sub-resources
+come through the archive too; root-relative requests (``/static/app.js``) are
+mapped back to the site of the page that asked for them (its ``Referer``).
+
+This is a rewriting reverse proxy rather than a device-wide HTTP proxy on
+purpose: the sites are HTTPS-only, and a proxy could not read (let alone store)
+their traffic without installing a man-in-the-middle CA on every device. What
+it cannot see is a URL built at run time from pieces; such requests miss the
+archive and show up as 404s in replay.
+
+With ``preserve_timing`` a replayed response waits for the recorded time to
+first byte and is sent at the recorded transfer rate, so slow pages stay slow.
+The archive is ``index.json`` (request -> status, headers, timing, body hash)
+plus the bodies under ``bodies/``, stored as received (rewriting is done when
+serving). Standard library only.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from framework import server
+
+MODES = ("record", "replay")
+PREFIX = "/web/"
+UPSTREAM_TIMEOUT = 60.0
+
+# Sent upstream as the device sent them; everything else (cookies of localhost,
+# our Accept-Encoding) is the device's business, not the site's.
+_FORWARD = ("user-agent", "accept", "accept-language", "content-type")
+# Not replayed: they would block the proxied page (CSP, HSTS, frame options) or
+# describe the upstream encoding rather than the body we send.
+_DROP = {"content-security-policy", "content-security-policy-report-only", "strict-transport-security",
+         "x-frame-options", "content-length", "transfer-encoding", "content-encoding", "connection",
+         "keep-alive", "alt-svc", "set-cookie"}
+_REWRITE_TYPES = ("html", "css", "javascript", "json", "xml")
+
+_ABSOLUTE = re.compile(rb"\b(https?):(\\?/)\\?/([A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+)")
+_PROTOCOL_RELATIVE = re.compile(rb"""(["'(=]\s*)//([A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+)""")
+_LOCAL = {b"localhost", b"127.0.0.1"}
+# Hosts that appear as identifiers, not links: XML namespace URIs (SVG's
+# createElementNS / xmlns, XLink, Adobe and Dublin Core metadata in .svg files).
+# A rewritten namespace is a different namespace, and the element stops rendering.
+_NAMESPACE = {b"www.w3.org", b"ns.adobe.com", b"purl.org"}
+_KEEP = _LOCAL | _NAMESPACE
+
+
+def rewrite(body: bytes) -> bytes:
+    """``body`` with every absolute link to a site pointed at ``/web/<scheme>/<host>``.
+
+    Local and namespace hosts (:data:`_NAMESPACE`) are left as they are::
+
+        >>> rewrite(b'<img src="https://upload.wikimedia.org/a.png">')
+        b'<img src="/web/https/upload.wikimedia.org/a.png">'
+        >>> rewrite(b'createElementNS("http://www.w3.org/2000/svg", "path")')
+        b'createElementNS("http://www.w3.org/2000/svg", "path")'
+    """
+    def absolute(m: re.Match) -> bytes:
+        if m.group(3) in _KEEP:
+            return m.group(0)
+        slash = m.group(2)   # "/" or the JSON-escaped "\/"
+        return slash + slash.join((b"web", m.group(1), m.group(3)))
+
+    def protocol_relative(m: re.Match) -> bytes:
+        if m.group(2) in _KEEP:
+            return m.group(0)
+        return m.group(1) + b"/web/https/" + m.group(2)
+
+    return _PROTOCOL_RELATIVE.sub(protocol_relative, _ABSOLUTE.sub(absolute, body))
+
+
+def upstream_url(path: str, raw_query: str = "") -> str | None:
+    """The real URL behind a ``/web/<scheme>/<host>/<path>`` request, or None."""
+    if not path.startswith(PREFIX):
+        return None
+    scheme, _, rest = path[len(PREFIX):].partition("/")
+    host, _, rest = rest.partition("/")
+    if scheme not in ("http", "https") or not host:
+        return None
+    return f"{scheme}://{host}/{rest}" + (f"?{raw_query}" if raw_query else "")
+
+
+def proxied_path(url: str) -> str:
+    """The ``/web/...`` path (with query) that proxies ``url``."""
+    split = urllib.parse.urlsplit(url)
+    return f"{PREFIX}{split.scheme}/{split.netloc}{split.path or '/'}" + (f"?{split.query}" if split.query else "")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Redirects are recorded as they are (rewritten Location) and followed by the WebView.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+class WebArchive:
+    """Requests under ``/web/`` recorded to / replayed from the directory ``root``."""
+
+    def __init__(self, root: str, mode: str = "replay", preserve_timing: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"unknown archive mode '{mode}' (known: {', '.join(MODES)})")
+        self.root = root
+        self.mode = mode
+        self.preserve_timing = preserve_timing
+        self.entries: dict[str, dict] = {}   # "GET https://..." -> status, headers, body, timing
+        self.misses: list[str] = []          # replay requests not in the archive
+        self._by_path: dict[str, str] = {}   # "GET https://host/path" (no query) -> key
+        self._lock = threading.Lock()
+        self._last_site = ""                 # "https/www.bbc.com" of the last page served
+        self.srv: server.AssetServer | None = None   # set by install()
+        path = os.path.join(root, "index.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                for key, entry in json.load(fh).items():
+                    self._add(key, entry)
+
+    def _add(self, key: str, entry: dict) -> None:
+        self.entries[key] = entry
+        self._by_path.setdefault(key.split("?", 1)[0], key)
+
+    def _body_path(self, sha: str) -> str:
+        return os.path.join(self.root, "bodies", sha)
+
+    def url(self, real_url: str) -> str:
+        """The device-side URL that loads ``real_url`` through the archive."""
+        return self.srv.url(proxied_path(real_url), bust=False)
+
+    # --- serving ---
+
+    def handle(self, request: server.Request) -> server.Response | None:
+        """Route handler for ``/web/*``."""
+        url = upstream_url(request.path, request.raw_query)
+        if url is None:
+            return server.Response(b"bad /web/ path", status=400, content_type="text/plain")
+        key = f"{request.method} {url}"
+        if self.mode == "record":
+            entry, body = self._fetch(request, url)
+            with self._lock:
+                self._add(key, entry)
+        else:
+            entry = self.entries.get(key) or self.entries.get(self._by_path.get(key.split("?", 1)[0], ""))
+            if entry is None:
+                self.misses.append(key)
+                return server.Response(b"not in the archive", status=404, content_type="text/plain")
+            with open(self._body_path(entry["sha"]), "rb") as fh:
+                body = fh.read()
+        return self._response(request, entry, body)
+
+    def handle_root(self, request: server.Request) -> server.Response | None:
+        """Route handler for everything else: a root-relative URL of an archived page
+        (``/static/app.js``) is redirected to its ``/web/`` path; anything else is declined."""
+        referer = urllib.parse.urlsplit(request.headers.get("referer", "")).path
+        site = "/".join(referer[len(PREFIX):].split("/", 2)[:2]) if referer.startswith(PREFIX) else ""
+        if not site and self._last_site and not os.path.isfile(
+                os.path.join(server.ASSETS_DIR, request.path.lstrip("/"))):
+            site = self._last_site   # a page sending no (or an origin-only) Referer
+        if not site or request.path == "/beacon":
+            return None
+        target = f"{PREFIX}{site}{request.path}" + (f"?{request.raw_query}" if request.raw_query else "")
+        return server.Response(b"", status=307, headers={"Location": target})
+
+    def _response(self, request: server.Request, entry: dict, body: bytes) -> server.Response:
+        headers = {}
+        ctype = None
+        for name, value in entry["headers"]:
+            lower = name.lower()
+            if lower in _DROP:
+                continue
+            if lower == "content-type":
+                ctype = value
+            elif lower == "location":
+                headers[name] = rewrite(value.encode("latin-1")).decode("latin-1")
+            else:
+                headers[name] = value
+        if ctype and any(t in ctype for t in _REWRITE_TYPES):
+            body = rewrite(body)
+        if ctype and "html" in ctype:
+            parts = upstream_url(request.path).split("/", 3)
+            self._last_site = f"{parts[0].rstrip(':')}/{parts[2]}"
+        rate = None
+        if self.mode == "replay" and self.preserve_timing:
+            time.sleep(entry.get("ttfb_s", 0.0))
+            transfer = entry.get("duration_s", 0.0) - entry.get("ttfb_s", 0.0)
+            if transfer > 0 and body:
+                rate = max(1, int(len(body) / transfer))
+        return server.Response(body, status=entry["status"], content_type=ctype,
+                               headers=headers, rate_bps=rate)
+
+    # --- recording ---
+
+    def _fetch(self, request: server.Request, url: str) -> tuple[dict, bytes]:
+        headers = {k: v for k, v in request.headers.items() if k in _FORWARD}
+        upstream = urllib.request.Request(url, data=request.body or None, headers=headers, method=request.method)
+        t0 = time.monotonic()
+        try:
+            resp = _opener.open(upstream, timeout=UPSTREAM_TIMEOUT)
+        except urllib.error.HTTPError as e:   # 3xx/4xx/5xx: recorded like any response
+            resp = e
+        except (urllib.error.URLError, OSError) as e:
+            raise RuntimeError(f"fetching {url}: {e}") from e
+        ttfb = time.monotonic() - t0
+        body = resp.read()
+        duration = time.monotonic() - t0
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._body_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(body)
+        entry = {"status": resp.status, "headers": list(resp.headers.items()), "sha": sha, "bytes": len(body),
+                 "ttfb_s": round(ttfb, 3), "duration_s": round(duration, 3)}
+        return entry, body
+
+    def save(self) -> str:
+        """Write the index (record mode; replay leaves the archive alone) and return its path."""
+        path = os.path.join(self.root, "index.json")
+        if self.mode != "record":
+            return path
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self.entries, indent=1, sort_keys=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as fh:
+            fh.write(data)
+        os.replace(path + ".tmp", path)
+        return path
+
+
+def install(srv: server.AssetServer, mode: str, root: str, preserve_timing: bool = False) -> WebArchive:
+    """Put a :class:`WebArchive` of ``root`` on ``srv`` and return it."""
+    srv.require_local("the archive routes")
+    web = WebArchive(root, mode, preserve_timing)
+    web.srv = srv
+    srv.route("*", web.handle_root)
+    srv.route(PREFIX + "*", web.handle, cache="no-store")
+    return web
@@ -13,15 +13,25 @@ for the UI-node shape returned by :meth:`Device.nodes` / :meth:`Device.find_node
 from __future__ import annotations
 
 import abc
+import contextlib
 import os
 import re
 import sys
+import time
+from typing import TYPE_CHECKING
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 from adb import Node  # noqa: F401  (re-exported as framework.device.Node)
 
+from . import keys
+from .macro import Macro
 from .transport import Transport
 
+if TYPE_CHECKING:
+    from .frames import FrameStats
+    from .stream import FrameStream
+    from .vision import Frame
+
 
 class Device(abc.ABC):
     """A target under test, addressed through a platform-neutral API.
@@ -51,6 +61,10 @@ class Device(abc.ABC):
     def package(self) -> str:
         """The app package / bundle id under test."""
 
+    @abc.abstractmethod
+    def app_fingerprint(self) -> str | None:
+        """SHA-256 of the installed app build (computed on the device), or None if unknown."""
+
     @property
     @abc.abstractmethod
     def platform(self) -> str:
@@ -78,6 +92,14 @@ class Device(abc.ABC):
     def key(self, code: int, wait: float = 0.5) -> None:
         """Send a single key (see :mod:`framework.keys`)."""
 
+    @abc.abstractmethod
+    def key_sequence(self, codes: list[int], repeat: int = 1, inter_key_ms: int = 0,
+                     wait: float = 0.5) -> None:
+        """Send ``codes`` in order (``repeat`` times over) as one batched call.
+
+        ``inter_key_ms`` spaces the presses on the device; 0 sends them back to back.
+        """
+
     @abc.abstractmethod
     def key_longpress(self, code: int, wait: float = 0.8) -> None:
         """Send a long-press key (sets the platform long-press flag)."""
@@ -94,6 +116,15 @@ class Device(abc.ABC):
     def ctrl_tab(self, wait: float = 0.9) -> None:
         """Switch to the next tab as a keyboard user would (CTRL+TAB)."""
 
+    @abc.abstractmethod
+    def play(self, macro: Macro, wait: float = 0.3) -> None:
+        """Play a recorded input :class:`~framework.macro.Macro` in one call.
+
+        The step timing is kept on the device, so a burst is both faster and
+        reproducible compared with a loop of :meth:`key` calls. Blocks until the
+        macro has finished, then waits ``wait`` seconds.
+        """
+
     @abc.abstractmethod
     def tap(self, x: int, y: int, wait: float = 0.7) -> None:
         """Tap absolute screen coordinates."""
@@ -163,6 +194,26 @@ class Device(abc.ABC):
     def note_tab_opened(self) -> None:
         """Record that the test opened a tab outside of navigate()."""
 
+    def tab_count(self) -> int:
+        """Number of open tabs, read from the tab switcher (0 if it could not be opened)."""
+        if not self.open_tab_switcher(wait=1.5):
+            return 0
+        time.sleep(1.0)
+        count = len(self.tab_entries())
+        self.key(keys.BACK, wait=0.8)
+        return count
+
+    def clean_tabs(self, attempts: int = 25) -> bool:
+        """Close every open tab (e.g. those restored from the previous session);
+        False if tabs were still open after ``attempts`` rounds."""
+        for _ in range(attempts):
+            count = self.tab_count()
+            if count == 0:
+                return True
+            self.close_tabs(count, wait=0.5)
+            time.sleep(1.0)
+        return False
+
     # --- UI state ----------------------------------------------------------
 
     @abc.abstractmethod
@@ -223,10 +274,72 @@ class Device(abc.ABC):
     def screen_size(self) -> tuple[int, int]:
         ...
 
+    @abc.abstractmethod
+    def density(self) -> int:
+        """Display density in dpi (160 = 1x)."""
+
     @abc.abstractmethod
     def screenshot(self, path: str) -> None:
         ...
 
+    @abc.abstractmethod
+    def frame(self, roi: tuple[int, int, int, int] | None = None, step: int = 1) -> Frame | None:
+        """Grab the screen as an array, without an image encode on either side.
+
+        ``roi`` is ``(x0, y0, x1, y1)`` in screen pixels and ``step`` subsamples;
+        :meth:`Frame.save <framework.vision.Frame.save>` writes a PNG when one is
+        wanted. None when the grab failed.
+        """
+
+    def assert_screen(self, name: str, mask=None, roi: tuple[int, int, int, int] | None = None,
+                      min_ssim: float | None = None) -> dict:
+        """Assert the screen (or ``roi`` of it) still looks like its baseline ``name``.
+
+        ``mask`` leaves dynamic regions out of the comparison: a list of
+        ``(x0, y0, x1, y1)`` screen rects, or a boolean array over the grabbed
+        region. The first check (or any under ``run.py --update-screens``) records
+        the baseline; see framework/screens.py. Returns the check's record.
+        """
+        from . import screens
+        return screens.check(self, name, mask, roi, min_ssim)
+
+    @abc.abstractmethod
+    def frame_stream(self, roi: tuple[int, int, int, int] | None = None, step: int = 1,
+                     maxlen: int = 16) -> FrameStream:
+        """Capture frames continuously on a background thread (see framework/stream.py).
+
+        Use as a context manager; ``roi`` and ``step`` apply to every frame.
+        """
+
+    # --- page events -------------------------------------------------------
+
+    def page_events(self, since: float = 0.0) -> list[dict]:
+        """Events the test pages reported to the host server's ``/beacon`` since ``since``.
+
+        Each is ``{"event", "data", "page", "page_ms", "t"}`` with ``t`` the host
+        ``time.time()`` of arrival, oldest first. Pages must be opened with a URL
+        from :meth:`AssetServer.url(..., device=self) <framework.server.AssetServer.url>`.
+        """
+        from . import server
+        return server.shared().events(self.id, since)
+
+    def wait_page_event(self, pattern: str = "*", timeout: float = 10.0, since: float = 0.0) -> dict | None:
+        """The first page event after ``since`` named like ``pattern`` (wildcards, e.g.
+        ``"seek@*"``), waiting up to ``timeout`` s for it; None if none arrived."""
+        from . import server
+        return server.shared().wait_event(self.id, pattern, timeout, since)
+
+    # --- performance -------------------------------------------------------
+
+    @abc.abstractmethod
+    def frame_stats(self, budget_ms: float | None = None) -> contextlib.AbstractContextManager[FrameStats]:
+        """Collect the app's frame timing around a ``with`` block.
+
+        Yields an empty :class:`~framework.frames.FrameStats` that is filled when
+        the block exits; ``budget_ms=None`` derives the frame budget from the
+        display's vsync period.
+        """
+
     # --- orientation -------------------------------------------------------
 
     @abc.abstractmethod
@@ -0,0 +1,71 @@
+"""Flight recorder: the last seconds of screen video and log, kept only on failure.
+
+Screenshots at every step are too slow on the TV, and a failed assertion on
+field text says nothing about what the screen did before it. The recorder runs
+``screenrecord`` on the device in short segments (a detached shell loop, so it
+costs the host nothing while tests pass) and keeps only the newest ones,
+``seconds`` of video in all. When a test fails, :meth:`FlightRecorder.save`
+stops the loop (finalising the current segment), pulls the segments plus the
+log of the same window next to the test's results, and starts recording again.
+
+    recorder = FlightRecorder(device, seconds=30)
+    recorder.start()
+    ...
+    if failed:
+        paths = recorder.save(results_store.artifact_dir(config, device.id, test_name))
+    recorder.stop()
+
+Only :class:`~framework.android.AndroidDevice` provides the ``flight_*`` hooks;
+the runner enables this with ``--flight-recorder SECONDS``.
+"""
+from __future__ import annotations
+
+import math
+import os
+import time
+
+DEFAULT_SECONDS = 30
+SEGMENT_S = 10
+
+
+class FlightRecorder:
+    """Rolling screen recording + log window of one device."""
+
+    def __init__(self, device, seconds: int = DEFAULT_SECONDS, segment_s: int = SEGMENT_S):
+        self.device = device
+        self.seconds = seconds
+        self.segment_s = min(segment_s, seconds)
+        # Finished segments to keep; the one recording when we stop covers the rest.
+        self.keep = max(1, math.ceil(seconds / self.segment_s))
+        self.running = False
+
+    def start(self) -> None:
+        # Marked first: a start that timed out may still have left the loop running.
+        self.running = True
+        self.device.flight_start(self.segment_s, self.keep)
+
+    def stop(self) -> None:
+        """Stop recording and delete whatever was recorded."""
+        if self.running:
+            self.device.flight_stop()
+            self.device.flight_clear()
+            self.running = False
+
+    def save(self, dest_dir: str) -> list[str]:
+        """Pull the recorded window and its log into ``dest_dir``; recording then resumes.
+
+        Returns the saved files (segments oldest first, then ``logcat.txt``).
+        """
+        if not self.running:
+            return []
+        # Read the log first: pulling the video can take longer than the window.
+        log = self.device.logcat_window(self.seconds + self.segment_s)
+        self.device.flight_stop()
+        paths = self.device.flight_pull(dest_dir)
+        log_path = os.path.join(dest_dir, "logcat.txt")
+        os.makedirs(dest_dir, exist_ok=True)
+        with open(log_path, "w", encoding="utf-8") as fh:
+            fh.write(log)
+        self.device.flight_start(self.segment_s, self.keep)
+        time.sleep(0.5)   # let the first segment start before the next test acts
+        return paths + [log_path]
@@ -0,0 +1,133 @@
+"""Frame timing (jank) statistics from the platform's per-frame timestamps.
+
+:meth:`Device.frame_stats` resets the app's frame statistics, runs a ``with``
+block and fills a :class:`FrameStats` from what was rendered meanwhile. On
+Android that is ``dumpsys gfxinfo <package> framestats``: one CSV row of
+nanosecond timestamps per frame, between ``---PROFILEDATA---`` markers (one
+block per window). A frame's duration is ``FrameCompleted - IntendedVsync`` (the
+time from the vsync it was meant for until it was handed to the display), and
+a frame is janky when that exceeds the frame budget (one vsync period).
+
+Parsing is vectorised with NumPy (the harness's vision dependency), imported
+lazily by the device so the rest of the framework stays standard-library only.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+
+_MARKER = "---PROFILEDATA---"
+
+# Vsync periods outside this window (ms) are not a display refresh (e.g. two
+# frames a few vsyncs apart); the budget then falls back to 60 Hz.
+_MIN_PERIOD_MS, _MAX_PERIOD_MS = 4.0, 50.0
+DEFAULT_BUDGET_MS = 1000.0 / 60.0
+
+
+def _blocks(text: str) -> list[list[str]]:
+    """The ``---PROFILEDATA---`` CSV blocks of a framestats dump, as lists of lines."""
+    parts = text.split(_MARKER)
+    # Markers come in pairs; the odd-numbered parts are the CSV blocks.
+    return [[l.strip() for l in p.strip().splitlines() if l.strip()] for p in parts[1::2]]
+
+
+def parse_framestats(text: str) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(intended_vsync_ns, duration_ms)`` for every valid frame in a dump.
+
+    Rows with non-zero ``Flags`` (frames the renderer itself marks as not
+    representative, e.g. the first frame of a window) are dropped, as are rows
+    with missing timestamps. Older platforms without a ``FrameCompleted`` column
+    use ``SwapBuffers`` as the end of the frame.
+    """
+    vsyncs, durations = [], []
+    for lines in _blocks(text):
+        if len(lines) < 2 or not lines[0].startswith("Flags"):
+            continue
+        header = lines[0].rstrip(",").split(",")
+        end_col = "FrameCompleted" if "FrameCompleted" in header else "SwapBuffers"
+        if "IntendedVsync" not in header or end_col not in header:
+            continue
+        rows = [l.rstrip(",").split(",") for l in lines[1:]]
+        rows = [r for r in rows if len(r) == len(header)]
+        if not rows:
+            continue
+        data = np.array(rows, dtype=np.int64)
+        start = data[:, header.index("IntendedVsync")]
+        end = data[:, header.index(end_col)]
+        ok = (data[:, header.index("Flags")] == 0) & (start > 0) & (end > start)
+        vsyncs.append(start[ok])
+        durations.append((end[ok] - start[ok]) / 1e6)
+    if not vsyncs:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(vsyncs), np.concatenate(durations)
+
+
+def estimate_budget_ms(intended_vsync_ns: np.ndarray) -> float:
+    """The vsync period (ms) as the smallest gap between distinct intended vsyncs."""
+    gaps = np.diff(np.unique(intended_vsync_ns)) / 1e6
+    gaps = gaps[(gaps >= _MIN_PERIOD_MS) & (gaps <= _MAX_PERIOD_MS)]
+    return float(gaps.min()) if gaps.size else DEFAULT_BUDGET_MS
+
+
+@dataclass
+class FrameStats:
+    """Per-frame durations collected around a block (filled when the block exits)."""
+
+    durations_ms: np.ndarray = field(default_factory=lambda: np.empty(0))
+    budget_ms: float = DEFAULT_BUDGET_MS
+    #: The platform's own counters since the reset (not limited to the CSV window).
+    total_frames: int | None = None
+    janky_frames: int | None = None
+
+    def load(self, text: str, budget_ms: float | None = None) -> FrameStats:
+        """Fill from a framestats dump; ``budget_ms=None`` derives it from the vsyncs."""
+        vsyncs, self.durations_ms = parse_framestats(text)
+        self.budget_ms = budget_ms if budget_ms is not None else estimate_budget_ms(vsyncs)
+        m = re.search(r"Total frames rendered:\s*(\d+)", text)
+        self.total_frames = int(m.group(1)) if m else None
+        m = re.search(r"Janky frames:\s*(\d+)", text)
+        self.janky_frames = int(m.group(1)) if m else None
+        return self
+
+    @property
+    def frames(self) -> int:
+        return int(self.durations_ms.size)
+
+    @property
+    def jank_pct(self) -> float:
+        """Share of frames (in %) that took longer than one frame budget."""
+        if not self.frames:
+            return 0.0
+        return float(np.count_nonzero(self.durations_ms > self.budget_ms) * 100.0 / self.frames)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.durations_ms, q)) if self.frames else 0.0
+
+    @property
+    def p50_ms(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p90_ms(self) -> float:
+        return self.percentile(90)
+
+    @property
+    def p99_ms(self) -> float:
+        return self.percentile(99)
+
+    def summary(self) -> dict:
+        """A compact, YAML-friendly summary (for test records and benchmark rows)."""
+        return {
+            "frames": self.frames,
+            "budget_ms": round(self.budget_ms, 2),
+            "jank_pct": round(self.jank_pct, 1),
+            "p50_ms": round(self.p50_ms, 1),
+            "p90_ms": round(self.p90_ms, 1),
+            "p99_ms": round(self.p99_ms, 1),
+        }
+
+    def __str__(self) -> str:
+        return (f"{self.frames} frames, jank {self.jank_pct:.1f}% (> {self.budget_ms:.1f} ms), "
+                f"p50 {self.p50_ms:.1f} / p90 {self.p90_ms:.1f} / p99 {self.p99_ms:.1f} ms")
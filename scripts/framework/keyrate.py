@@ -0,0 +1,165 @@
+"""Key-event delivery rate: how many of the keys we send actually reach the app.
+
+Over network adb every :meth:`Device.key` is a separate round trip, and short
+waits between them lose events - the toolbar field test saw a 60-press burst
+deliver only a fraction of its presses. This module measures that loss: it sends
+a burst of one key at a given cadence and counts what the app received through
+a :class:`KeyCounter`. The cadence means one of two send paths, and a figure
+measured on one says nothing about the other:
+
+  * ``key``      - the host-side ``wait`` between separate :meth:`Device.key`
+    round trips;
+  * ``sequence`` - the on-device ``inter_key_ms`` of one
+    :meth:`Device.key_sequence` call (0 batches the burst into as few
+    ``input keyevent`` invocations as possible).
+
+The counters:
+
+  * :class:`PageCounter` - the ``assets/key_counter.html`` page counts ``keydown``
+    events and mirrors the total into its title ("k<count>"), read back through
+    the toolbar label. Needs no app logging.
+  * :class:`LogcatCounter` - counts log lines matching a pattern (e.g. the app's
+    KEY traces, when a build carries them). Cleared before each burst.
+
+:func:`delivery_curve` sweeps the cadences of one path into rows of ``{path,
+cadence_s, sent, received, rate, actual_interval_s}``; :func:`recommended_cadence`
+picks the fastest cadence that still delivers ``min_rate`` of the keys, which the
+cursor steering code uses for its ``key_sequence`` bursts (see
+toolbar_field_test and tests/key_delivery_bench.py).
+:func:`recommended_wait` reads that figure from the bench's last saved record,
+which the caller loads from the results store (tests/results.py).
+"""
+from __future__ import annotations
+
+import re
+import time
+from typing import Protocol
+
+BENCH = "key-delivery"
+PATHS = ("key", "sequence")
+# The bench summary field holding each path's recommendation (see recommended_wait).
+SUMMARY_FIELDS = {"key": "recommended_cadence_s", "sequence": "recommended_sequence_cadence_s"}
+
+# A cadence is "safe" when at least this share of the sent keys arrives.
+DEFAULT_MIN_RATE = 0.95
+
+# How long to wait for late keys to land before reading the count.
+SETTLE_S = 1.0
+SETTLE_TIMEOUT_S = 8.0
+
+
+class KeyCounter(Protocol):
+    """Counts the key presses the app received since :meth:`start`."""
+
+    def start(self) -> None:
+        ...
+
+    def received(self) -> int | None:
+        """Presses received since ``start()``, or None if the count cannot be read."""
+        ...
+
+
+class PageCounter:
+    """Read the ``k<count>`` title of ``assets/key_counter.html`` from the toolbar label."""
+
+    def __init__(self, device):
+        self.device = device
+        self._base = 0
+
+    def _read(self) -> int | None:
+        m = re.fullmatch(r"k(\d+)", self.device.field_text().strip())
+        return int(m.group(1)) if m else None
+
+    def start(self) -> None:
+        self._base = self._read() or 0
+
+    def received(self) -> int | None:
+        value = self._read()
+        return None if value is None else value - self._base
+
+
+class LogcatCounter:
+    """Count device log lines containing ``grep`` and matching ``pattern`` (Android only)."""
+
+    def __init__(self, device, grep: str, pattern: str = ""):
+        self.device = device
+        self.grep = grep
+        self.pattern = re.compile(pattern) if pattern else None
+
+    def start(self) -> None:
+        self.device.logcat(self.grep, clear=True)
+
+    def received(self) -> int | None:
+        lines = self.device.logcat(self.grep).splitlines()
+        return sum(1 for l in lines if self.pattern is None or self.pattern.search(l))
+
+
+def _settled_count(counter: KeyCounter) -> int | None:
+    """Read the counter until two reads SETTLE_S apart agree (late keys still landing)."""
+    deadline = time.monotonic() + SETTLE_TIMEOUT_S
+    last = counter.received()
+    while time.monotonic() < deadline:
+        time.sleep(SETTLE_S)
+        now = counter.received()
+        if now == last:
+            return now
+        last = now
+    return last
+
+
+def measure_delivery(device, code: int, presses: int, cadence_s: float, counter: KeyCounter,
+                     path: str = "key") -> dict:
+    """Send ``presses`` x ``code`` with ``cadence_s`` between presses over ``path``; return one curve row."""
+    counter.start()
+    t0 = time.monotonic()
+    if path == "sequence":
+        device.key_sequence([code], repeat=presses, inter_key_ms=int(cadence_s * 1000), wait=0)
+    else:
+        for _ in range(presses):
+            device.key(code, wait=cadence_s)
+    elapsed = time.monotonic() - t0
+    received = _settled_count(counter)
+    return {
+        "path": path,
+        "cadence_s": cadence_s,
+        "sent": presses,
+        "received": received,
+        "rate": round(received / presses, 3) if received is not None and presses else None,
+        "actual_interval_s": round(elapsed / presses, 3) if presses else None,
+    }
+
+
+def delivery_curve(device, code: int, cadences: list[float], presses: int,
+                   counter: KeyCounter, repeats: int = 1, path: str = "key") -> list[dict]:
+    """Measure every cadence ``repeats`` times over ``path``; rows keep the worst (lowest) rate."""
+    rows = []
+    for cadence in cadences:
+        samples = [measure_delivery(device, code, presses, cadence, counter, path) for _ in range(repeats)]
+        rated = [s for s in samples if s["rate"] is not None]
+        rows.append(min(rated, key=lambda s: s["rate"]) if rated else samples[0])
+    return rows
+
+
+def recommended_cadence(rows: list[dict], min_rate: float = DEFAULT_MIN_RATE) -> float | None:
+    """The fastest cadence from which on every slower one delivers at least ``min_rate``.
+
+    Requiring all slower cadences to pass too keeps a lucky fast sample from
+    being recommended over a failing slower one. None if no cadence qualifies.
+    """
+    best = None
+    for row in sorted(rows, key=lambda r: r["cadence_s"], reverse=True):
+        if row["rate"] is None or row["rate"] < min_rate:
+            break
+        best = row["cadence_s"]
+    return best
+
+
+def recommended_wait(record: dict | None, default: float, path: str = "key") -> float:
+    """The ``path`` cadence (s) recommended by a saved key-delivery bench ``record``, else ``default``.
+
+    ``record`` is the device's last :data:`BENCH` record as loaded by the results
+    store (``results.load_last_bench``), or None when there is none; ``default``
+    also applies when that run did not measure ``path``.
+    """
+    value = (record or {}).get("summary", {}).get(SUMMARY_FIELDS[path])
+    return default if value is None else float(value)
@@ -0,0 +1,77 @@
+"""Input macros: a burst of keys, holds, taps, text and waits played in one go.
+
+Sending a burst through :meth:`Device.key` costs one transport round trip per
+key, and over network adb the host-side jitter makes the real cadence
+unpredictable (see framework/keyrate.py). A :class:`Macro` records the whole
+sequence instead, and :meth:`Device.play` hands it to the device in a single
+call, so the timing between steps is kept on the device::
+
+    from framework import Macro, keys
+    device.play(Macro().key(keys.DPAD_DOWN, repeat=140, interval=0.03))
+    device.play(Macro().key(keys.DPAD_RIGHT, repeat=5).wait(0.5).key(keys.DPAD_CENTER))
+
+Steps are plain tuples so a platform's driver can compile them without
+importing the framework - on Android, ``adb.input_script`` turns them into one
+shell script of ``input`` commands and ``sleep`` lines.
+"""
+from __future__ import annotations
+
+
+class Macro:
+    """A chainable recording of input steps (see :meth:`Device.play`)."""
+
+    def __init__(self):
+        #: ``("key", code, repeat, interval)``, ``("hold", code, ms)``,
+        #: ``("chord", codes)``, ``("tap", x, y)``, ``("text", text)`` or
+        #: ``("wait", seconds)``.
+        self.steps: list[tuple] = []
+
+    def key(self, code: int, repeat: int = 1, interval: float = 0.0) -> Macro:
+        """Press ``code`` ``repeat`` times, ``interval`` seconds apart (0 = back to back)."""
+        if repeat > 0:
+            self.steps.append(("key", code, repeat, interval))
+        return self
+
+    def hold(self, code: int, ms: int) -> Macro:
+        """Press and hold ``code`` for ``ms`` milliseconds, then release it."""
+        self.steps.append(("hold", code, ms))
+        return self
+
+    def chord(self, *codes: int) -> Macro:
+        """Press ``codes`` together (e.g. CTRL+W), like :meth:`Device.key_combination`."""
+        self.steps.append(("chord", codes))
+        return self
+
+    def tap(self, x: int, y: int) -> Macro:
+        self.steps.append(("tap", x, y))
+        return self
+
+    def text(self, text: str) -> Macro:
+        """Type ``text`` into the focused field."""
+        self.steps.append(("text", text))
+        return self
+
+    def wait(self, seconds: float) -> Macro:
+        if seconds > 0:
+            self.steps.append(("wait", seconds))
+        return self
+
+    def __add__(self, other: Macro) -> Macro:
+        combined = Macro()
+        combined.steps = self.steps + other.steps
+        return combined
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def expected_s(self) -> float:
+        """The time the macro spends waiting and holding (excludes per-command overhead)."""
+        total = 0.0
+        for step in self.steps:
+            if step[0] == "key":
+                total += step[3] * step[2]
+            elif step[0] == "hold":
+                total += step[2] / 1000.0
+            elif step[0] == "wait":
+                total += step[1]
+        return total
@@ -0,0 +1,209 @@
+"""Synthetic test pages, generated on the host server (see framework/server.py).
+
+The page-load corpus is four deterministic pages that each stress one part of
+loading a page, served under ``/load/``::
+
+    text      /load/text.html      long article: parsing, layout and text shaping
+    images    /load/images.html    many PNGs: parallel requests and image decode
+    scripts   /load/scripts.html   many external scripts running work at load time
+    dom       /load/dom.html       a huge DOM tree: node creation, style and layout
+
+The stress page, ``/gen/stress.html``, is generated from its query parameters
+(:data:`STRESS_DEFAULTS`): a DOM of ``nodes`` elements, ``images`` images,
+``iframes`` frames, ``height`` px of scroll length, plus the background load of
+``assets/stress.js`` - busy timers, theme-color churn, console spam - at the
+given rates. Generated pages are kept by a hash of their parameters, so
+repeated loads of one configuration are served without regenerating it.
+
+Every page includes ``beacon.js`` and ``load_timing.js``, so once loaded it
+reports its Navigation and Resource Timing to the host as a ``timing`` page event.
+:func:`install` registers the routes::
+
+    srv = server.acquire(device)
+    pages.install(srv)
+    device.navigate(srv.url(pages.CORPUS["images"], device=device))
+    device.navigate(srv.url(pages.STRESS, device=device, nodes=20000, theme_ms=100))
+
+Standard library only.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+CORPUS = {
+    "text": "/load/text.html",
+    "images": "/load/images.html",
+    "scripts": "/load/scripts.html",
+    "dom": "/load/dom.html",
+}
+
+TEXT_PARAGRAPHS = 400
+IMAGE_COUNT = 60
+IMAGE_SIZE = 256
+SCRIPT_COUNT = 20
+SCRIPT_WORK = 20000      # loop iterations each script runs when it executes
+DOM_NODES = 20000
+
+STRESS = "/gen/stress.html"
+STRESS_DEFAULTS = {
+    "nodes": 1000,        # elements in the body (besides images and frames)
+    "images": 0,
+    "iframes": 0,
+    "height": 0,          # minimum scroll height (px); 0 = whatever the content takes
+    "timers": 0,          # busy setInterval timers ...
+    "timer_ms": 100,      # ... their period
+    "work": 2000,         # ... and loop iterations per run
+    "theme_ms": 0,        # theme-color flip period; 0 = static
+    "console_ms": 0,      # console message period; 0 = quiet
+    "console_burst": 1,   # messages per period
+}
+GENERATED_CACHE = 32      # generated pages kept (by parameter hash)
+
+_generated: OrderedDict[str, str] = OrderedDict()
+_generated_lock = threading.Lock()   # the server's worker threads share the cache
+
+_WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+          "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud").split()
+
+
+def png(width: int, height: int, rgb: tuple[int, int, int]) -> bytes:
+    """A solid-colour RGB PNG (deterministic bytes, compressed like a real one)."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    row = b"\x00" + bytes(rgb) * width
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * height, 6))
+            + chunk(b"IEND", b""))
+
+
+def page(title: str, body: str, head: str = "") -> str:
+    """A full HTML document reporting its load timing (beacon.js + load_timing.js)."""
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+        f"<title>{title}</title>\n"
+        "<script src=\"/beacon.js\"></script>\n<script src=\"/load_timing.js\"></script>\n"
+        f"{head}</head>\n<body>\n{body}\n</body>\n</html>\n")
+
+
+def text_page(paragraphs: int = TEXT_PARAGRAPHS) -> str:
+    rng = random.Random(paragraphs)
+    parts = []
+    for i in range(paragraphs):
+        if i % 20 == 0:
+            parts.append(f"<h2>Section {i // 20 + 1}</h2>")
+        parts.append("<p>" + " ".join(rng.choice(_WORDS) for _ in range(80)) + ".</p>")
+    return page("text", "\n".join(parts))
+
+
+def image_page(count: int = IMAGE_COUNT, size: int = IMAGE_SIZE) -> str:
+    body = "\n".join(
+        f'<img src="/load/img/{i}.png?s={size}" width="{size}" height="{size}" alt="">'
+        for i in range(count))
+    return page("images", body)
+
+
+def image(index: int, size: int = IMAGE_SIZE) -> bytes:
+    rng = random.Random(index)
+    return png(size, size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+
+
+def script_page(count: int = SCRIPT_COUNT, work: int = SCRIPT_WORK) -> str:
+    head = "".join(f'<script src="/load/js/{i}.js?w={work}"></script>\n' for i in range(count))
+    return page("scripts", '<p id="out">scripts</p>', head)
+
+
+def script(index: int, work: int = SCRIPT_WORK) -> str:
+    """One external script: some definitions plus a fixed amount of work at execution."""
+    helpers = "\n".join(
+        f"function f{index}_{j}(x) {{ return (x * {j + 3} + {index}) % 9973; }}" for j in range(50))
+    return (f"{helpers}\n"
+            f"(function () {{ var acc = 0; for (var i = 0; i < {work}; i++) acc = f{index}_{index % 50}(acc + i);"
+            f" window.__acc = (window.__acc || 0) + acc; }})();\n")
+
+
+def dom_page(nodes: int = DOM_NODES) -> str:
+    # Rows of 10 cells: ~nodes elements in a table the layout has to size.
+    rows = max(1, nodes // 11)
+    cells = "".join(f"<td>{c}</td>" for c in range(10))
+    body = "<table>\n" + "\n".join(f"<tr>{cells}</tr>" for _ in range(rows)) + "\n</table>"
+    return page("dom", body)
+
+
+def stress_params(query: dict) -> dict:
+    """The full, typed stress parameters for a request query (unknown keys ignored)."""
+    return {key: int(query.get(key, default)) for key, default in STRESS_DEFAULTS.items()}
+
+
+def params_key(params: dict) -> str:
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def stress_page(**params) -> str:
+    """The stress page for ``params`` (see :data:`STRESS_DEFAULTS`), generated once per
+    parameter set."""
+    params = {**STRESS_DEFAULTS, **params}
+    key = params_key(params)
+    with _generated_lock:
+        if key in _generated:
+            _generated.move_to_end(key)
+            return _generated[key]
+    # Blocks of an <h3> and <p>s of 8 inline spans: ~nodes elements a layout has to size.
+    rng = random.Random(params["nodes"])
+    blocks = []
+    for b in range(max(1, params["nodes"] // 40)):
+        paras = "".join(
+            "<p>" + "".join(f"<span>{rng.choice(_WORDS)}</span> " for _ in range(8)) + "</p>" for _ in range(4))
+        blocks.append(f"<div class=\"b\"><h3>Block {b + 1}</h3>{paras}</div>")
+    media = [f'<img src="/load/img/{i}.png?s=128" width="128" height="128" alt="">'
+             for i in range(params["images"])]
+    media += [f'<iframe src="/gen/frame.html?i={i}" width="300" height="150"></iframe>'
+              for i in range(params["iframes"])]
+    # Spread the media through the text so it is met while scrolling.
+    step = max(1, len(blocks) // max(1, len(media)))
+    for n, item in enumerate(media):
+        blocks.insert(min(len(blocks), (n + 1) * step + n), item)
+    head = ('<meta name="theme-color" content="#123456">\n'
+            f"<script>window.STRESS = {json.dumps(params)};</script>\n"
+            '<script src="/stress.js"></script>\n')
+    body = (f'<div style="min-height: {params["height"]}px">\n' + "\n".join(blocks) + "\n</div>")
+    html = page(f"stress {key[:6]}", body, head)
+    # Generated outside the lock; two threads racing on one key store the same page.
+    with _generated_lock:
+        _generated[key] = html
+        while len(_generated) > GENERATED_CACHE:
+            _generated.popitem(last=False)
+    return html
+
+
+def frame_page(index: int) -> str:
+    """A small document for the stress page's iframes."""
+    return (f"<!DOCTYPE html>\n<html><body><h4>frame {index}</h4>"
+            + "".join(f"<p>{w}</p>" for w in _WORDS[:10]) + "</body></html>\n")
+
+
+def _number(path: str) -> int:
+    return int(path.rsplit("/", 1)[-1].split(".", 1)[0])
+
+
+def install(srv) -> None:
+    """Register the corpus routes on an :class:`~framework.server.AssetServer`
+    (RuntimeError when another process serves its port)."""
+    srv.require_local("the generated pages")
+    srv.route(CORPUS["text"], lambda req: text_page(int(req.query.get("p", TEXT_PARAGRAPHS))))
+    srv.route(CORPUS["images"], lambda req: image_page(int(req.query.get("n", IMAGE_COUNT)),
+                                                       int(req.query.get("s", IMAGE_SIZE))))
+    srv.route("/load/img/*.png", lambda req: image(_number(req.path), int(req.query.get("s", IMAGE_SIZE))))
+    srv.route(CORPUS["scripts"], lambda req: script_page(int(req.query.get("n", SCRIPT_COUNT)),
+                                                         int(req.query.get("w", SCRIPT_WORK))))
+    srv.route("/load/js/*.js", lambda req: script(_number(req.path), int(req.query.get("w", SCRIPT_WORK))))
+    srv.route(CORPUS["dom"], lambda req: dom_page(int(req.query.get("n", DOM_NODES))))
+    srv.route(STRESS, lambda req: stress_page(**stress_params(req.query)))
+    srv.route("/gen/frame.html", lambda req: frame_page(int(req.query.get("i", 0))))
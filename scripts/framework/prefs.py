@@ -0,0 +1,159 @@
+"""Edit the app's SharedPreferences files as one transaction.
+
+A test that needs a pref at a known value used to stop the app, read the XML,
+regex-substitute one entry and push the file back, once per pref. A
+:class:`SharedPrefs` reads the file once (after stopping the app, so it does
+not rewrite the file behind us), applies any number of typed sets, and writes
+it back with a single streamed ``run-as`` write, and only if something
+actually changed::
+
+    with device.prefs() as prefs:                     # <package>_preferences.xml
+        prefs.set("pref_key_cursor_speed", 40)        # <int>
+        prefs.set("pref_key_hide_timeout", 10.0)      # <float>
+    # committed here (if the block did not raise)
+
+With ``restore=True`` the file as read is kept and written back on exit, so a
+test can change settings and leave the device as it found them::
+
+    with device.prefs(f"{device.package}_preferences_landscape", restore=True) as prefs:
+        prefs.set(KEY, 10.0)
+        prefs.commit()
+        device.launch()
+        ...
+
+Write the prefs before launching the app: it only reads them at start-up, and
+a running app would overwrite the file with its own values. Obtain instances
+from :meth:`AndroidDevice.prefs <framework.android.AndroidDevice.prefs>`.
+"""
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+
+_HEADER = "<?xml version='1.0' encoding='utf-8' standalone='yes' ?>\n"
+
+# Python type -> SharedPreferences XML element (bool before int: bool is an int).
+_KINDS = ((bool, "boolean"), (int, "int"), (float, "float"), (str, "string"))
+_PARSE = {"boolean": lambda v: v == "true", "int": int, "long": int, "float": float}
+
+
+def _kind(value) -> str:
+    for py_type, kind in _KINDS:
+        if isinstance(value, py_type):
+            return kind
+    raise TypeError(f"unsupported pref value {value!r}")
+
+
+def _serialize(root: ET.Element) -> str:
+    ET.indent(root, space="    ")
+    return _HEADER + ET.tostring(root, encoding="unicode") + "\n"
+
+
+class SharedPrefs:
+    """One shared-prefs XML file of the app, read once and written back at most once."""
+
+    def __init__(self, device, rel_path: str, restore: bool = False):
+        self.device = device
+        self.path = rel_path
+        self.restore_on_exit = restore
+        self._root: ET.Element | None = None
+        self._original = ""       # the file as read, for restore()
+        self._baseline = ""       # ... and as we would serialize it
+        self._written = ""        # what the device holds now, as serialized by us
+
+    def load(self) -> SharedPrefs:
+        """Stop the app and read the file (done on first use; call again to re-read)."""
+        self.device.force_stop()
+        self._original = self.device.read_prefs(self.path)
+        try:
+            self._root = ET.fromstring(self._original) if "<map" in self._original else None
+        except ET.ParseError:
+            self._root = None
+        self._baseline = self._written = _serialize(self._root) if self._root is not None else ""
+        return self
+
+    def _map(self) -> ET.Element:
+        if self._root is None:
+            self.load()
+        if self._root is None:
+            raise RuntimeError(f"prefs file {self.path} not initialized yet")
+        return self._root
+
+    @property
+    def exists(self) -> bool:
+        """Whether the file holds a prefs map (the app has written its prefs at least once)."""
+        if self._root is None:
+            self.load()
+        return self._root is not None
+
+    def _entry(self, key: str) -> ET.Element | None:
+        for el in self._map():
+            if el.get("name") == key:
+                return el
+        return None
+
+    def get(self, key: str, default=None):
+        """The typed value of ``key`` (``<set>`` entries as a list of strings)."""
+        el = self._entry(key)
+        if el is None:
+            return default
+        if el.tag == "string":
+            return el.text or ""
+        if el.tag == "set":
+            return [child.text or "" for child in el]
+        return _PARSE[el.tag](el.get("value"))
+
+    def set(self, key: str, value, kind: str | None = None) -> SharedPrefs:
+        """Set ``key``; the element type follows the Python type (bool, int, float, str)
+        unless ``kind`` names it (e.g. ``"long"``)."""
+        kind = kind or _kind(value)
+        el = self._entry(key)
+        if el is not None and el.tag != kind:
+            self._map().remove(el)
+            el = None
+        if el is None:
+            el = ET.SubElement(self._map(), kind, name=key)
+        if kind == "string":
+            el.text = str(value)
+        else:
+            el.set("value", str(value).lower() if kind == "boolean" else str(value))
+        return self
+
+    def update(self, values: dict) -> SharedPrefs:
+        for key, value in values.items():
+            self.set(key, value)
+        return self
+
+    def remove(self, key: str) -> SharedPrefs:
+        el = self._entry(key)
+        if el is not None:
+            self._map().remove(el)
+        return self
+
+    def commit(self) -> bool:
+        """Write the file if it changed since it was read; return whether it was written."""
+        if self._root is None:
+            return False
+        content = _serialize(self._root)
+        if content == self._written:
+            return False
+        self.device.write_prefs(self.path, content)
+        self._written = content
+        return True
+
+    def restore(self) -> bool:
+        """Put back the file as it was read, if we changed it; return whether it was written."""
+        if self._root is None or self._written == self._baseline:
+            return False
+        self.device.force_stop()
+        self.device.write_prefs(self.path, self._original)
+        self._written = self._baseline
+        return True
+
+    def __enter__(self) -> SharedPrefs:
+        return self.load()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.restore_on_exit:
+            self.restore()
+        elif exc_type is None:
+            self.commit()
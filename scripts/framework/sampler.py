@@ -0,0 +1,119 @@
+"""Process sampler: the app's CPU time, memory and threads over a test run.
+
+A test that passes can still leave the app leaking or spinning. The sampler
+polls the app's processes on a background thread - ``/proc/<pid>/stat`` and
+``/proc/<pid>/status`` every ``interval_s``, plus ``dumpsys meminfo`` every
+``meminfo_every`` samples, all in one shell round trip per sample (see
+adb.proc_sample) - and keeps the samples in memory. The runner cuts them per
+test and attaches the compact :func:`summarize` of each window to the test's
+record::
+
+    sampler = ProcessSampler(device, interval_s=1.0)
+    sampler.start()
+    mark = sampler.mark()
+    ...                                   # run a test
+    record["process"] = summarize(sampler.since(mark))
+    sampler.stop()
+
+Only :class:`~framework.android.AndroidDevice` provides the ``proc_sample``
+hook; the runner enables this with ``--sample [SECONDS]``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+DEFAULT_INTERVAL_S = 1.0
+MEMINFO_EVERY = 5      # dumpsys meminfo is slow on the TV: only every Nth sample
+SERIES_POINTS = 40     # points kept per series in a summary
+
+
+class ProcessSampler:
+    """Background /proc (+ meminfo) sampling of one device's app."""
+
+    def __init__(self, device, interval_s: float = DEFAULT_INTERVAL_S, meminfo_every: int = MEMINFO_EVERY):
+        self.device = device
+        self.interval_s = interval_s
+        self.meminfo_every = max(1, meminfo_every)
+        self.samples: list[dict] = []   # oldest first; each has the host time "t"
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"sampler-{self.device.id}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        n = 0
+        while not self._stop.is_set():
+            t0 = time.monotonic()
+            try:
+                sample = self.device.proc_sample(with_meminfo=n % self.meminfo_every == 0)
+                sample["t"] = time.time()
+                self.samples.append(sample)
+            except Exception:  # noqa: BLE001 - a missed sample is not worth failing a run
+                self.errors += 1
+            n += 1
+            self._stop.wait(max(0.0, self.interval_s - (time.monotonic() - t0)))
+
+    def mark(self) -> float:
+        """A point in time to cut the samples at (see :meth:`since`)."""
+        return time.time()
+
+    def since(self, mark: float) -> list[dict]:
+        return [s for s in list(self.samples) if s["t"] >= mark]
+
+
+def _thin(values: list, points: int = SERIES_POINTS) -> list:
+    if len(values) <= points:
+        return values
+    step = len(values) / points
+    return [values[int(i * step)] for i in range(points - 1)] + [values[-1]]
+
+
+def summarize(samples: list[dict]) -> dict | None:
+    """Peak PSS/RSS, CPU seconds used and thread counts of a window, with thinned series.
+
+    CPU time is summed over sample-to-sample increments, so an app restart in
+    the window (new pid, counters from zero) is not counted as negative time.
+    Returns None for an empty window.
+    """
+    if not samples:
+        return None
+    t0 = samples[0]["t"]
+    cpu, used = [], 0.0
+    for prev, cur in zip([None] + samples[:-1], samples):
+        if prev is not None and prev["pids"] and cur["pids"]:
+            delta = cur["cpu_s"] - prev["cpu_s"]
+            used += delta if delta >= 0 else cur["cpu_s"]
+        cpu.append(round(used, 2))
+    pss = [(round(s["t"] - t0, 1), s["pss_kb"]) for s in samples if s.get("pss_kb")]
+    threads = [s["threads"] for s in samples]
+    span = samples[-1]["t"] - t0
+    return {
+        "samples": len(samples),
+        "peak_pss_kb": max((v for _, v in pss), default=None),
+        "peak_rss_kb": max(s["rss_kb"] for s in samples),
+        "cpu_s": round(used, 2),
+        "cpu_pct": round(used * 100 / span, 1) if span > 0 else None,
+        "threads_max": max(threads),
+        "threads_end": threads[-1],
+        "restarts": sum(1 for a, b in zip(samples, samples[1:]) if b["pids"] and a["pids"] != b["pids"]),
+        "series": {
+            "t_s": _thin([round(s["t"] - t0, 1) for s in samples]),
+            "rss_kb": _thin([s["rss_kb"] for s in samples]),
+            "cpu_s": _thin(cpu),
+            "threads": _thin(threads),
+            "pss_kb": _thin([v for _, v in pss]),
+        },
+    }
@@ -0,0 +1,212 @@
+"""Visual regression: a content-addressed screenshot store with per-test baselines.
+
+Every screen kept by a check is stored once, named by the SHA-256 of its pixels,
+so the many identical frames a run produces cost one file::
+
+    scripts/tests/screens/objects/<ab>/<sha256>.png
+
+A baseline is a small pointer file naming the object a screen is expected to
+match, per device model, configuration, serial and test (the same identity as
+the results store, see tests/results.py)::
+
+    scripts/tests/screens/baselines/<MODEL>/<config-id>-<serial>/<test>/<name>.ref
+
+:meth:`Device.assert_screen` grabs the screen, stores it, and compares it with
+the baseline using :func:`framework.vision.compare_screens` (tile-wise SSIM, with
+a mask for dynamic regions). With no baseline yet - or when the runner was
+started with ``--update-screens`` - the grab becomes the baseline. On a
+mismatch a diff image (the grab dimmed, failing tiles in red) and a copy of the
+grab itself are written next to where the baseline pointer lives, overwritten by
+the next mismatch::
+
+    scripts/tests/screens/diffs/<MODEL>/<config-id>-<serial>/<test>/<name>.diff.png
+    scripts/tests/screens/diffs/<MODEL>/<config-id>-<serial>/<test>/<name>.actual.png
+
+Only baselines and the objects they point at are committed: the runner calls
+:func:`prune` after a run, which drops every object no baseline references
+(mismatching grabs, baselines replaced by ``--update-screens``), and the diffs
+folder, which keeps the mismatching grabs for review, is gitignored.
+
+The runner points the store at its folder and names the current test
+(:func:`configure` / :func:`begin_test`); each test's checks are then read back
+with :func:`checks` for its results record. This module is standard-library
+only; NumPy and Pillow are needed once a screen is actually checked.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(__file__), "..", "tests", "screens")
+
+
+def _sanitize(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", str(text)).strip() or "unknown"
+
+
+class ScreenStore:
+    """Screens stored by content hash, plus baseline pointers into them."""
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = os.path.abspath(root)
+        #: Grabs written as new objects, and grabs that matched an existing one.
+        self.stored = 0
+        self.deduplicated = 0
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest + ".png")
+
+    def put(self, frame) -> str:
+        """Store a :class:`~framework.vision.Frame` (once per distinct content); return its hash."""
+        rgb = frame.rgb
+        h = hashlib.sha256(f"{rgb.shape[1]}x{rgb.shape[0]}:".encode())
+        h.update(rgb.tobytes())
+        digest = h.hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            self.deduplicated += 1
+        else:
+            frame.save(path)
+            self.stored += 1
+        return digest
+
+    def load(self, digest: str):
+        """The stored screen as a PIL image."""
+        from PIL import Image
+        return Image.open(self.path(digest))
+
+    def _entry_path(self, kind: str, device_config: dict, serial: str, test: str, name: str) -> str:
+        return os.path.join(
+            self.root, kind, _sanitize(device_config["model"]),
+            f"{_sanitize(device_config['config_id'])}-{_sanitize(serial)}",
+            _sanitize(test), _sanitize(name))
+
+    def _baseline_path(self, device_config: dict, serial: str, test: str, name: str) -> str:
+        return self._entry_path("baselines", device_config, serial, test, name) + ".ref"
+
+    def diff_path(self, device_config: dict, serial: str, test: str, name: str, kind: str = "diff") -> str:
+        """Where a mismatching check's diff image (``kind="diff"``) or grab (``"actual"``)
+        goes (not committed; see tests/.gitignore)."""
+        return self._entry_path("diffs", device_config, serial, test, name) + f".{kind}.png"
+
+    def baseline(self, device_config: dict, serial: str, test: str, name: str) -> str | None:
+        """The object hash the screen is expected to match, or None if there is no baseline."""
+        path = self._baseline_path(device_config, serial, test, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as fh:
+            digest = fh.read().strip()
+        return digest if os.path.exists(self.path(digest)) else None
+
+    def set_baseline(self, device_config: dict, serial: str, test: str, name: str, digest: str) -> None:
+        path = self._baseline_path(device_config, serial, test, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(digest + "\n")
+
+    def referenced(self) -> set[str]:
+        """Every object hash some baseline points at."""
+        out = set()
+        for folder, _, files in os.walk(os.path.join(self.root, "baselines")):
+            for f in files:
+                if f.endswith(".ref"):
+                    with open(os.path.join(folder, f), encoding="utf-8") as fh:
+                        out.add(fh.read().strip())
+        return out
+
+    def prune(self) -> int:
+        """Delete the objects no baseline points at; return how many."""
+        keep = self.referenced()
+        removed = 0
+        for folder, _, files in os.walk(os.path.join(self.root, "objects"), topdown=False):
+            for f in files:
+                if f.split(".", 1)[0] not in keep:
+                    os.remove(os.path.join(folder, f))
+                    removed += 1
+            if not os.listdir(folder):
+                os.rmdir(folder)
+        return removed
+
+
+# --- runner state (process-wide) -----------------------------------------------
+
+_store = ScreenStore()
+_update = False
+_test = "adhoc"
+_checks: list[dict] = []
+
+
+def configure(root: str = DEFAULT_ROOT, update: bool = False) -> None:
+    """Use the store at ``root``; with ``update`` every check rewrites its baseline."""
+    global _store, _update
+    _store = ScreenStore(root)
+    _update = update
+
+
+def begin_test(name: str) -> None:
+    """Name the test subsequent checks belong to, and forget the previous test's checks."""
+    global _test
+    _test = name
+    _checks.clear()
+
+
+def checks() -> list[dict]:
+    """The screen checks made since :func:`begin_test`, as results-record entries."""
+    return list(_checks)
+
+
+def store() -> ScreenStore:
+    return _store
+
+
+def prune() -> int:
+    """Drop the objects of the current store that no baseline references (after a run)."""
+    if not os.path.isdir(os.path.join(_store.root, "objects")):
+        return 0
+    return _store.prune()
+
+
+def check(device, name: str, mask=None, roi: tuple[int, int, int, int] | None = None,
+          min_ssim: float | None = None) -> dict:
+    """Grab, store and compare one screen against its baseline; see :meth:`Device.assert_screen`.
+
+    Returns the check's record; raises AssertionError when the screen differs.
+    """
+    from . import vision  # NumPy only when a screen is checked
+    frame = device.frame(roi)
+    if frame is None:
+        raise AssertionError(f"screen '{name}': could not grab the screen")
+    ignore = mask
+    if mask is not None and not hasattr(mask, "shape"):
+        ignore = vision.rect_mask(frame.pixels.shape[:2], [
+            (x0 - frame.origin[0], y0 - frame.origin[1], x1 - frame.origin[0], y1 - frame.origin[1])
+            for x0, y0, x1, y1 in mask])
+    current = _store.put(frame)
+    config = device.config()
+    expected = _store.baseline(config, device.id, _test, name)
+    entry = {"name": name, "current": current[:12]}
+    if expected is None or _update:
+        _store.set_baseline(config, device.id, _test, name, current)
+        entry["status"] = "baseline"
+    elif expected == current:
+        entry["status"] = "identical"
+    else:
+        diff = vision.compare_screens(_store.load(expected), frame, ignore,
+                                      min_ssim=vision.SSIM_MIN if min_ssim is None else min_ssim)
+        entry.update(diff.summary())
+        entry["status"] = "match" if diff.ok else "differs"
+        if not diff.ok:
+            overlay = _store.diff_path(config, device.id, _test, name)
+            os.makedirs(os.path.dirname(overlay), exist_ok=True)
+            vision.diff_overlay(frame, diff).save(overlay)
+            # The grab's object is pruned after the run (no baseline points at it).
+            shutil.copyfile(_store.path(current), _store.diff_path(config, device.id, _test, name, "actual"))
+            _checks.append(entry)
+            raise AssertionError(
+                f"screen '{name}' differs from its baseline: {len(diff.failed)} tile(s) under "
+                f"SSIM {vision.SSIM_MIN if min_ssim is None else min_ssim} (worst {diff.worst:.3f}); "
+                f"see {os.path.relpath(overlay)}")
+    _checks.append(entry)
+    return entry
@@ -0,0 +1,372 @@
+"""The host HTTP server the test pages are served from, shared by every suite.
+
+Devices reach it as ``http://localhost:8899`` through an ``adb reverse`` tunnel,
+so tests need no internet and every byte the WebView loads is under our control.
+Files in ``tests/assets`` are served as they are; *routes* add generated
+responses and network shaping on top::
+
+    srv = server.acquire(device)                      # start (or share) + tunnel
+    srv.route("/gen/list.html", lambda req: make_page(int(req.query.get("n", 10))))
+    srv.route("*.jpg", latency_s=0.8, rate_bps=64_000)          # slow images
+    srv.route("/feed", feed, chunked=True, chunk_size=256, drip_s=0.5)
+    device.navigate(srv.url("cursor_target.html"))
+    ...
+    server.release()
+
+A route is matched against the request path with shell-style wildcards (most
+recently added first). Its ``handler`` gets a :class:`Request` and returns the
+body (``str`` or ``bytes``), a :class:`Response` when it needs its own status
+or headers, or None to decline (the next matching route, and in the end the
+asset files, get the request). Without a handler the matching asset file is
+served, shaped by the route's options: ``latency_s`` before the headers,
+``rate_bps`` bandwidth, ``chunked`` transfer encoding with ``drip_s`` between
+chunks, and a ``cache`` profile from :data:`CACHE_PROFILES`. Unrouted files
+get ``no-store``, so an edited page is never served stale from the WebView cache.
+
+Pages report what happened to them (clicks, scrolls, "loaded") by calling
+``report(name)`` from ``assets/beacon.js``, which mirrors the event into
+``document.title`` and posts it to ``/beacon``. The server keeps the events per
+device (the page URL's ``dev`` parameter, see :meth:`AssetServer.url`) with
+their arrival time; tests read them through :meth:`Device.page_events` and
+:meth:`Device.wait_page_event` in milliseconds, instead of reading the mirrored
+title back out of the address field (a uiautomator dump of 1-3 s, and not
+possible at all while the toolbar is hidden).
+
+The server is reference-counted: :func:`acquire` starts it on first use and
+:func:`release` stops it (removing the tunnels) when the last user is done;
+anything left is torn down at exit. If the port is taken by another process
+(a previous run still serving the same assets), that server is used as is and
+routes are unavailable. Standard library only.
+"""
+from __future__ import annotations
+
+import atexit
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+PORT = 8899
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "assets")
+
+# Response headers per cache profile. "revalidate" adds an ETag and answers
+# If-None-Match with 304, for tests of the WebView's conditional requests.
+CACHE_PROFILES = {
+    "no-store": {"Cache-Control": "no-store, must-revalidate", "Expires": "0"},
+    "revalidate": {"Cache-Control": "no-cache"},
+    "max-age": {"Cache-Control": "public, max-age=300"},
+    "immutable": {"Cache-Control": "public, max-age=31536000, immutable"},
+}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    body: bytes = b""
+    raw_query: str = ""
+
+
+@dataclass
+class Response:
+    """What a route handler returns when a body alone is not enough."""
+    body: str | bytes = b""
+    status: int = 200
+    content_type: str | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+    rate_bps: int | None = None   # overrides the route's
+
+
+@dataclass
+class Route:
+    pattern: str
+    handler: Callable[[Request], str | bytes | Response | None] | None = None
+    content_type: str | None = None   # default: from the path's extension
+    status: int = 200
+    latency_s: float = 0.0
+    rate_bps: int | None = None
+    chunked: bool = False
+    chunk_size: int = 16 * 1024
+    drip_s: float = 0.0
+    cache: str = "no-store"
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, and chunked responses
+    server: _HTTPServer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=ASSETS_DIR, **kwargs)
+
+    def log_message(self, *args):  # keep the test output clean
+        pass
+
+    def do_GET(self):
+        self._respond()
+
+    def do_HEAD(self):
+        self._respond()
+
+    def do_POST(self):
+        self._respond()
+
+    def _respond(self) -> None:
+        split = urllib.parse.urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        request = Request(
+            self.command, split.path, dict(urllib.parse.parse_qsl(split.query)),
+            {k.lower(): v for k, v in self.headers.items()}, self.rfile.read(length) if length else b"",
+            split.query)
+        extra: dict[str, str] = {}
+        try:
+            body = None
+            for route in self.server.owner.matches(request.path):
+                if route.handler is None:
+                    break
+                body = route.handler(request)
+                if body is not None:
+                    break
+            if isinstance(body, Response):
+                route = replace(route, status=body.status, rate_bps=body.rate_bps or route.rate_bps,
+                                content_type=body.content_type or route.content_type)
+                extra = body.headers
+                body = body.body
+            if body is not None:
+                ctype = route.content_type or self.guess_type(request.path)
+                if ctype == "application/octet-stream":   # extension-less generated page
+                    ctype = "text/html"
+            else:
+                local = self.translate_path(request.path)
+                if os.path.isdir(local):
+                    local = os.path.join(local, "index.html")
+                if not os.path.isfile(local):
+                    self.send_error(404)
+                    return
+                with open(local, "rb") as fh:
+                    body = fh.read()
+                ctype = route.content_type or self.guess_type(local)
+        except Exception as e:  # noqa: BLE001 - a broken route is a 500, not a dead server
+            self.send_error(500, explain=f"{type(e).__name__}: {e}")
+            return
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+            if ctype.startswith("text/") and "charset" not in ctype:
+                ctype += "; charset=utf-8"
+        self._send(route, body or b"", ctype, extra)
+
+    def _send(self, route: Route, body: bytes, ctype: str, extra: dict[str, str] | None = None) -> None:
+        if route.latency_s:
+            time.sleep(route.latency_s)
+        etag = None
+        if route.cache == "revalidate":
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self.send_response(route.status)
+        self.send_header("Content-Type", ctype)
+        for key, value in CACHE_PROFILES[route.cache].items():
+            self.send_header(key, value)
+        if etag:
+            self.send_header("ETag", etag)
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.send_header("Transfer-Encoding" if route.chunked else "Content-Length",
+                         "chunked" if route.chunked else str(len(body)))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        step = route.chunk_size if (route.chunked or route.rate_bps or route.drip_s) else len(body) or 1
+        t0 = time.monotonic()
+        sent = 0
+        for i in range(0, len(body), step):
+            chunk = body[i:i + step]
+            if route.chunked:
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            else:
+                self.wfile.write(chunk)
+            self.wfile.flush()
+            sent += len(chunk)
+            if route.rate_bps:
+                ahead = sent / route.rate_bps - (time.monotonic() - t0)
+                if ahead > 0:
+                    time.sleep(ahead)
+            if route.drip_s and sent < len(body):
+                time.sleep(route.drip_s)
+        if route.chunked:
+            self.wfile.write(b"0\r\n\r\n")
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: AssetServer
+
+
+class AssetServer:
+    """The assets dir plus dynamic routes, on ``127.0.0.1:port``."""
+
+    def __init__(self, port: int = PORT):
+        self.port = port
+        self.routes: list[Route] = []
+        self.default = Route("*")   # unrouted asset files
+        self._httpd: _HTTPServer | None = None
+        self._tunnels: dict = {}   # device.id -> device
+        self._lock = threading.Lock()
+        #: False when another process already serves the port (routes unavailable).
+        self.local = False
+        self._events: dict[str, list[dict]] = {}   # device id -> beacon events, oldest first
+        self._events_changed = threading.Condition()
+        self.route("/beacon", self._beacon, status=204)
+
+    def start(self) -> None:
+        if self._httpd is not None:
+            return
+        try:
+            self._httpd = _HTTPServer(("127.0.0.1", self.port), _Handler)
+        except OSError:
+            print(f"  note: port {self.port} already served by another process; reusing it (no dynamic routes)")
+            return
+        self._httpd.owner = self
+        self.local = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        for device in list(self._tunnels.values()):
+            try:
+                device.reverse_remove(self.port)
+            except Exception:  # noqa: BLE001
+                pass
+        self._tunnels.clear()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        self.local = False
+
+    def require_local(self, purpose: str = "dynamic routes") -> None:
+        """Raise RuntimeError unless this process serves the port (``purpose`` needs routes)."""
+        if not self.local:
+            raise RuntimeError(f"port {self.port} is served by another process; {purpose} need our server")
+
+    def attach(self, device) -> None:
+        """Point ``device``'s localhost:port at this server (once per device)."""
+        with self._lock:
+            if device.id not in self._tunnels:
+                device.reverse(self.port)
+                self._tunnels[device.id] = device
+
+    def route(self, pattern: str, handler: Callable[[Request], str | bytes | Response | None] | None = None,
+              **options) -> Route:
+        """Add (or replace) the route for ``pattern``; ``options`` are :class:`Route` fields."""
+        if options.get("cache", "no-store") not in CACHE_PROFILES:
+            raise ValueError(f"unknown cache profile '{options['cache']}' (known: {', '.join(CACHE_PROFILES)})")
+        route = Route(pattern, handler, **options)
+        with self._lock:
+            self.routes = [r for r in self.routes if r.pattern != pattern] + [route]
+        return route
+
+    def unroute(self, pattern: str) -> None:
+        with self._lock:
+            self.routes = [r for r in self.routes if r.pattern != pattern]
+
+    def match(self, path: str) -> Route:
+        return next(self.matches(path))
+
+    def matches(self, path: str):
+        """The routes matching ``path``, newest first, ending with the plain asset route."""
+        for route in reversed(self.routes):
+            if fnmatch.fnmatchcase(path, route.pattern):
+                yield route
+        yield self.default
+
+    def url(self, path: str, bust: bool = True, device=None, **query) -> str:
+        """The device-side URL of ``path``; ``bust`` adds a cache-busting ``cb`` parameter,
+        ``device`` the ``dev`` parameter its page events are filed under."""
+        if device is not None:
+            query["dev"] = device.id
+        if bust:
+            query["cb"] = int(time.time() * 1000)
+        qs = urllib.parse.urlencode(query)
+        return f"http://localhost:{self.port}/{path.lstrip('/')}" + (f"?{qs}" if qs else "")
+
+    # --- page events (/beacon) ---
+
+    def _beacon(self, request: Request) -> str:
+        data = json.loads(request.body or b"{}")
+        event = {"event": str(data.get("event", "")), "data": data.get("data"), "page": data.get("page", ""),
+                 "page_ms": data.get("t"), "t": time.time()}
+        with self._events_changed:
+            self._events.setdefault(data.get("dev") or "", []).append(event)
+            self._events_changed.notify_all()
+        return ""
+
+    def events(self, device_id: str, since: float = 0.0) -> list[dict]:
+        """The events reported by ``device_id``'s pages that arrived after ``since`` (``time.time()``)."""
+        with self._events_changed:
+            return [e for e in self._events.get(device_id, []) if e["t"] > since]
+
+    def wait_event(self, device_id: str, pattern: str = "*", timeout: float = 10.0,
+                   since: float = 0.0) -> dict | None:
+        """The first event after ``since`` whose name matches ``pattern`` (wildcards), waiting up
+        to ``timeout`` seconds for it to arrive; None on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._events_changed:
+            while True:
+                for e in self._events.get(device_id, []):
+                    if e["t"] > since and fnmatch.fnmatchcase(e["event"], pattern):
+                        return e
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return None
+                self._events_changed.wait(left)
+
+    def clear_events(self, device_id: str) -> None:
+        with self._events_changed:
+            self._events.pop(device_id, None)
+
+
+# --- the shared instance ---------------------------------------------------------
+
+_shared = AssetServer()
+_refs = 0
+_refs_lock = threading.Lock()
+
+
+def acquire(device=None) -> AssetServer:
+    """Take a reference on the shared server (starting it), tunnelling ``device`` to it."""
+    global _refs
+    with _refs_lock:
+        if _refs == 0:
+            _shared.start()
+        _refs += 1
+    if device is not None:
+        _shared.attach(device)
+    return _shared
+
+
+def release() -> None:
+    """Drop a reference; the last one stops the server and removes its tunnels."""
+    global _refs
+    with _refs_lock:
+        _refs = max(0, _refs - 1)
+        if _refs == 0:
+            _shared.stop()
+
+
+def shared() -> AssetServer:
+    """The shared server, whether or not it is running."""
+    return _shared
+
+
+atexit.register(_shared.stop)
@@ -0,0 +1,146 @@
+"""Continuous screen capture: timestamped frames from a background worker.
+
+One :meth:`Device.frame` per step cannot see motion *during* a key burst. A
+:class:`FrameStream` instead keeps capturing on a worker thread and hands the
+frames to the consumer as a generator, each stamped with the host's monotonic
+clock when it arrived. On Android the frames come from a device-side loop of raw
+``screencap`` calls on a single ``exec-out`` pipe (see
+:meth:`AndroidDevice.frame_stream`), so there is neither an adb process start
+nor an image encode per frame. The rate is bound by the transfer of the raw
+frames, a few per second for a full 1080p frame over Wi-Fi.
+
+The worker keeps at most ``maxlen`` undelivered frames (each holds its raw
+buffer, ~8 MB at 1080p even when cropped); when the consumer falls behind, the
+oldest ones are discarded and counted in :attr:`FrameStream.dropped`, so capture
+never stalls on analysis.
+
+:func:`track` runs a detector (e.g. :func:`framework.vision.cursor_tip`) over the
+frames, and :func:`motion_report` reduces the resulting positions to travel,
+key-to-motion latency and capture gaps::
+
+    with device.frame_stream(step=2) as stream:
+        sent = time.monotonic()
+        device.key_sequence([keys.DPAD_RIGHT], repeat=10, inter_key_ms=100)
+        samples = list(track(stream.frames(until=time.monotonic() + 1.0), vision.cursor_tip))
+    print(motion_report(samples, sent))
+"""
+from __future__ import annotations
+
+import collections
+import statistics
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+# A capture interval this many times the median counts as a gap (missed frames).
+GAP_FACTOR = 2.0
+
+
+class FrameStream:
+    """Frames read by a worker thread from ``read()`` until :meth:`stop`.
+
+    ``read`` returns the next frame (anything with a ``timestamp`` attribute that
+    can be set), or None at the end of the stream; ``close`` releases the source
+    and must make a blocked ``read`` return.
+    """
+
+    def __init__(self, read: Callable[[], object | None], close: Callable[[], None], maxlen: int = 16):
+        self._read = read
+        self._close = close
+        self._frames: collections.deque = collections.deque()
+        self._maxlen = maxlen
+        self._ready = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="frame-stream", daemon=True)
+        #: Frames captured so far, and frames discarded because nobody consumed them.
+        self.captured = 0
+        self.dropped = 0
+
+    def start(self) -> FrameStream:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._ready:
+            self._stopped = True
+            self._ready.notify_all()
+        self._close()
+        self._thread.join(timeout=10)
+
+    def __enter__(self) -> FrameStream:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            frame = self._read()
+            if frame is None:
+                break
+            frame.timestamp = time.monotonic()
+            with self._ready:
+                self.captured += 1
+                if len(self._frames) >= self._maxlen:
+                    self._frames.popleft()
+                    self.dropped += 1
+                self._frames.append(frame)
+                self._ready.notify_all()
+        with self._ready:
+            self._stopped = True
+            self._ready.notify_all()
+
+    def frames(self, until: float | None = None) -> Iterator:
+        """Yield frames as they arrive, until the monotonic time ``until`` (or the stream ends)."""
+        while True:
+            with self._ready:
+                while not self._frames and not self._stopped:
+                    left = None if until is None else until - time.monotonic()
+                    if left is not None and left <= 0:
+                        return
+                    self._ready.wait(left)
+                if not self._frames:
+                    return
+                frame = self._frames.popleft()
+            if until is not None and frame.timestamp > until:
+                return
+            yield frame
+
+
+def track(frames, detect: Callable) -> Iterator[tuple[float, object]]:
+    """``(timestamp, detect(frame))`` for every frame; the position is None when not found."""
+    for frame in frames:
+        yield frame.timestamp, detect(frame)
+
+
+def motion_report(samples: list[tuple[float, tuple[int, int] | None]], sent_at: float) -> dict:
+    """Summarise tracked positions around a burst sent at the monotonic time ``sent_at``.
+
+    ``travel`` is the first-to-last seen position; ``latency_s`` the time from the
+    send to the first frame whose position differs from the last one before it;
+    ``gaps`` counts capture intervals over GAP_FACTOR x the median interval.
+    """
+    seen = [(t, p) for t, p in samples if p is not None]
+    report = {
+        "frames": len(samples),
+        "detected": len(seen),
+        "fps": None,
+        "gaps": 0,
+        "travel": None,
+        "latency_s": None,
+    }
+    times = [t for t, _ in samples]
+    if len(times) > 1:
+        intervals = [b - a for a, b in zip(times, times[1:])]
+        median = statistics.median(intervals)
+        report["fps"] = round(1.0 / median, 2) if median > 0 else None
+        report["gaps"] = sum(1 for i in intervals if median > 0 and i > GAP_FACTOR * median)
+    if seen:
+        (_, first), (_, last) = seen[0], seen[-1]
+        report["travel"] = (last[0] - first[0], last[1] - first[1])
+        before = [p for t, p in seen if t <= sent_at]
+        start = before[-1] if before else first
+        moved = next((t for t, p in seen if t > sent_at and p != start), None)
+        if moved is not None:
+            report["latency_s"] = round(moved - sent_at, 3)
+    return report
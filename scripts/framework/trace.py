@@ -0,0 +1,123 @@
+"""System traces (atrace / perfetto) around a test, and main-thread slices from them.
+
+Investigating ordering bugs (the toolbar's arm/hide sequence, cursor dispatch)
+used to mean adding temporary Timber logs and rebuilding. A trace shows the
+same thing without touching the app: every ``Trace.beginSection`` slice of the
+app plus the framework's view / input / gfx slices, per thread, with timestamps.
+:class:`Tracer` starts a capture before a test and pulls it next to the test's
+results afterwards::
+
+    tracer = Tracer(device, mode="atrace")
+    tracer.start()
+    ...                                           # run a test
+    path, slices = tracer.stop(results_store.artifact_dir(config, device.id, name), name)
+
+``atrace`` captures are ftrace text: :func:`parse_atrace` pairs the
+``tracing_mark_write`` begin/end marks per thread and :func:`summarize_slices`
+reduces the app's main thread (tid == pid) to per-name counts and durations,
+which the runner stores in the test's record. ``perfetto`` captures are
+protobuf; they are only pulled (open them in ui.perfetto.dev).
+
+Only :class:`~framework.android.AndroidDevice` provides the ``trace_*`` hooks;
+the runner enables this with ``--trace [atrace|perfetto]``.
+"""
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+
+TOP_SLICES = 15
+
+# "  <comm>-<tid>  ( <tgid>) [002] d..1  1234.567890: tracing_mark_write: B|<pid>|<name>"
+# (the tgid column and the flags field depend on the kernel / atrace options).
+_LINE = re.compile(r"^\s*(?P<comm>.+?)-(?P<tid>\d+)\s+(?:\(\s*[\d-]+\)\s+)?\[\d+\]\s+(?:\S+\s+)?"
+                   r"(?P<ts>\d+\.\d+):\s+tracing_mark_write:\s+(?P<mark>.*)$")
+_FRAME_NUMBER = re.compile(r"\s+\d+$")   # "Choreographer#doFrame 123456" -> one name
+
+
+@dataclass
+class Slice:
+    pid: int
+    tid: int
+    name: str
+    start_s: float
+    duration_ms: float
+    depth: int
+
+
+def parse_atrace(text: str) -> list[Slice]:
+    """Every complete synchronous slice (``B``/``E`` pair) in an atrace text dump."""
+    slices: list[Slice] = []
+    stacks: dict[int, list[tuple[str, float, int]]] = {}   # tid -> open (name, start, pid)
+    for line in text.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        tid, ts, mark = int(m.group("tid")), float(m.group("ts")), m.group("mark").strip()
+        kind, _, rest = mark.partition("|")
+        stack = stacks.setdefault(tid, [])
+        if kind == "B":
+            pid, _, name = rest.partition("|")
+            stack.append((_FRAME_NUMBER.sub("", name.strip()), ts, int(pid) if pid.isdigit() else tid))
+        elif kind == "E" and stack:
+            name, start, pid = stack.pop()
+            slices.append(Slice(pid, tid, name, start, round((ts - start) * 1000, 3), len(stack)))
+    return slices
+
+
+def summarize_slices(slices: list[Slice], pids: list[int] | None = None, top: int = TOP_SLICES) -> dict:
+    """Per-name count / total / max (ms) of the main-thread slices of ``pids``, longest total first.
+
+    Without ``pids`` every main thread (tid == pid) in the trace counts. Only
+    top-level time is summed into ``busy_ms`` so nested slices are not counted twice.
+    """
+    main = [s for s in slices if s.tid == s.pid and (not pids or s.pid in pids)]
+    names: dict[str, dict] = {}
+    for s in main:
+        entry = names.setdefault(s.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += s.duration_ms
+        entry["max_ms"] = max(entry["max_ms"], s.duration_ms)
+    ranked = sorted(names.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:top]
+    return {
+        "slices": len(main),
+        "busy_ms": round(sum(s.duration_ms for s in main if s.depth == 0), 1),
+        "top": {name: {k: round(v, 2) if isinstance(v, float) else v for k, v in entry.items()}
+                for name, entry in ranked},
+    }
+
+
+class Tracer:
+    """One device's system trace, started and stopped around each test."""
+
+    def __init__(self, device, mode: str = "atrace", categories: tuple[str, ...] | None = None):
+        self.device = device
+        self.mode = device.trace_mode(mode)
+        self.categories = categories
+        self.running = False
+
+    def start(self) -> None:
+        # Marked first: a start that fails half-way may still have left a capture running.
+        self.running = True
+        self.device.trace_start(self.mode, self.categories)
+
+    def cancel(self) -> None:
+        """End a capture still running and discard it."""
+        if self.running:
+            self.running = False
+            self.device.trace_cancel(self.mode)
+
+    def stop(self, dest_dir: str, name: str) -> tuple[str | None, dict | None]:
+        """End the capture, save it as ``dest_dir/<name>.atrace.txt`` (or ``.pftrace``)
+        and return its path and, for atrace, the app main thread's slice summary."""
+        if not self.running:
+            return None, None
+        self.running = False
+        ext = "pftrace" if self.mode == "perfetto" else "atrace.txt"
+        path = self.device.trace_stop(self.mode, os.path.join(dest_dir, f"{name}.{ext}"))
+        if path is None or self.mode == "perfetto":
+            return path, None
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            slices = parse_atrace(fh.read())
+        return path, summarize_slices(slices, self.device.app_pids())
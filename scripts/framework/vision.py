@@ -0,0 +1,493 @@
+"""Array-based image analysis for the screenshot probes (cursor blob detection).
+
+The cursor arrow is a white fill inside a black outline, so finding it starts
+with the connected components of the near-white pixels. A per-pixel flood fill
+over a Python ``set`` costs millions of tuple operations on a white 1920x1080
+page; here the labelling works on row runs instead, with NumPy throughout:
+
+  1. :func:`runs` run-length encodes the mask: one ``(row, start, end)`` record
+     per horizontal stretch of set pixels (``end`` exclusive).
+  2. :func:`label_runs` links every run to the overlapping runs of the next row
+     (found with two ``searchsorted`` calls over the whole run table) and
+     resolves the links with a vectorised union-find: hook each link's larger
+     root under the smaller, then pointer-jump until every run points at its
+     root. Repeat until no link spans two roots.
+  3. :func:`components` folds the runs into one :data:`BLOB_DTYPE` record per
+     component: bounding box (inclusive), pixel area and centroid.
+
+Everything returns NumPy structured arrays, so ``blob["x0"]`` works on a row and
+``blobs["area"]`` on the table. :func:`white_blobs` is the one-call helper the
+probes use. tests/vision_bench.py times it against the old flood fill.
+
+:class:`CursorTracker` finds the arrow by shape instead: it renders the
+CursorView arrow at the device density (:func:`arrow_template`) and scores every
+placement with a masked normalised cross-correlation computed by FFT
+(:func:`match_template`). After the first lock it only searches a window around
+the last position, which is cheap enough for every frame of a stream.
+
+:class:`Frame` is a screen grab as an array (see :meth:`Device.frame`): a view
+straight onto the raw framebuffer bytes, optionally cropped to a region and
+subsampled, with PNG encoding left to an explicit :meth:`Frame.save`.
+
+:func:`compare_screens` is the perceptual diff behind :meth:`Device.assert_screen`:
+tile-wise SSIM on luminance, with a mask for regions whose content is expected
+to change (a clock, live page content).
+"""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# One horizontal run of set pixels: columns [start, end) of ``row``.
+RUN_DTYPE = np.dtype([("row", np.int32), ("start", np.int32), ("end", np.int32)])
+
+# One connected component. Bounds are inclusive pixel coordinates.
+BLOB_DTYPE = np.dtype([
+    ("x0", np.int32), ("y0", np.int32), ("x1", np.int32), ("y1", np.int32),
+    ("area", np.int64), ("cx", np.float64), ("cy", np.float64),
+])
+
+# Pixels above this on every channel count as "white" (the arrow fill is 255).
+WHITE_THRESH = 240
+
+
+@dataclass
+class Frame:
+    """One screen grab. ``pixels`` is (H, W, 4) uint8, read-only, usually a view.
+
+    ``origin`` and ``step`` record the crop and subsampling, so a position found
+    in the array maps back to the screen with :meth:`to_screen`.
+    """
+    pixels: np.ndarray
+    origin: tuple[int, int] = (0, 0)
+    step: int = 1
+    bgr: bool = False
+    timestamp: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_raw(cls, raw, roi: tuple[int, int, int, int] | None = None, step: int = 1) -> Frame:
+        """Wrap an ``adb.RawScreen`` without copying.
+
+        ``roi`` is ``(x0, y0, x1, y1)`` in screen pixels (exclusive end) and ``step``
+        keeps every n-th pixel in both directions; both are slices of the same buffer.
+        """
+        if raw.pixel_format not in (1, 2, 5):   # RGBA_8888, RGBX_8888, BGRA_8888
+            raise ValueError(f"unsupported screencap pixel format {raw.pixel_format}")
+        pixels = np.frombuffer(raw.data, dtype=np.uint8, count=raw.width * raw.height * 4,
+                               offset=raw.offset).reshape(raw.height, raw.width, 4)
+        x0 = y0 = 0
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            pixels = pixels[y0:y1, x0:x1]
+        return cls(pixels[::step, ::step], (x0, y0), step, raw.pixel_format == 5)
+
+    @classmethod
+    def from_image(cls, img) -> Frame:
+        """Wrap a PIL image (e.g. a saved screenshot) as a full-screen frame."""
+        return cls(np.asarray(img.convert("RGBA")))
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """(width, height) of the array, like ``PIL.Image.size``."""
+        return self.pixels.shape[1], self.pixels.shape[0]
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """The (H, W, 3) colour channels in RGB order (a view)."""
+        return self.pixels[:, :, 2::-1] if self.bgr else self.pixels[:, :, :3]
+
+    def to_screen(self, x: float, y: float) -> tuple[int, int]:
+        """Map array coordinates back to screen pixels."""
+        return int(self.origin[0] + x * self.step), int(self.origin[1] + y * self.step)
+
+    def image(self):
+        """A PIL image of the frame (copies; PIL is only imported here)."""
+        from PIL import Image
+        return Image.fromarray(np.ascontiguousarray(self.rgb))
+
+    def save(self, path: str) -> str:
+        """Encode the frame as a PNG at ``path`` (on the host) and return the path."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.image().save(path)
+        return path
+
+
+def white_mask(img, thresh: int = WHITE_THRESH) -> np.ndarray:
+    """Boolean (H, W) mask of the pixels brighter than ``thresh`` on R, G and B.
+
+    ``img`` is a :class:`Frame`, a PIL image or an (H, W, 3|4) RGB(A) uint8 array.
+    """
+    if isinstance(img, Frame):
+        img = img.rgb
+    elif hasattr(img, "convert"):
+        img = img.convert("RGB")
+    a = np.asarray(img)
+    return np.all(a[:, :, :3] > thresh, axis=2)
+
+
+def runs(mask: np.ndarray) -> np.ndarray:
+    """Run-length encode a boolean mask into :data:`RUN_DTYPE` records, row-major."""
+    h, w = mask.shape
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    # nonzero() is row-major and runs in a row are disjoint, so starts and ends pair up.
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    out = np.empty(rows.size, dtype=RUN_DTYPE)
+    out["row"], out["start"], out["end"] = rows, starts, ends
+    return out
+
+
+def _links(table: np.ndarray, width: int, connectivity: int) -> tuple[np.ndarray, np.ndarray]:
+    """Index pairs (a, b) of runs in consecutive rows that touch."""
+    stride = width + 2   # > any column, so row * stride + column sorts row-major
+    reach = 1 if connectivity == 8 else 0
+    row = table["row"].astype(np.int64)
+    start_key = row * stride + table["start"]
+    end_key = row * stride + table["end"]
+    below = (row + 1) * stride
+    # Runs b of the next row with start_b < end_a + reach and end_b > start_a - reach.
+    lo = np.searchsorted(end_key, below + table["start"] - reach, side="right")
+    hi = np.searchsorted(start_key, below + table["end"] + reach, side="left")
+    counts = np.maximum(hi - lo, 0)
+    a = np.repeat(np.arange(table.size), counts)
+    offsets = np.arange(a.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    b = np.repeat(lo, counts) + offsets
+    return a, b
+
+
+def label_runs(table: np.ndarray, width: int, connectivity: int = 4) -> tuple[np.ndarray, int]:
+    """Component index (0..n-1, in row-major order of appearance) for every run, and n.
+
+    ``connectivity`` is 4 (runs must share a column) or 8 (diagonal contact counts).
+    """
+    if connectivity not in (4, 8):
+        raise ValueError(f"connectivity must be 4 or 8, got {connectivity}")
+    parent = np.arange(table.size)
+    if table.size == 0:
+        return parent, 0
+    a, b = _links(table, width, connectivity)
+    while True:
+        ra, rb = parent[a], parent[b]
+        split = ra != rb
+        if not split.any():
+            break
+        ra, rb = ra[split], rb[split]
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+    # Roots are the smallest run index of their component, so this keeps row-major order.
+    _, labels = np.unique(parent, return_inverse=True)
+    return labels, int(labels.max()) + 1
+
+
+def components(mask: np.ndarray, connectivity: int = 4, min_area: int = 0) -> np.ndarray:
+    """The connected components of ``mask`` as :data:`BLOB_DTYPE` records, largest first."""
+    table = runs(mask)
+    labels, n = label_runs(table, mask.shape[1], connectivity)
+    out = np.zeros(n, dtype=BLOB_DTYPE)
+    if n == 0:
+        return out
+    row, start, end = table["row"], table["start"], table["end"]
+    length = (end - start).astype(np.int64)
+    out["x0"], out["y0"] = np.iinfo(np.int32).max, np.iinfo(np.int32).max
+    out["x1"], out["y1"] = -1, -1
+    for field, values, reduce in (("x0", start, np.minimum), ("x1", end - 1, np.maximum),
+                                  ("y0", row, np.minimum), ("y1", row, np.maximum)):
+        column = out[field].copy()
+        reduce.at(column, labels, values)
+        out[field] = column
+    area = np.bincount(labels, weights=length, minlength=n)
+    # Sum of the columns start..end-1 of a run = length * (start + end - 1) / 2.
+    sum_x = np.bincount(labels, weights=length * (start + end - 1) / 2.0, minlength=n)
+    sum_y = np.bincount(labels, weights=length * row, minlength=n)
+    out["area"] = area
+    out["cx"], out["cy"] = sum_x / area, sum_y / area
+    out = out[out["area"] >= min_area]
+    return out[np.argsort(-out["area"], kind="stable")]
+
+
+def white_blobs(img, thresh: int = WHITE_THRESH, min_area: int = 0, connectivity: int = 4) -> np.ndarray:
+    """The white components of a screenshot (see :func:`white_mask`), largest first."""
+    return components(white_mask(img, thresh), connectivity, min_area)
+
+
+# The TV cursor arrow's white fill, calibrated on sanity_on.png: 39x58 px, area
+# ~971, tall and narrow (h/w ~1.5) where page content is square or wide. The
+# logical point is the arrow TIP, the top-left of the blob.
+ARROW_MIN_W, ARROW_MIN_H = 25, 40
+ARROW_ASPECT = (1.20, 2.10)
+ARROW_AREA = (500, 4000)
+
+
+def arrow_blobs(blobs: np.ndarray, step: int = 1) -> np.ndarray:
+    """The blobs shaped like the cursor arrow's fill, largest first.
+
+    ``step`` is the subsampling of the frame the blobs came from; the size
+    limits shrink with it.
+    """
+    w = (blobs["x1"] - blobs["x0"] + 1) * step
+    h = (blobs["y1"] - blobs["y0"] + 1) * step
+    aspect = h / np.maximum(w, 1)
+    area = blobs["area"] * step * step
+    keep = ((w >= ARROW_MIN_W) & (h >= ARROW_MIN_H)
+            & (aspect >= ARROW_ASPECT[0]) & (aspect <= ARROW_ASPECT[1])
+            & (area >= ARROW_AREA[0]) & (area <= ARROW_AREA[1]))
+    return blobs[keep]
+
+
+def cursor_tip(frame: Frame) -> tuple[int, int] | None:
+    """Screen position of the cursor arrow's tip in ``frame``, or None if no arrow is seen."""
+    arrows = arrow_blobs(white_blobs(frame, min_area=max(1, ARROW_AREA[0] // (frame.step * frame.step))),
+                         frame.step)
+    if not arrows.size:
+        return None
+    return frame.to_screen(arrows[0]["x0"], arrows[0]["y0"])
+
+
+# --- Template matching ---------------------------------------------------------
+# CursorView draws the ic_arrow_selector_tool_fill vector (960x960 viewport) at
+# 36dp, white, over a copy grown by 2.5dp on every side in 200/255 black. The tip
+# at viewport (240, 80) is the hotspot, the logical cursor point.
+ARROW_PATH = ((551, 880), (406, 568), (240, 800), (240, 80), (800, 520), (516, 520), (660, 829))
+ARROW_VIEWPORT = 960
+ARROW_TIP = (240, 80)
+ARROW_SIZE_DP = 36.0
+ARROW_OUTLINE_DP = 2.5
+ARROW_OUTLINE_ALPHA = 200 / 255
+
+# Below this normalised correlation the best match is not taken for the cursor.
+MATCH_MIN_SCORE = 0.6
+
+
+def _coverage(polygon, size: int, scale: float, offset: float, supersample: int = 4) -> np.ndarray:
+    """Anti-aliased (size, size) coverage of ``polygon`` scaled by ``scale`` and shifted by ``offset``."""
+    n = size * supersample
+    centers = (np.arange(n) + 0.5) / supersample
+    ys, xs = np.meshgrid(centers, centers, indexing="ij")
+    inside = np.zeros((n, n), dtype=bool)
+    pts = [(x * scale + offset, y * scale + offset) for x, y in polygon]
+    for (x0, y0), (x1, y1) in zip(pts, pts[1:] + pts[:1]):   # even-odd rule
+        if y0 == y1:
+            continue
+        crosses = (ys >= min(y0, y1)) & (ys < max(y0, y1))
+        x_at = x0 + (ys - y0) * (x1 - x0) / (y1 - y0)
+        inside ^= crosses & (xs < x_at)
+    return inside.reshape(size, supersample, size, supersample).mean(axis=(1, 3))
+
+
+def arrow_template(density_dpi: int, step: int = 1) -> tuple[np.ndarray, np.ndarray, tuple[float, float]]:
+    """The cursor arrow as CursorView draws it at ``density_dpi``, subsampled by ``step``.
+
+    Returns the luminance template (0-255, as over a white page), the mask of
+    the pixels the arrow covers, and the tip position within the template.
+    """
+    density = density_dpi / 160.0 / step
+    size = ARROW_SIZE_DP * density
+    o = ARROW_OUTLINE_DP * density
+    canvas = int(np.ceil(size + 2 * o))
+    outline = _coverage(ARROW_PATH, canvas, (size + 2 * o) / ARROW_VIEWPORT, 0.0)
+    fill = _coverage(ARROW_PATH, canvas, size / ARROW_VIEWPORT, o)
+    luma = 255.0 * (1 - ARROW_OUTLINE_ALPHA * outline)
+    luma = luma * (1 - fill) + 255.0 * fill
+    mask = np.maximum(outline, fill) >= 0.5
+    tip = (o + size * ARROW_TIP[0] / ARROW_VIEWPORT, o + size * ARROW_TIP[1] / ARROW_VIEWPORT)
+    return luma.astype(np.float32), mask, tip
+
+
+def luminance(img) -> np.ndarray:
+    """(H, W) float32 luminance of a :class:`Frame`, PIL image or RGB(A) array."""
+    if isinstance(img, Frame):
+        img = img.rgb
+    elif hasattr(img, "convert"):
+        img = img.convert("RGB")
+    a = np.asarray(img)[:, :, :3].astype(np.float32)
+    return a @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _fast_len(n: int) -> int:
+    """The smallest 2^a 3^b 5^c >= n (FFT sizes NumPy transforms quickly)."""
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            p = p35
+            while p < n:
+                p *= 2
+            best = min(best, p)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def _correlate(image_f: np.ndarray, kernel: np.ndarray, shape: tuple[int, int],
+               valid: tuple[int, int]) -> np.ndarray:
+    """Valid-mode cross-correlation, given the image's rfft2 over ``shape``."""
+    kernel_f = np.fft.rfft2(kernel[::-1, ::-1], shape)
+    full = np.fft.irfft2(image_f * kernel_f, shape)
+    kh, kw = kernel.shape
+    return full[kh - 1:kh - 1 + valid[0], kw - 1:kw - 1 + valid[1]]
+
+
+def match_template(image: np.ndarray, template: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Masked normalised cross-correlation of ``template`` over every position of ``image``.
+
+    Only the pixels under ``mask`` take part, so the page behind the arrow does
+    not matter. Computed with three FFT correlations; the result has one score
+    in [-1, 1] per top-left placement (shape ``image - template + 1``).
+    """
+    th, tw = template.shape
+    valid = (image.shape[0] - th + 1, image.shape[1] - tw + 1)
+    if valid[0] <= 0 or valid[1] <= 0:
+        return np.empty((0, 0), dtype=np.float32)
+    shape = (_fast_len(image.shape[0] + th - 1), _fast_len(image.shape[1] + tw - 1))
+    m = mask.astype(np.float64)
+    n = m.sum()
+    t = np.where(mask, template - template[mask].mean(), 0.0)
+    image = image.astype(np.float64)
+    image_f = np.fft.rfft2(image, shape)
+    num = _correlate(image_f, t, shape, valid)
+    sum_i = _correlate(image_f, m, shape, valid)
+    sum_i2 = _correlate(np.fft.rfft2(image * image, shape), m, shape, valid)
+    var = np.maximum(sum_i2 - sum_i * sum_i / n, 0.0)
+    denom = np.sqrt(var * (t * t).sum())
+    flat = denom < 1e-3 * n   # a uniform patch: no evidence either way
+    score = np.where(flat, 0.0, num / np.where(flat, 1.0, denom))
+    return score.astype(np.float32)
+
+
+class CursorTracker:
+    """Find the cursor arrow by template matching, then follow it in a window.
+
+    The first :meth:`locate` (or any after the arrow was lost) searches the
+    whole frame; once locked, only ``radius`` pixels around the last position
+    are searched, which keeps the per-frame cost small for streaming capture.
+    """
+
+    def __init__(self, density_dpi: int, step: int = 1, radius: int = 120,
+                 min_score: float = MATCH_MIN_SCORE):
+        self.template, self.mask, self.tip = arrow_template(density_dpi, step)
+        self.step = step
+        self.radius = max(1, radius // step)
+        self.min_score = min_score
+        self.last: tuple[int, int] | None = None   # top-left placement, frame array pixels
+        self.score = 0.0
+
+    def _search(self, image: np.ndarray, x0: int, y0: int) -> tuple[tuple[int, int], float]:
+        scores = match_template(image, self.template, self.mask)
+        if not scores.size:
+            return (x0, y0), 0.0
+        y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        return (x0 + int(x), y0 + int(y)), float(scores[y, x])
+
+    def locate(self, frame: Frame) -> tuple[int, int] | None:
+        """Screen position of the arrow tip in ``frame``, or None if it is not found."""
+        rgb = frame.rgb
+        found = None
+        if self.last is not None:
+            th, tw = self.template.shape
+            x0, y0 = max(0, self.last[0] - self.radius), max(0, self.last[1] - self.radius)
+            window = rgb[y0:self.last[1] + th + self.radius, x0:self.last[0] + tw + self.radius]
+            found = self._search(luminance(window), x0, y0)
+        if found is None or found[1] < self.min_score:
+            found = self._search(luminance(rgb), 0, 0)
+        (x, y), self.score = found
+        if self.score < self.min_score:
+            self.last = None
+            return None
+        self.last = (x, y)
+        return frame.to_screen(x + self.tip[0], y + self.tip[1])
+
+    __call__ = locate
+
+
+# --- Perceptual diff -------------------------------------------------------------
+# Tile-wise SSIM on luminance (0-255): a tile passes at or above SSIM_MIN.
+SSIM_TILE = 16
+SSIM_MIN = 0.95
+_SSIM_C1 = (0.01 * 255) ** 2
+_SSIM_C2 = (0.03 * 255) ** 2
+
+
+def rect_mask(shape: tuple[int, int], rects) -> np.ndarray:
+    """A (H, W) boolean mask, True inside any ``(x0, y0, x1, y1)`` rect (exclusive end)."""
+    mask = np.zeros(shape, dtype=bool)
+    for x0, y0, x1, y1 in rects:
+        mask[max(0, y0):y1, max(0, x0):x1] = True
+    return mask
+
+
+def ssim_tiles(a: np.ndarray, b: np.ndarray, tile: int = SSIM_TILE,
+               ignore: np.ndarray | None = None) -> np.ndarray:
+    """SSIM of each ``tile`` x ``tile`` block of two (H, W) luminance images.
+
+    Pixels under ``ignore`` (True = dynamic content) are left out of every
+    statistic; a tile that is entirely ignored scores NaN. Partial tiles at the
+    right and bottom edges are dropped.
+    """
+    h, w = (a.shape[0] // tile) * tile, (a.shape[1] // tile) * tile
+    shape = (h // tile, tile, w // tile, tile)
+    a = a[:h, :w].astype(np.float64).reshape(shape)
+    b = b[:h, :w].astype(np.float64).reshape(shape)
+    weight = np.ones(shape) if ignore is None else (~ignore[:h, :w]).astype(np.float64).reshape(shape)
+    n = weight.sum(axis=(1, 3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_a = (weight * a).sum(axis=(1, 3)) / n
+        mean_b = (weight * b).sum(axis=(1, 3)) / n
+        da = a - mean_a[:, None, :, None]
+        db = b - mean_b[:, None, :, None]
+        var_a = (weight * da * da).sum(axis=(1, 3)) / n
+        var_b = (weight * db * db).sum(axis=(1, 3)) / n
+        cov = (weight * da * db).sum(axis=(1, 3)) / n
+        ssim = (((2 * mean_a * mean_b + _SSIM_C1) * (2 * cov + _SSIM_C2))
+                / ((mean_a ** 2 + mean_b ** 2 + _SSIM_C1) * (var_a + var_b + _SSIM_C2)))
+    return np.where(n > 0, ssim, np.nan)
+
+
+@dataclass
+class ScreenDiff:
+    """The outcome of :func:`compare_screens`."""
+    worst: float
+    mean: float
+    tile: int
+    failed: list[tuple[int, int, int, int]]   # (x0, y0, x1, y1) of every tile under the threshold
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def summary(self) -> dict:
+        return {"ssim_worst": round(self.worst, 4), "ssim_mean": round(self.mean, 4),
+                "failed_tiles": len(self.failed)}
+
+
+def compare_screens(a, b, ignore: np.ndarray | None = None, tile: int = SSIM_TILE,
+                    min_ssim: float = SSIM_MIN) -> ScreenDiff:
+    """Tile-wise SSIM of two screens (Frames, PIL images or arrays of the same size)."""
+    la, lb = luminance(a), luminance(b)
+    if la.shape != lb.shape:
+        raise ValueError(f"screens differ in size: {la.shape[::-1]} vs {lb.shape[::-1]}")
+    scores = ssim_tiles(la, lb, tile, ignore)
+    rows, cols = np.nonzero(scores < min_ssim)   # NaN (fully ignored) compares False
+    failed = [(int(c) * tile, int(r) * tile, (int(c) + 1) * tile, (int(r) + 1) * tile)
+              for r, c in zip(rows, cols)]
+    if np.isnan(scores).all():
+        return ScreenDiff(1.0, 1.0, tile, failed)
+    return ScreenDiff(float(np.nanmin(scores)), float(np.nanmean(scores)), tile, failed)
+
+
+def diff_overlay(a, diff: ScreenDiff):
+    """A PIL image of ``a`` dimmed, with the failed tiles of ``diff`` tinted red."""
+    from PIL import Image
+    rgb = (np.asarray(a.rgb if isinstance(a, Frame) else a)[:, :, :3] * 0.5).astype(np.uint8)
+    for x0, y0, x1, y1 in diff.failed:
+        rgb[y0:y1, x0:x1, 0] = 255
+    return Image.fromarray(rgb)
@@ -0,0 +1,19 @@
+// Page-event reporting for the host test server (scripts/framework/server.py).
+//
+// report(name[, data]) sets document.title (which Fulguris mirrors into the
+// toolbar label, the original oracle) and posts the event, with any JSON-able
+// data, to /beacon, where the test reads it within milliseconds through
+// Device.page_events / wait_page_event.
+// The page URL's "dev" parameter tells the server which device reported it.
+(function () {
+  var dev = new URLSearchParams(location.search).get('dev') || '';
+  window.report = function (name, data) {
+    document.title = name;
+    var body = JSON.stringify({dev: dev, event: String(name), data: data === undefined ? null : data,
+                               page: location.pathname, t: performance.now()});
+    try {
+      if (navigator.sendBeacon && navigator.sendBeacon('/beacon', body)) return;
+    } catch (e) {}
+    try { fetch('/beacon', {method: 'POST', body: body, keepalive: true}); } catch (e) {}
+  };
+})();
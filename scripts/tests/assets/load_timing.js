@@ -0,0 +1,27 @@
+// Page-load timing for scripts/tests/page_load_bench.py: once the page has
+// loaded, report('timing', {...}) sends its Navigation Timing milestones (ms
+// from the start of the navigation) and a Resource Timing summary to the host.
+// Needs beacon.js first.
+(function () {
+  if (performance.setResourceTimingBufferSize) performance.setResourceTimingBufferSize(2000);
+  window.addEventListener('load', function () {
+    setTimeout(function () {   // loadEventEnd is only set once the load handlers have returned
+      var nav = performance.getEntriesByType ? performance.getEntriesByType('navigation')[0] : null;
+      if (!nav) {              // Navigation Timing level 1 (older WebViews): absolute epoch times
+        var t = performance.timing, t0 = t.navigationStart;
+        nav = {responseStart: t.responseStart - t0, domInteractive: t.domInteractive - t0,
+               domContentLoadedEventEnd: t.domContentLoadedEventEnd - t0,
+               loadEventEnd: t.loadEventEnd - t0, transferSize: null};
+      }
+      var res = performance.getEntriesByType ? performance.getEntriesByType('resource') : [];
+      var end = 0, bytes = 0;
+      res.forEach(function (r) { end = Math.max(end, r.responseEnd); bytes += r.transferSize || 0; });
+      report('timing', {
+        ttfb: nav.responseStart, dom_interactive: nav.domInteractive,
+        dcl: nav.domContentLoadedEventEnd, load: nav.loadEventEnd, bytes: nav.transferSize,
+        resources: res.length, resources_end: end, resource_bytes: bytes,
+        nodes: document.getElementsByTagName('*').length
+      });
+    }, 0);
+  });
+})();
@@ -0,0 +1,58 @@
+// Background load for the generated stress pages (scripts/framework/pages.py).
+// window.STRESS (set by the page) configures it; every rate is in ms, 0 = off:
+//
+//   timers/timer_ms/work    "timers" intervals, each running a loop of "work"
+//                           iterations every timer_ms (a busy page's scripts)
+//   theme_ms                flip <meta name="theme-color"> (Fulguris reports each
+//                           change through the console, see theme_flipper.html)
+//   console_ms/console_burst  console.log "console_burst" messages every console_ms
+//
+// It also measures scrolling from the page's side: frames are timed with
+// requestAnimationFrame while the page scrolls, and once scrolling has been
+// idle for 600 ms report('scroll', {...}) sends the frame-interval figures.
+// Needs beacon.js first.
+(function () {
+  var cfg = window.STRESS || {};
+
+  for (var i = 0; i < (cfg.timers || 0); i++) {
+    setInterval(function () {
+      var acc = 0;
+      for (var j = 0; j < (cfg.work || 0); j++) acc = (acc * 31 + j) % 9973;
+      window.__acc = acc;
+    }, cfg.timer_ms || 100);
+  }
+
+  if (cfg.theme_ms) {
+    var meta = document.querySelector('meta[name="theme-color"]');
+    var colors = ['#123456', '#234561', '#345612', '#456123'];
+    var flip = 1;
+    setInterval(function () { meta.content = colors[flip++ % colors.length]; }, cfg.theme_ms);
+  }
+
+  if (cfg.console_ms) {
+    var sent = 0;
+    setInterval(function () {
+      for (var k = 0; k < (cfg.console_burst || 1); k++) console.log('stress message ' + (sent++));
+    }, cfg.console_ms);
+  }
+
+  var frames = [], last = 0, idle = null, start = 0;
+  function tick(now) {
+    if (idle === null) return;   // scrolling ended (done() has reported)
+    if (last) frames.push(now - last);
+    last = now;
+    requestAnimationFrame(tick);
+  }
+  function done() {
+    var sorted = frames.slice().sort(function (a, b) { return a - b; });
+    function q(p) { return sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))] : null; }
+    report('scroll', {frames: frames.length, p50: q(0.5), p90: q(0.9), max: sorted.length ? sorted[sorted.length - 1] : null,
+                      long: sorted.filter(function (d) { return d > 50; }).length,
+                      distance: Math.round(window.scrollY - start)});
+    frames = []; last = 0; idle = null;
+  }
+  window.addEventListener('scroll', function () {
+    if (idle === null) { start = window.scrollY; requestAnimationFrame(tick); } else clearTimeout(idle);
+    idle = setTimeout(done, 600);
+  }, {passive: true});
+})();
@@ -13,6 +13,11 @@ file:// URLs.
 Tests take a :class:`framework.Device`; the cursor suite is Android-only, so it uses the
 Android-specific extras (`device.reverse`, `device.read_prefs`/`write_prefs`) where needed.
 
+The movement, edge-scroll and wheel tests also wrap their D-pad/media-key bursts in
+`device.frame_stats()` and record the frame timing (jank %, p50/p90/p99) in the test's metrics.
+The frame budgets below are only asserted with `run.py --perf`, so a slow device never fails the
+functional suite on timing alone.
+
 ## Feature groups
 
 Tests are grouped so a subset relevant to one feature can be run on its own:
@@ -29,74 +34,30 @@ Tests are grouped so a subset relevant to one feature can be run on its own:
 """
 from __future__ import annotations
 
-import atexit
 import os
 import re
 import sys
-import threading
 import time
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from framework import keys
-
-ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
-PORT = 8899
-
-_server: ThreadingHTTPServer | None = None
-_reversed: dict = {}  # device.id -> device, for reverse-tunnel teardown at exit
-
-
-class _NoCacheHandler(SimpleHTTPRequestHandler):
-    """Serve the assets dir and forbid caching, so each navigation fetches a fresh page.
+from framework import Macro, keys, server
 
-    (The WebView otherwise caches cursor_target.html and revalidates with 304, which would serve
-    a stale copy after the page is edited.)
-    """
+PORT = server.PORT
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=ASSETS_DIR, **kwargs)
-
-    def send_header(self, key, value):  # suppress Last-Modified so the client never sends 304
-        if key.lower() == "last-modified":
-            return
-        super().send_header(key, value)
-
-    def end_headers(self):
-        self.send_header("Cache-Control", "no-store, must-revalidate")
-        self.send_header("Expires", "0")
-        super().end_headers()
-
-    def log_message(self, *args):  # keep the test output clean
-        pass
+_server = None  # this suite's reference on the shared host server (framework.server)
+_page_since: dict = {}  # device.id -> time the current page was opened (older page events are stale)
 
 
 def _ensure_server() -> None:
-    """Start a host HTTP server serving the assets dir once, in a daemon thread."""
+    """Start (or share) the host HTTP server serving the assets dir, once per process."""
     global _server
-    if _server is not None:
-        return
-    _server = ThreadingHTTPServer(("127.0.0.1", PORT), _NoCacheHandler)
-    threading.Thread(target=_server.serve_forever, daemon=True).start()
-    atexit.register(_teardown)
-
-
-def _teardown() -> None:
-    for device in list(_reversed.values()):
-        try:
-            device.reverse_remove(PORT)
-        except Exception:  # noqa: BLE001
-            pass
-    if _server is not None:
-        _server.shutdown()
+    if _server is None:
+        _server = server.acquire()
 
 
 def _ensure_reverse(device) -> None:
     """Point the device's localhost:PORT at the host server via an adb reverse tunnel."""
-    if device.id in _reversed:
-        return
-    device.reverse(PORT)
-    _reversed[device.id] = device
+    server.shared().attach(device)
 
 
 # Cursor speed/acceleration/fade are user settings that persist on the device. Reset them to known
@@ -110,25 +71,15 @@ _CURSOR_TEST_PREFS = {
 }
 
 
-def _prefs_path(package: str) -> str:
-    return f"shared_prefs/{package}_preferences.xml"
-
-
 def _reset_cursor_prefs(device) -> None:
-    """Force the cursor speed/accel/fade prefs to known test values (host-side rewrite of the XML)."""
+    """Force the cursor speed/accel/fade prefs to known test values (see framework.prefs)."""
     if device.id in _prefs_reset:
         return
     _prefs_reset.add(device.id)
-    # App must be stopped so it doesn't overwrite the file on exit and reloads our values next launch.
-    device.force_stop()
-    xml = device.read_prefs(_prefs_path(device.package))
-    if "<map" not in xml:
-        return  # prefs not initialized yet; the code defaults will apply
-    for key, val in _CURSOR_TEST_PREFS.items():
-        entry = f'<int name="{key}" value="{val}" />'
-        pat = re.compile(rf'<int name="{re.escape(key)}" value="-?\d+" />')
-        xml = pat.sub(entry, xml) if pat.search(xml) else xml.replace("</map>", f"    {entry}\n</map>")
-    device.write_prefs(_prefs_path(device.package), xml)
+    # One transaction: stops the app, and writes only if a value differs.
+    with device.prefs() as prefs:
+        if prefs.exists:   # else prefs not initialized yet; the code defaults will apply
+            prefs.update(_CURSOR_TEST_PREFS)
 
 
 def _load_page(device, page: str) -> None:
@@ -140,8 +91,8 @@ def _load_page(device, page: str) -> None:
     if _overlay_present(device):
         _toggle(device)
     # Cache-bust so a stale copy is never used even if no-store were ignored.
-    url = f"http://localhost:{PORT}/{page}?cb={int(time.time() * 1000)}"
-    device.navigate(url, reset=True)
+    _page_since[device.id] = time.time()
+    device.navigate(server.shared().url(page, device=device), reset=True)
 
 
 def _load_target(device) -> None:
@@ -163,7 +114,10 @@ def _toggle(device) -> None:
 
 
 def _title(device) -> str:
-    return device.field_text()
+    """What the page last reported: its latest /beacon event (milliseconds), else the title
+    Fulguris mirrors into the address field (a uiautomator dump)."""
+    events = device.page_events(_page_since.get(device.id, 0.0))
+    return events[-1]["event"] if events else device.field_text()
 
 
 def _click_coords(device) -> tuple[int, int] | None:
@@ -173,6 +127,23 @@ def _click_coords(device) -> tuple[int, int] | None:
     return (int(m.group(1)), int(m.group(2))) if m else None
 
 
+# Optional frame-timing budgets for cursor movement / scrolling (asserted with run.py --perf).
+# Generous on purpose: they catch a regression to visibly stuttering, not a missed frame or two.
+PERF_MAX_JANK_PCT = 25.0
+PERF_MAX_P90_MS = 50.0
+
+
+def _check_frames(ctx: dict, what: str, stats) -> None:
+    """Record a burst's frame timing in the test metrics; enforce the budgets under --perf."""
+    ctx.setdefault("metrics", {})[f"frames_{what}"] = stats.summary()
+    if not ctx.get("perf") or not stats.frames:
+        return
+    assert stats.jank_pct <= PERF_MAX_JANK_PCT, \
+        f"{what}: {stats.jank_pct:.1f}% janky frames (budget {PERF_MAX_JANK_PCT}%) - {stats}"
+    assert stats.p90_ms <= PERF_MAX_P90_MS, \
+        f"{what}: p90 frame time {stats.p90_ms:.1f} ms (budget {PERF_MAX_P90_MS} ms) - {stats}"
+
+
 def _focused_resource_id(device) -> str:
     for n in device.nodes():
         if n.focused:
@@ -215,10 +186,11 @@ def test_cursor_movement_dpad_right_moves_right(device, ctx: dict) -> None:
     _toggle(device)
     center = _click_coords(device)
     assert center is not None, "click at center should report coordinates"
-    for _ in range(8):
-        device.key(keys.DPAD_RIGHT, wait=0.15)
+    with device.frame_stats() as frames:
+        device.key_sequence([keys.DPAD_RIGHT], repeat=8, inter_key_ms=150, wait=0.15)
     moved = _click_coords(device)
     assert moved is not None, "click after moving should report coordinates"
+    _check_frames(ctx, "dpad_right", frames)
     assert moved[0] > center[0] + 10, f"D-pad right should increase X: {center} -> {moved}"
     assert abs(moved[1] - center[1]) <= 10, f"D-pad right should not change Y much: {center} -> {moved}"
     _toggle(device)
@@ -229,10 +201,11 @@ def test_cursor_movement_dpad_down_moves_down(device, ctx: dict) -> None:
     _toggle(device)
     center = _click_coords(device)
     assert center is not None, "click at center should report coordinates"
-    for _ in range(4):
-        device.key(keys.DPAD_DOWN, wait=0.15)
+    with device.frame_stats() as frames:
+        device.key_sequence([keys.DPAD_DOWN], repeat=4, inter_key_ms=150, wait=0.15)
     moved = _click_coords(device)
     assert moved is not None, "click after moving should report coordinates"
+    _check_frames(ctx, "dpad_down", frames)
     assert moved[1] > center[1] + 10, f"D-pad down should increase Y: {center} -> {moved}"
     _toggle(device)
 
@@ -242,12 +215,15 @@ def test_cursor_movement_edge_scrolls_page(device, ctx: dict) -> None:
     _toggle(device)
     # Drive to the bottom edge and keep pushing; once clamped, further pushes scroll the page via a
     # synthetic mouse wheel at the cursor point. Enough presses to traverse from center to the edge
-    # even at a modest speed and with the odd dropped key event on a slow network device.
-    for _ in range(140):
-        device.key(keys.DPAD_DOWN, wait=0.03)
+    # even at a modest speed and with the odd dropped key event on a slow network device. Played as
+    # one on-device macro: one adb call instead of 140, with a cadence that does not depend on the
+    # network.
+    with device.frame_stats() as frames:
+        device.play(Macro().key(keys.DPAD_DOWN, repeat=140, interval=0.03))
     title = _title(device)
     m = re.fullmatch(r"sy(\d+)", title.strip())
     assert m and int(m.group(1)) > 0, f"pushing past the bottom edge should scroll the page, title was '{title}'"
+    _check_frames(ctx, "edge_scroll", frames)
     _toggle(device)
 
 
@@ -296,7 +272,9 @@ def test_cursor_click_drag_target_seeks(device, ctx: dict) -> None:
     # the freshly-centered cursor lands on it.
     _load_page(device, "scrub_target.html")
     _toggle(device)
-    device.key(keys.DPAD_CENTER, wait=0.8)
+    sent = time.time()
+    device.key(keys.DPAD_CENTER, wait=0.0)
+    device.wait_page_event("seek@*", timeout=2.0, since=sent)
     assert _title(device).startswith("seek@"), \
         f"a cursor click on a drag-only scrub bar should seek, title was '{_title(device)}'"
     _toggle(device)
@@ -367,8 +345,7 @@ def test_cursor_fullscreen_click_reaches_custom_view(device, ctx: dict) -> None:
     assert _title(device) == "fs-on", f"tapping should enter fullscreen, title was '{_title(device)}'"
     _toggle(device)  # turn the cursor on while fullscreen
     assert _overlay_present(device), "the cursor overlay should be visible over the fullscreen view"
-    for _ in range(3):
-        device.key(keys.DPAD_RIGHT, wait=0.15)
+    device.key_sequence([keys.DPAD_RIGHT], repeat=3, inter_key_ms=150, wait=0.15)
     device.key(keys.DPAD_CENTER, wait=0.8)
     assert _title(device).startswith("fsclick@"), \
         f"a click in fullscreen must reach the fullscreen view, title was '{_title(device)}'"
@@ -404,11 +381,13 @@ def test_cursor_wheel_ff_rewind_scrolls(device, ctx: dict) -> None:
     _load_target(device)
     _toggle(device)  # cursor on; centered, page at the top (sy=0)
     # In cursor mode rewind is a mouse wheel scroll DOWN at the cursor.
-    device.key(keys.MEDIA_REWIND, wait=0.9)
+    with device.frame_stats() as frames:
+        device.key(keys.MEDIA_REWIND, wait=0.9)
     t1 = _title(device)
     m1 = re.fullmatch(r"sy(\d+)", t1.strip())
     assert m1 and int(m1.group(1)) > 0, f"rewind in cursor mode should wheel-scroll down, title was '{t1}'"
     down = int(m1.group(1))
+    _check_frames(ctx, "wheel_scroll", frames)
     # Fast-forward is a mouse wheel scroll UP.
     device.key(keys.MEDIA_FAST_FORWARD, wait=0.9)
     device.key(keys.MEDIA_FAST_FORWARD, wait=0.9)
@@ -435,9 +414,7 @@ def test_cursor_youtube_scrubber_seek(device, ctx: dict) -> None:
     # edge. bar-miss would mean the controls had hidden (hover not keeping alive).
     title = ""
     for _ in range(12):
-        for _ in range(5):
-            device.key(keys.DPAD_DOWN, wait=0.03)
-        device.key(keys.DPAD_CENTER, wait=0.6)
+        device.play(Macro().key(keys.DPAD_DOWN, repeat=5, interval=0.03).key(keys.DPAD_CENTER), wait=0.6)
         title = _title(device).strip()
         if title.startswith("seek@") or title == "bar-miss":
             break
@@ -456,8 +433,7 @@ def test_cursor_youtube_scrubber_seek_after_idle(device, ctx: dict) -> None:
     _load_page(device, "yt_scrub.html")
     _toggle(device)
     assert _title(device).strip() == "ctrl-shown", "cursor enable should show player controls"
-    for _ in range(50):
-        device.key(keys.DPAD_DOWN, wait=0.03)
+    device.play(Macro().key(keys.DPAD_DOWN, repeat=50, interval=0.03), wait=0.0)
     time.sleep(4.0)  # longer than yt_scrub.html's 3 s auto-hide
     # Controls auto-hid. The pre-click hover (dispatchHover) + 80 ms delay gives YouTube
     # time to re-show controls before BUTTON_PRESS fires, so the click still seeks.
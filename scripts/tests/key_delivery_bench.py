@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark: key-event delivery rate versus send cadence, per device.
+
+Sends bursts of one D-pad key at a sweep of cadences and counts how many presses
+the app actually received (see framework/keyrate.py). Each ``--paths`` entry is
+its own curve: ``key`` is the host-side ``wait`` between ``Device.key`` calls,
+``sequence`` the on-device ``inter_key_ms`` of one ``Device.key_sequence`` call. The default counter is the local
+``assets/key_counter.html`` page, which counts ``keydown`` events and mirrors the
+total into its title; ``--source logcat --grep TEXT [--pattern REGEX]`` counts
+matching log lines instead (e.g. the app's KEY traces when the build has them).
+
+The delivery-rate curve is saved to the results store
+(``results/<MODEL>/bench/key-delivery-*``), with the recommended cadence of each
+path - the fastest one that still delivers ``--min-rate`` of the keys. The
+cursor steering loop of toolbar_field_test.py sends its bursts through
+``key_sequence`` and reads the ``sequence`` recommendation
+(keyrate.recommended_wait) instead of the fixed STEER_WAIT.
+
+    python scripts/tests/key_delivery_bench.py --device 192.168.178.67:5555
+    python scripts/tests/key_delivery_bench.py --all --cadences 0,0.05,0.1,0.2 --presses 40
+    python scripts/tests/key_delivery_bench.py --device SERIAL --paths sequence
+    python scripts/tests/key_delivery_bench.py --device SERIAL --source logcat --grep "KEY " --pattern "act=0"
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import framework  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import keyrate, keys  # noqa: E402
+import cursor_tests  # noqa: E402  (local asset server + reverse tunnel)
+import results as results_store  # noqa: E402
+
+BENCH = keyrate.BENCH
+DEFAULT_CADENCES = (0.0, 0.03, 0.06, 0.1, 0.15, 0.25)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", help="Target a specific adb device serial")
+    parser.add_argument("--all", action="store_true", help="Benchmark all connected devices")
+    parser.add_argument("--package", help="Override the app package to test")
+    parser.add_argument("--key", default="DPAD_RIGHT", help="Key to burst (a framework.keys name)")
+    parser.add_argument("--cadences", default=",".join(str(c) for c in DEFAULT_CADENCES),
+                        help="Comma-separated intervals between presses, in seconds")
+    parser.add_argument("--paths", default=",".join(keyrate.PATHS),
+                        help=f"Comma-separated send paths to measure, of {', '.join(keyrate.PATHS)}")
+    parser.add_argument("--presses", type=int, default=30, help="Presses per burst")
+    parser.add_argument("--repeats", type=int, default=2, help="Bursts per cadence (the worst is kept)")
+    parser.add_argument("--min-rate", type=float, default=keyrate.DEFAULT_MIN_RATE,
+                        help="Delivery rate a cadence must reach to be recommended")
+    parser.add_argument("--source", choices=("page", "logcat"), default="page", help="How received keys are counted")
+    parser.add_argument("--grep", default="KEY", help="logcat source: substring of the counted lines")
+    parser.add_argument("--pattern", default="", help="logcat source: regex the counted lines must also match")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the curve to scripts/tests/results/")
+    args = parser.parse_args()
+
+    code = getattr(keys, args.key)
+    cadences = [float(c) for c in args.cadences.split(",") if c.strip()]
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    unknown = [p for p in paths if p not in keyrate.PATHS]
+    if unknown:
+        parser.error(f"unknown path(s) {', '.join(unknown)}; known: {', '.join(keyrate.PATHS)}")
+    for device in framework.resolve_devices(args.device, args.all, args.package):
+        config = device.config()
+        print(f"\n=== {BENCH} on {device.label()}  key={args.key} presses={args.presses} ===")
+        cursor_tests._ensure_server()
+        cursor_tests._ensure_reverse(device)
+        device.navigate(f"http://localhost:{cursor_tests.PORT}/key_counter.html?cb={int(time.time() * 1000)}",
+                        reset=False)
+        if args.source == "page":
+            counter = keyrate.PageCounter(device)
+        else:
+            counter = keyrate.LogcatCounter(device, args.grep, args.pattern)
+        rows, summary = [], {}
+        for path in paths:
+            curve = keyrate.delivery_curve(device, code, cadences, args.presses, counter, args.repeats, path)
+            for row in curve:
+                print(f"  {path:8s} cadence {row['cadence_s']:.3f}s (actual {row['actual_interval_s']}s/key): "
+                      f"{row['received']}/{row['sent']} delivered (rate {row['rate']})")
+            recommended = keyrate.recommended_cadence(curve, args.min_rate)
+            print(f"  {path:8s} recommended cadence: "
+                  f"{recommended if recommended is not None else 'none (no cadence reached the rate)'}")
+            rows += curve
+            summary[keyrate.SUMMARY_FIELDS[path]] = recommended
+        if not args.no_save:
+            record = results_store.build_bench_record(
+                config, device.package, BENCH,
+                {"key": args.key, "presses": args.presses, "repeats": args.repeats,
+                 "min_rate": args.min_rate, "source": args.source, "paths": paths},
+                rows, summary)
+            yaml_path, md_path = results_store.save_bench(record)
+            print(f"  saved -> {os.path.relpath(yaml_path)}  [+ {os.path.basename(md_path)}]")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
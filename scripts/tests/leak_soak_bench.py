@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Benchmark: does the app's memory grow with every page it opens and closes?
+
+The suites call ``device.navigate()`` hundreds of times per run; a WebView or
+tab that is never released would only show after many cycles, e.g. on a 2 GB TV
+box after a day of use. This soak loops, ``--cycles`` times:
+
+    open a local page in a new tab (typed URL) -> wait for its load event
+    -> close the tab -> (with --background: HOME, then back to the app)
+
+over a small rotation of generated stress pages (framework/pages.py, served
+from the host over the ``adb reverse`` tunnel), and every ``--sample-every``
+cycles trims the app's memory and forces a GC (``am send-trim-memory`` +
+SIGUSR1, see adb.trim_memory) before reading PSS and the allocated Java and
+native heaps from ``dumpsys meminfo --checkin``. Measuring after a GC is what
+makes the samples comparable: garbage not yet collected is not a leak.
+
+The growth per 100 cycles is a least-squares fit over the samples after the
+``--warmup`` cycles (caches, the JIT and the first tabs settle there); a PSS or
+Java-heap slope above its threshold flags a probable leak and makes the exit
+status 1. The live WebView count (plain ``dumpsys meminfo``) is recorded at the
+start and end too. The series is saved to the results store
+(``results/<MODEL>/bench/leak-soak-*``, see results.py).
+
+    python scripts/tests/leak_soak_bench.py --device SERIAL
+    python scripts/tests/leak_soak_bench.py --all --cycles 500 --background
+    python scripts/tests/leak_soak_bench.py --device SERIAL --cycles 50 --sample-every 10 --no-save
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import framework  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import keys, pages, server  # noqa: E402
+import results as results_store  # noqa: E402
+
+BENCH = "leak-soak"
+LOAD_TIMEOUT = 60.0
+GC_SETTLE_S = 2.0        # let the trim + GC finish before reading meminfo
+BACKGROUND_S = 2.0
+# The pages cycled through: plain text, images + a frame, and busy scripts.
+ROTATION = (
+    {"nodes": 500},
+    {"nodes": 1000, "images": 8, "iframes": 1},
+    {"nodes": 500, "timers": 4, "theme_ms": 500, "console_ms": 200},
+)
+COLUMNS = ("pss_kb", "java_heap_kb", "native_heap_kb")
+
+
+def sample(device, cycle: int, elapsed_s: float) -> dict:
+    """Trim + GC, then the app's memory after ``cycle`` cycles."""
+    device.trim_memory()
+    time.sleep(GC_SETTLE_S)
+    mem = device.meminfo_checkin()
+    row = {"cycle": cycle, "elapsed_s": round(elapsed_s, 1), **{c: mem.get(c) for c in COLUMNS}}
+    print(f"  cycle {cycle:5d}: PSS {row['pss_kb']} kB, java {row['java_heap_kb']} kB, "
+          f"native {row['native_heap_kb']} kB")
+    return row
+
+
+def cycle_once(device, srv, cycle: int, background: bool) -> bool:
+    """One open -> loaded -> close (-> background/foreground) cycle; False if the page never loaded."""
+    since = time.time()
+    device.navigate(srv.url(pages.STRESS, device=device, **ROTATION[cycle % len(ROTATION)]), reset=False)
+    loaded = device.wait_page_event("timing", timeout=LOAD_TIMEOUT, since=since) is not None
+    device.close_tabs(1, wait=0.3)
+    framework.reset_tab_counter()
+    if background:
+        device.key(keys.HOME, wait=BACKGROUND_S)
+        device.launch(wait=2.0)
+    return loaded
+
+
+def bench_device(device, cycles: int, every: int, background: bool) -> tuple[list[dict], dict]:
+    """Run the soak; return the sampled series and the start/end WebView counts."""
+    srv = server.acquire(device)
+    try:
+        pages.install(srv)
+        device.restart()
+        if not device.clean_tabs():
+            print("  !! could not reach a clean tab slate")
+        framework.reset_tab_counter()
+        device.settle()
+        webviews = {"webviews_start": device.meminfo().get("webviews")}
+        t0 = time.monotonic()
+        series = [sample(device, 0, 0.0)]
+        missed = 0
+        for cycle in range(1, cycles + 1):
+            if not cycle_once(device, srv, cycle, background):
+                missed += 1
+            if cycle % every == 0 or cycle == cycles:
+                series.append(sample(device, cycle, time.monotonic() - t0))
+        webviews["webviews_end"] = device.meminfo().get("webviews")
+        webviews["missed_loads"] = missed
+    finally:
+        server.release()
+    return series, webviews
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", help="Target a specific adb device serial")
+    parser.add_argument("--all", action="store_true", help="Benchmark all connected devices")
+    parser.add_argument("--package", help="Override the app package to test")
+    parser.add_argument("--cycles", type=int, default=300, help="Open/close cycles")
+    parser.add_argument("--sample-every", type=int, default=25, help="Cycles between memory samples")
+    parser.add_argument("--warmup", type=int, default=25, help="Cycles left out of the growth fit")
+    parser.add_argument("--background", action="store_true", help="Also background/foreground the app every cycle")
+    parser.add_argument("--pss-threshold", type=float, default=2048,
+                        help="Flag PSS growth above this many kB per 100 cycles")
+    parser.add_argument("--java-threshold", type=float, default=1024,
+                        help="Flag Java-heap growth above this many kB per 100 cycles")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results to scripts/tests/results/")
+    args = parser.parse_args()
+
+    leaking = False
+    for device in framework.resolve_devices(args.device, args.all, args.package):
+        config = device.config()
+        print(f"\n=== {BENCH} on {device.label()}  cycles={args.cycles} every={args.sample_every}"
+              f"{' +background' if args.background else ''} ===")
+        series, counts = bench_device(device, args.cycles, args.sample_every, args.background)
+        summary = {f"{c}_per_100_cycles": results_store.slope_per_100(series, "cycle", c, min_x=args.warmup)
+                   for c in COLUMNS}
+        summary.update(counts)
+        flags = []
+        for label, key, threshold in (("PSS", "pss_kb_per_100_cycles", args.pss_threshold),
+                                      ("Java heap", "java_heap_kb_per_100_cycles", args.java_threshold)):
+            if (summary[key] or 0) > threshold:
+                flags.append(f"{label} +{summary[key]} kB")
+        summary["verdict"] = ("LEAK? " + ", ".join(flags) + " per 100 cycles") if flags else "stable"
+        leaking = leaking or bool(flags)
+        print("  " + ", ".join(f"{k}={v}" for k, v in summary.items()))
+        if not args.no_save:
+            params = {"cycles": args.cycles, "sample_every": args.sample_every, "warmup": args.warmup,
+                      "background": args.background, "pss_threshold_kb": args.pss_threshold,
+                      "java_threshold_kb": args.java_threshold}
+            record = results_store.build_bench_record(config, device.package, BENCH, params, series, summary)
+            yaml_path, md_path = results_store.save_bench(record)
+            print(f"  saved -> {os.path.relpath(yaml_path)}  [+ {os.path.basename(md_path)}]")
+    return 1 if leaking else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
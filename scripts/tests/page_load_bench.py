@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Benchmark: how fast Fulguris loads pages, from the pages' own timing.
+
+Serves the synthetic page-load corpus (framework/pages.py: a text-heavy,
+image-heavy, script-heavy and huge-DOM page) from the host server over the
+``adb reverse`` tunnel, so there is no network variance. Each page is loaded
+``--iterations`` times (every load is a cold fetch: the server sends no-store);
+once loaded, the page reports its Navigation Timing (time to first byte,
+DOMContentLoaded, load event) and a Resource Timing summary to the host's
+``/beacon`` (see framework/server.py), so the figures are what the WebView
+measured, not adb round trips.
+
+Per page it keeps the median, p90 and worst of each milestone and saves them to
+the results store (``results/<MODEL>/bench/page-load-*``, see results.py),
+printing the change of each median against the previously saved run.
+
+    python scripts/tests/page_load_bench.py --device SERIAL
+    python scripts/tests/page_load_bench.py --all --iterations 20 --pages text,dom
+    python scripts/tests/page_load_bench.py --device SERIAL --no-save
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import framework  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import pages, server  # noqa: E402
+import results as results_store  # noqa: E402
+
+BENCH = "page-load"
+LOAD_TIMEOUT = 120.0    # the RPi TV can need a while for the huge DOM
+MILESTONES = ("ttfb", "dcl", "load")
+
+
+def _percentiles(values: list[float]) -> dict:
+    """Median, p90 and max (ms) of the samples; p90 falls back to max with few samples."""
+    if not values:
+        return {"p50": None, "p90": None, "max": None}
+    p90 = statistics.quantiles(values, n=10, method="inclusive")[-1] if len(values) > 1 else values[0]
+    return {"p50": round(statistics.median(values), 1), "p90": round(p90, 1), "max": round(max(values), 1)}
+
+
+def load_once(device, srv, path: str) -> dict | None:
+    """Open ``path`` and return the timing it reports, or None if it never did."""
+    since = time.time()
+    device.navigate(srv.url(path, device=device), reset=False)
+    event = device.wait_page_event("timing", timeout=LOAD_TIMEOUT, since=since)
+    return event["data"] if event else None
+
+
+def bench_device(device, names: list[str], iterations: int) -> list[dict]:
+    """Load every corpus page ``iterations`` times; return one series row per page."""
+    srv = server.acquire(device)
+    series = []
+    try:
+        pages.install(srv)
+        device.restart()
+        device.settle()
+        for name in names:
+            samples = []
+            for i in range(iterations):
+                timing = load_once(device, srv, pages.CORPUS[name])
+                if timing is None:
+                    print(f"  {name} #{i + 1}: no timing within {LOAD_TIMEOUT:.0f}s")
+                else:
+                    samples.append(timing)
+            # Every load opened a tab (a typed URL does); close them before the next page.
+            device.close_tabs(framework.tabs_opened(), wait=0.3)
+            framework.reset_tab_counter()
+            row = {"page": name, "loads": len(samples)}
+            for milestone in MILESTONES:
+                stats = _percentiles([s[milestone] for s in samples if s.get(milestone) is not None])
+                row.update({f"{milestone}_{k}_ms": v for k, v in stats.items()})
+            row["resources"] = samples[-1]["resources"] if samples else None
+            row["nodes"] = samples[-1]["nodes"] if samples else None
+            row["kb"] = round(((samples[-1].get("bytes") or 0) + samples[-1]["resource_bytes"]) / 1024, 1) \
+                if samples else None
+            series.append(row)
+            print(f"  {name:8s} load p50 {row['load_p50_ms']} ms, p90 {row['load_p90_ms']} ms "
+                  f"(ttfb {row['ttfb_p50_ms']}, dcl {row['dcl_p50_ms']}; {row['loads']}/{iterations} loads)")
+    finally:
+        server.release()
+    return series
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", help="Target a specific adb device serial")
+    parser.add_argument("--all", action="store_true", help="Benchmark all connected devices")
+    parser.add_argument("--package", help="Override the app package to test")
+    parser.add_argument("--pages", default=",".join(pages.CORPUS),
+                        help=f"Comma-separated corpus pages (default: all of {', '.join(pages.CORPUS)})")
+    parser.add_argument("--iterations", type=int, default=10, help="Loads per page")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results to scripts/tests/results/")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.pages.split(",") if n.strip()]
+    unknown = [n for n in names if n not in pages.CORPUS]
+    if unknown:
+        parser.error(f"unknown page(s) {', '.join(unknown)}; known: {', '.join(pages.CORPUS)}")
+    for device in framework.resolve_devices(args.device, args.all, args.package):
+        config = device.config()
+        print(f"\n=== {BENCH} on {device.label()}  pages={names} x{args.iterations} ===")
+        series = bench_device(device, names, args.iterations)
+        summary = {f"{row['page']}_load_p50_ms": row["load_p50_ms"] for row in series}
+        previous = results_store.load_last_bench(config["model"], config["config_id"], device.id, BENCH)
+        if previous:
+            for key, value in summary.items():
+                before = previous.get("summary", {}).get(key)
+                if value is not None and before:
+                    print(f"  {key}: {before} -> {value} ms ({(value - before) / before * 100:+.0f}%)")
+        if not args.no_save:
+            record = results_store.build_bench_record(
+                config, device.package, BENCH, {"pages": names, "iterations": args.iterations}, series, summary)
+            yaml_path, md_path = results_store.save_bench(record)
+            print(f"  saved -> {os.path.relpath(yaml_path)}  [+ {os.path.basename(md_path)}]")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
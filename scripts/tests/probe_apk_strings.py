@@ -1,12 +1,20 @@
 """One-off probe: confirm the built APK actually contains the CursorController
 strings we just added (guards against a stale incremental build).
 
-Usage: python scripts/tests/probe_apk_strings.py
+Markers are looked up in the APK's dex string tables (tools/dex.py): a marker
+counts when it is a whole string constant or the literal start of one. A
+fragment (a piece from the middle of a Kotlin template, e.g. `` en=`` in
+``"... act=$a en=$b"``) also counts anywhere inside a string.
+
+Usage: python scripts/tests/probe_apk_strings.py [--diff OLD.apk]
 """
 
+import argparse
 import os
 import sys
-import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools import dex  # noqa: E402
 
 APK = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
@@ -14,40 +22,49 @@ APK = os.path.join(
     "Fulguris-v2.0.10-slions-full-download-debug.apk",
 )
 
-# (label, byte-string to look for, expect-present?)
+# (label, string to look for, expect-present?, fragment?)
 CHECKS = [
-    ("KEY trace (act= format)",  b"act=",                     True),
-    ("en=/shown= in trace",       b"en=",                      True),
-    ("ASSIST branch log",         b"ASSIST ignored (cursor off)", True),
-    ("ASSIST branch ENTER marker", b"ASSIST branch entered",       True),
-    ("hAP entry log",             b"handleAssistLongPress action=", True),
-    ("assist fire log",           b"ASSIST long-press fired -> dispatchLongPress", True),
-    ("assist no-fire log",        b"ASSIST down rep=",          True),
-    ("dispatchLongPress log",     b"long press (context menu) at target", True),
-    ("dispatchLongPress abort log", b"long press ABORT: targetProvider() was null", True),
-    ("old temp KEY trace",        b"long=${event.isLongPress}",  False),
+    ("KEY trace (act= format)",  " act=",                    True,  True),
+    ("en=/shown= in trace",       " en=",                     True,  True),
+    ("ASSIST branch log",         "ASSIST ignored (cursor off)", True, False),
+    ("ASSIST branch ENTER marker", "ASSIST branch entered",       True, False),
+    ("hAP entry log",             "handleAssistLongPress action=", True, False),
+    ("assist fire log",           "ASSIST long-press fired -> dispatchLongPress", True, False),
+    ("assist no-fire log",        "ASSIST down rep=",          True,  False),
+    ("dispatchLongPress log",     "long press (context menu) at target", True, False),
+    ("dispatchLongPress abort log", "long press ABORT: targetProvider() was null", True, False),
+    ("old temp KEY trace",        "long=${event.isLongPress}",  False, False),
 ]
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--diff", metavar="OLD_APK", help="Also list strings added / removed since OLD_APK")
+    args = parser.parse_args()
     if not os.path.exists(APK):
         print(f"APK not found: {APK}")
         return 1
-    z = zipfile.ZipFile(APK)
-    blobs = {n: z.read(n) for n in z.namelist() if n.endswith(".dex")}
+    index = dex.load(APK)
     print(f"APK: {APK}")
-    print(f"{len(blobs)} dex files, {sum(len(b) for b in blobs.values())} bytes total")
+    print(f"{len(index)} distinct dex strings")
     print()
     ok = True
-    for label, needle, expect in CHECKS:
-        hits = [n for n, b in blobs.items() if needle in b]
-        present = bool(hits)
+    for label, needle, expect, fragment in CHECKS:
+        how = index.find(needle, fragment)
+        present = how is not None
         good = (present == expect)
         ok = ok and good
         print(f"  [{'OK ' if good else 'BAD'}] {label!r}: "
-              f"{'found' if present else 'absent'} (expected "
-              f"{'present' if expect else 'absent'})"
-              f"{f' in {hits}' if hits else ''}")
+              f"{f'found ({how})' if present else 'absent'} (expected "
+              f"{'present' if expect else 'absent'})")
+    if args.diff:
+        added, removed = index.diff(dex.load(args.diff))
+        print()
+        print(f"Since {os.path.basename(args.diff)}: {len(added)} string(s) added, {len(removed)} removed")
+        for text in removed:
+            print(f"  - {text!r}")
+        for text in added:
+            print(f"  + {text!r}")
     print()
     print("APK MATCHES SOURCE" if ok else "APK STALE / MISMATCH")
     return 0 if ok else 2
@@ -7,6 +7,9 @@ page content on the shots where we know where the cursor really is.
 
 Run:  python scripts/tests/probe_cursor_blobs.py [shot.png ...]
       (defaults to the calibration shots in scripts/tests/out/)
+
+For a whole archive of captures, in parallel and to CSV/npz:
+      python scripts/tools/vision_cli.py batch DIR --analyser blobs --out blobs.csv
 """
 import os
 import sys
@@ -14,6 +17,9 @@ import sys
 import numpy as np
 from PIL import Image
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from framework import vision  # noqa: E402
+
 OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "out")
 DEFAULTS = [
     ("sanity_on  (cursor known @ ~965,640)", os.path.join(OUT, "192.168.178.67_5555_sanity_on.png")),
@@ -22,36 +28,9 @@ DEFAULTS = [
 ]
 
 
-def white_blobs(img: Image.Image, thresh: int = 240, min_area: int = 60, max_list: int = 12):
-    """Flood-fill the pure-white pixels and return the biggest blobs as
-    (area, cy, cx, bbox) tuples, sorted by area desc."""
-    a = np.asarray(img.convert("RGB"), dtype=np.int16)
-    white = (a[:, :, 0] > thresh) & (a[:, :, 1] > thresh) & (a[:, :, 2] > thresh)
-    ys, xs = np.nonzero(white)
-    pts = set(zip(ys.tolist(), xs.tolist()))
-    seen = set()
-    blobs = []
-    for p in pts:
-        if p in seen:
-            continue
-        stack = [p]
-        comp = []
-        seen.add(p)
-        while stack:
-            cy, cx = stack.pop()
-            comp.append((cy, cx))
-            for ny, nx in ((cy + 1, cx), (cy - 1, cx), (cy, cx + 1), (cy, cx - 1)):
-                if (ny, nx) in pts and (ny, nx) not in seen:
-                    seen.add((ny, nx))
-                    stack.append((ny, nx))
-        if len(comp) >= min_area:
-            ca = np.array(comp)
-            blobs.append((len(comp),
-                          int(ca[:, 0].mean()), int(ca[:, 1].mean()),
-                          (int(ca[:, 1].min()), int(ca[:, 0].min()),
-                           int(ca[:, 1].max()), int(ca[:, 0].max()))))
-    blobs.sort(reverse=True)
-    return blobs[:max_list]
+def white_blobs(img: Image.Image, thresh: int = 240, min_area: int = 60, max_list: int = 12) -> np.ndarray:
+    """The biggest pure-white blobs (framework.vision BLOB_DTYPE records), largest first."""
+    return vision.white_blobs(img, thresh, min_area)[:max_list]
 
 
 def main() -> None:
@@ -68,8 +47,10 @@ def main() -> None:
             continue
         img = Image.open(path)
         print(f"== {label}  ({img.size[0]}x{img.size[1]}) ==")
-        for area, cy, cx, (x0, y0, x1, y1) in white_blobs(img):
-            print(f"  area={area:6d} centroid=({cx},{cy})  bbox x[{x0}-{x1}] y[{y0}-{y1}]  ({x1 - x0 + 1}x{y1 - y0 + 1})")
+        for b in white_blobs(img):
+            x0, y0, x1, y1 = int(b["x0"]), int(b["y0"]), int(b["x1"]), int(b["y1"])
+            print(f"  area={int(b['area']):6d} centroid=({b['cx']:.0f},{b['cy']:.0f})  "
+                  f"bbox x[{x0}-{x1}] y[{y0}-{y1}]  ({x1 - x0 + 1}x{y1 - y0 + 1})")
 
 
 if __name__ == "__main__":
@@ -1,68 +1,54 @@
 """Calibrate screenshot-based cursor detection.
 
-The cursor arrow is a pure-white fill with a near-black outline (see
-CursorView). On any page, a small region of pure-white pixels ringed by
-near-black pixels is a strong cursor signature. This script checks that
-heuristic against existing screenshots whose cursor position is known:
+The cursor is CursorView's arrow: a white fill over a slightly larger
+200/255-black copy, 36dp in size. framework.vision.CursorTracker renders that
+arrow at the device density and finds it by masked normalised
+cross-correlation (FFT), so it needs no per-DPI tuning and ignores the page
+behind the arrow. This script checks it against existing screenshots whose
+cursor position is known:
 
   sanity_on.png          cursor centered at screen center (1920x1200 -> 960,600)
 
-Run:  python scripts/tests/probe_cursor_detect.py [shot.png ...]
+Run:  python scripts/tests/probe_cursor_detect.py [--density DPI] [shot.png ...]
+
+For a whole archive of captures, in parallel and to CSV/npz:
+      python scripts/tools/vision_cli.py batch DIR --analyser cursor --set density=320 --out cursor.csv
 """
+import argparse
+import os
 import sys
-import numpy as np
+import time
+
 from PIL import Image
 
-OUT = r"scripts\tests\out"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from framework import vision  # noqa: E402
+
+OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "out")
+
 
-def detect_cursor(img: Image.Image):
-    """Return (cx, cy) of the best cursor candidate or None.
+def detect_cursor(img: Image.Image, density: int = 320):
+    """Return the (x, y) arrow tip of the best cursor match and its score, or (None, score)."""
+    tracker = vision.CursorTracker(density)
+    return tracker.locate(vision.Frame.from_image(img)), tracker.score
 
-    Signature: pixel is near-white (>240 all channels) AND within 6px of a
-    near-black pixel (<50 all channels). The white core of the arrow is
-    small; the outline is dark. Page content rarely has pure white with
-    pure black that close (text is anti-aliased, borders are not both).
-    """
-    a = np.asarray(img.convert("RGB"), dtype=np.int16)
-    white = (a[:, :, 0] > 240) & (a[:, :, 1] > 240) & (a[:, :, 2] > 240)
-    black = (a[:, :, 0] < 50) & (a[:, :, 1] < 50) & (a[:, :, 2] < 50)
-    # dilate the black mask by 6px with a simple max-filter chain
-    black_d = black.copy()
-    for _ in range(6):
-        black_d = (black_d
-                   | np.roll(black_d, 1, 0) | np.roll(black_d, -1, 0)
-                   | np.roll(black_d, 1, 1) | np.roll(black_d, -1, 1))
-    cand = white & black_d
-    if cand.sum() < 10:
-        return None
-    # find the largest connected white blob among candidates
-    ys, xs = np.nonzero(cand)
-    # simple clustering: take all candidate pixels within a window of the
-    # densest seed (grid histogram)
-    from collections import Counter
-    grid = Counter((y // 8, x // 8) for x, y in zip(xs, ys))
-    if not grid:
-        return None
-    (gy, gx), _count = grid.most_common(1)[0]
-    sel = (np.abs(ys // 8 - gy) <= 1) & (np.abs(xs // 8 - gx) <= 1)
-    cy = float(ys[sel].mean())
-    cx = float(xs[sel].mean())
-    return cx, cy
 
 def main():
-    import os
-    if len(sys.argv) > 1:
-        paths = sys.argv[1:]
-    else:
-        paths = [os.path.join(OUT, "192.168.178.67_5555_sanity_on.png")]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("shots", nargs="*", help="Screenshots to check (default: the sanity shot)")
+    parser.add_argument("--density", type=int, default=320, help="Density (dpi) of the device the shots came from")
+    args = parser.parse_args()
+    paths = args.shots or [os.path.join(OUT, "192.168.178.67_5555_sanity_on.png")]
     for p in paths:
         if not os.path.exists(p):
             print(f"  MISSING {p}")
             continue
         img = Image.open(p)
         w, h = img.size
-        pos = detect_cursor(img)
-        print(f"  {os.path.basename(p)}: {w}x{h}  cursor at {pos}")
+        t0 = time.perf_counter()
+        pos, score = detect_cursor(img, args.density)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"  {os.path.basename(p)}: {w}x{h}  cursor at {pos}  (score {score:.2f}, {ms:.0f} ms)")
 
 if __name__ == "__main__":
     main()
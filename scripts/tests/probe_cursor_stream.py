@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Track the cursor arrow through D-pad bursts with a continuous screen capture.
+
+probe_cursor_triangulate.py grabs one frame per step, so it sees where the
+cursor ended up but not how it got there. This probe keeps a frame stream
+running (framework/stream.py: a device-side raw ``screencap`` loop, read on a
+worker thread) while a burst is played on another thread, and runs the arrow
+detector on every frame as it arrives: by default vision.CursorTracker (template
+match at the device density, then a small window around the last position), or
+the white-blob filter vision.cursor_tip with ``--detector blob``. Per burst it
+prints:
+
+  * travel      - first to last detected tip position, in screen pixels;
+  * latency     - from sending the burst to the first frame showing the arrow moved;
+  * capture     - frames/s of the stream, gaps (intervals > 2x the median) and
+                  frames dropped because detection fell behind;
+  * jank        - the app's own frame timing over the burst (Device.frame_stats).
+
+The capture rate is bounded by moving raw frames over adb: use ``--step 2`` (or
+more) to cut detection time, and ``--roi`` to keep detection to a region.
+
+    python scripts/tests/probe_cursor_stream.py --device 192.168.178.67:5555
+    python scripts/tests/probe_cursor_stream.py --device SERIAL --presses 20 --interval 50 --step 2
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import framework  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import keys, stream, vision  # noqa: E402
+import cursor_tests  # noqa: E402
+import toolbar_field_test as tf  # noqa: E402
+
+# (name, key) bursts played in order; the cursor starts at the screen center.
+BURSTS = (
+    ("right", keys.DPAD_RIGHT),
+    ("down", keys.DPAD_DOWN),
+    ("left", keys.DPAD_LEFT),
+    ("up", keys.DPAD_UP),
+)
+
+# Frames kept before the burst (to know where the arrow started) and after it
+# (for the cursor to settle).
+LEAD_S = 1.0
+TAIL_S = 1.5
+
+
+def _track_burst(device, code: int, presses: int, interval_ms: int, roi, step: int,
+                 detect) -> tuple[dict, object]:
+    """Stream frames around one burst; return (motion report, frame stats)."""
+    with device.frame_stream(roi, step) as frames, device.frame_stats() as jank:
+        samples = list(stream.track(frames.frames(until=time.monotonic() + LEAD_S), detect))
+        sent = time.monotonic()
+        burst = threading.Thread(target=device.key_sequence, args=([code],),
+                                 kwargs={"repeat": presses, "inter_key_ms": interval_ms, "wait": 0})
+        burst.start()
+        burst_s = presses * interval_ms / 1000.0
+        samples += stream.track(frames.frames(until=sent + burst_s + TAIL_S), detect)
+        burst.join()
+    report = stream.motion_report(samples, sent)
+    report["stream_dropped"] = frames.dropped
+    return report, jank
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", help="Target a specific adb device serial")
+    parser.add_argument("--all", action="store_true", help="Probe all connected devices")
+    parser.add_argument("--package", help="Override the app package to test")
+    parser.add_argument("--presses", type=int, default=10, help="Key presses per burst")
+    parser.add_argument("--interval", type=int, default=100, help="Milliseconds between presses")
+    parser.add_argument("--step", type=int, default=1, help="Keep every n-th pixel of each frame")
+    parser.add_argument("--roi", help="Detect only in x0,y0,x1,y1 (screen pixels)")
+    parser.add_argument("--detector", choices=("template", "blob"), default="template",
+                        help="Arrow detector: template match (any DPI) or the white-blob filter")
+    args = parser.parse_args()
+
+    roi = tuple(int(v) for v in args.roi.split(",")) if args.roi else None
+    for device in framework.resolve_devices(args.device, args.all, args.package):
+        cursor_tests._ensure_server()
+        cursor_tests._ensure_reverse(device)
+        cursor_tests._reset_cursor_prefs(device)
+        tf._set_pref(device, tf.FADE_KEY, "0", "int", suffixed=False)  # never fade, so vision is stable
+        device.launch()
+        time.sleep(3.0)
+        cursor_tests._load_target(device)
+        if not tf._ensure_cursor(device, device.id, "stream", want=True):
+            print(f"!! could not turn the cursor on for {device.label()} - skipping")
+            continue
+        print(f"\n=== cursor stream on {device.label()}  presses={args.presses} "
+              f"interval={args.interval}ms step={args.step} roi={roi} ===")
+        if args.detector == "template":
+            detect = vision.CursorTracker(device.density(), args.step)
+        else:
+            detect = vision.cursor_tip
+        for name, code in BURSTS:
+            report, jank = _track_burst(device, code, args.presses, args.interval, roi, args.step, detect)
+            travel = report["travel"]
+            print(f"  {name:5s}: travel={travel}  latency={report['latency_s']}s  "
+                  f"({report['detected']}/{report['frames']} frames with the arrow)")
+            print(f"         capture {report['fps']} fps, {report['gaps']} gaps, "
+                  f"{report['stream_dropped']} dropped | app frames: {jank}")
+        tf._ensure_cursor(device, device.id, "stream_off", want=False)
+        tf._set_pref(device, tf.FADE_KEY, tf.DEFAULT_FADE, "int", suffixed=False)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -17,7 +17,7 @@ All three are printed side by side, and screenshots are saved so the cursor's
 travel can be eyeballed. A real burst that drops key events would show up as
 the three sources disagreeing on the *magnitude* of travel while still
 agreeing on direction - and the screenshots would show the arrow actually
-moved.
+moved. probe_cursor_stream.py follows the arrow *during* a burst instead.
 
 Run:  python scripts/tests/probe_cursor_triangulate.py [--serial SERIAL]
 """
@@ -29,11 +29,8 @@ import re
 import sys
 import time
 
-import numpy as np
-from PIL import Image
-
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from framework import AndroidDevice, keys  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import AndroidDevice, keys, vision  # noqa: E402  (also puts scripts/tools on sys.path)
 import adb  # noqa: E402
 import cursor_tests  # noqa: E402
 import toolbar_field_test as tf  # noqa: E402
@@ -43,60 +40,19 @@ OUT = os.path.join(os.path.dirname(__file__), "out")
 
 # --- Vision: the cursor arrow is a white, tall-narrow blob --------------------
 # Calibrated on sanity_on.png: the arrow fill is a 39x58 blob (h/w ~1.5). Every
-# page-content blob on the YouTube page is square or wide (h/w <= 1.25), so this
-# aspect + area window isolates the arrow. The logical point is the arrow TIP,
-# at the top-LEFT of the blob.
-def _white_blobs(img: Image.Image, thresh: int = 240, min_area: int = 150):
-    a = np.asarray(img.convert("RGB"), dtype=np.int16)
-    white = (a[:, :, 0] > thresh) & (a[:, :, 1] > thresh) & (a[:, :, 2] > thresh)
-    ys, xs = np.nonzero(white)
-    pts = set(zip(ys.tolist(), xs.tolist()))
-    seen: set = set()
-    out = []
-    for p in pts:
-        if p in seen:
-            continue
-        stack = [p]
-        comp = []
-        seen.add(p)
-        while stack:
-            cy, cx = stack.pop()
-            comp.append((cy, cx))
-            for ny, nx in ((cy + 1, cx), (cy - 1, cx), (cy, cx + 1), (cy, cx - 1)):
-                if (ny, nx) in pts and (ny, nx) not in seen:
-                    seen.add((ny, nx))
-                    stack.append((ny, nx))
-        if len(comp) >= min_area:
-            ca = np.array(comp)
-            x0, x1 = int(ca[:, 1].min()), int(ca[:, 1].max())
-            y0, y1 = int(ca[:, 0].min()), int(ca[:, 0].max())
-            out.append(dict(area=len(comp), x0=x0, x1=x1, y0=y0, y1=y1))
-    return out
-
-
-def _cursor_tip(path: str):
-    """Return the arrow-tip (x, y) from a screenshot, or None. Prints every
-    candidate blob so a false positive is visible, not silent.
-
-    Tuned to the TV arrow (39x58, area ~971, calibrated on sanity_on.png):
-    the page's own white content is small/square, so we floor on width,
-    height and area and keep a loose tall-narrow aspect band."""
-    img = Image.open(path)
-    w, h = img.size
-    cands = []
-    for b in _white_blobs(img):
-        bw = b["x1"] - b["x0"] + 1
-        bh = b["y1"] - b["y0"] + 1
-        ar = bh / bw if bw else 0
-        if bw >= 25 and bh >= 40 and 1.20 <= ar <= 2.10 and 500 <= b["area"] <= 4000:
-            cands.append((b["area"], b))
-    cands.sort(key=lambda t: -t[0])
+# page-content blob on the YouTube page is square or wide (h/w <= 1.25), so the
+# aspect + area window of vision.arrow_blobs isolates the arrow. The logical
+# point is the arrow TIP, at the top-LEFT of the blob.
+def _cursor_tip(frame: vision.Frame):
+    """Return the arrow-tip (x, y) from a screen grab, or None. Prints every
+    candidate blob so a false positive is visible, not silent."""
+    cands = vision.arrow_blobs(vision.white_blobs(frame, min_area=150))
     print(f"    blobs: " + ", ".join(
-        f"(x{b['x0']}-{b['x1']},y{b['y0']}-{b['y1']},a{b['area']})" for _, b in cands))
-    if not cands:
+        f"(x{b['x0']}-{b['x1']},y{b['y0']}-{b['y1']},a{b['area']})" for b in cands))
+    if not cands.size:
         return None
-    b = cands[0][1]
-    tip = (b["x0"], b["y0"])
+    b = cands[0]
+    tip = frame.to_screen(b["x0"], b["y0"])
     print(f"    vision tip = {tip}  (arrow {b['x1'] - b['x0'] + 1}x{b['y1'] - b['y0'] + 1}, area {b['area']})")
     return tip
 
@@ -113,19 +69,19 @@ def _read_oracle(device) -> str | None:
     return f"({m.group(1)},{m.group(2)})" if m else (t or None)
 
 
-def _shot(device, tag: str) -> str:
-    path = os.path.join(OUT, f"tri_{tag}.png")
-    device.screenshot(path)
-    return path
-
-
 def _click_and_read(device, tag: str) -> tuple[str | None, tuple | None, str | None]:
-    """One select-press + screenshot. Returns (log, vision_tip, oracle)."""
-    path = _shot(device, tag)
+    """One raw screen grab + select-press. Returns (oracle, vision_tip, png path).
+
+    The grab is analysed in memory; the PNG is encoded afterwards, only so the
+    travel can be eyeballed."""
+    frame = device.frame()
     device.key(keys.DPAD_CENTER, wait=0.8)
     oracle = _read_oracle(device)
-    tip = _cursor_tip(path)
-    return oracle, tip, path
+    if frame is None:
+        print("    !! screen grab failed")
+        return oracle, None, None
+    tip = _cursor_tip(frame)
+    return oracle, tip, frame.save(os.path.join(OUT, f"tri_{tag}.png"))
 
 
 def _burst(device, n: int, code, wait: float = 0.15) -> None:
@@ -179,7 +135,7 @@ def main() -> int:
 
     # --- Verdicts ------------------------------------------------------------
     print("\n=== triangulation ===")
-    print(f"  screenshots: {os.path.basename(p0)}  ->  {os.path.basename(p1)}")
+    print(f"  screenshots: {p0 and os.path.basename(p0)}  ->  {p1 and os.path.basename(p1)}")
     if tip0 and tip1:
         print(f"  vision travel:  d=({tip1[0] - tip0[0]:+d}, {tip1[1] - tip0[1]:+d})")
     if o0 and o1:
@@ -1,5 +1,8 @@
 """One-off probe: pull the APK actually installed on the device and scan its dex
 for the CursorController strings, to rule out a stale on-device build.
+When the installed APK hashes the same as the local build, the local file is
+scanned instead of pulling the device copy; when they differ, the strings the
+device build lacks (or has extra) compared with the local build are listed.
 
 Usage: python scripts/tests/probe_device_apk.py --device SERIAL
 """
@@ -10,28 +13,25 @@ import argparse
 import os
 import sys
 import tempfile
-import zipfile
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from tools import adb  # noqa: E402
+from tools import adb, dex  # noqa: E402
 
 PKG = "net.slions.fulguris.full.download.debug"
 
-# strings that distinguish successive builds (most recent first)
+# strings that distinguish successive builds (most recent first), and whether the
+# marker is a fragment from the middle of a Kotlin template (see tools/dex.py)
 MARKERS = [
-    ("entry marker (latest)",        b"ASSIST branch entered"),
-    ("hAP entry log",                b"handleAssistLongPress action="),
-    ("granular long-press log",      b"long press ABORT: targetProvider() was null"),
-    ("KEY trace act= format",        b"act="),
-    ("old long=${event} trace",      b"long=${event.isLongPress}"),
+    ("entry marker (latest)",        "ASSIST branch entered", False),
+    ("hAP entry log",                "handleAssistLongPress action=", False),
+    ("granular long-press log",      "long press ABORT: targetProvider() was null", False),
+    ("KEY trace act= format",        " act=", True),
+    ("old long=${event} trace",      "long=${event.isLongPress}", False),
 ]
 
 
-def scan(path: str) -> dict:
-    z = zipfile.ZipFile(path)
-    blobs = {n: z.read(n) for n in z.namelist() if n.endswith(".dex")}
-    return {label: any(m in b for b in blobs.values()) for label, m in
-            [(l, m) for l, m in MARKERS]}
+def scan(index: dex.StringIndex) -> dict:
+    return {label: index.find(m, fragment) for label, m, fragment in MARKERS}
 
 
 def main() -> int:
@@ -39,18 +39,32 @@ def main() -> int:
     p.add_argument("--device", required=True)
     args = p.parse_args()
 
-    out = os.path.join(tempfile.gettempdir(), "fulguris_device.apk")
-    raw = adb._adb(args.device, ["shell", "pm", "path", PKG]).strip()
-    base = raw[len("package:"):] if raw.startswith("package:") else raw
-    print(f"pulling {base} from {args.device} ...")
-    adb._adb(args.device, ["pull", base, out], timeout=120)
-    if not os.path.exists(out):
-        print("pull failed")
-        return 1
-    print(f"pulled -> {out} ({os.path.getsize(out)} bytes)")
-    found = scan(out)
-    for label, present in found.items():
-        print(f"  [{'HAS ' if present else 'MISS'}] {label}")
+    installed = adb.installed_apk_sha256(args.device, PKG)
+    print(f"installed APK sha256: {installed or 'unknown'}")
+    local = adb.apk_path()
+    if installed and local and adb.apk_sha256(local) == installed:
+        # Identical to the local build: no need to pull it over the network.
+        print(f"identical to the local build, scanning {local}")
+        out = local
+    else:
+        out = os.path.join(tempfile.gettempdir(), "fulguris_device.apk")
+        base = adb.installed_apk_path(args.device, PKG)
+        print(f"pulling {base} from {args.device} ...")
+        adb._adb(args.device, ["pull", base, out], timeout=120)
+        if not os.path.exists(out):
+            print("pull failed")
+            return 1
+        print(f"pulled -> {out} ({os.path.getsize(out)} bytes)")
+    index = dex.load(out)
+    for label, how in scan(index).items():
+        print(f"  [{'HAS ' if how else 'MISS'}] {label}{f' ({how})' if how else ''}")
+    if out != local and local:
+        added, removed = dex.load(local).diff(index)
+        print(f"local build vs device: {len(added)} string(s) only local, {len(removed)} only on device")
+        for text in added[:20]:
+            print(f"  + {text!r}")
+        for text in removed[:20]:
+            print(f"  - {text!r}")
     return 0
 
 
@@ -13,37 +13,14 @@ from __future__ import annotations
 import argparse
 import os
 import sys
-import threading
 import time
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 import adb  # noqa: E402
-from framework import AndroidDevice, keys  # noqa: E402
+from framework import AndroidDevice, keys, server  # noqa: E402
 
-ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
-PORT = 8899
-
-
-class _NoCacheHandler(SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=ASSETS_DIR, **kwargs)
-
-    def end_headers(self):
-        self.send_header("Cache-Control", "no-store, must-revalidate")
-        super().end_headers()
-
-    def log_message(self, *args):
-        pass
-
-
-def _serve() -> None:
-    try:
-        server = ThreadingHTTPServer(("127.0.0.1", PORT), _NoCacheHandler)
-    except OSError:
-        return
-    threading.Thread(target=server.serve_forever, daemon=True).start()
+PORT = server.PORT
 
 
 def row(device: AndroidDevice, label: str) -> None:
@@ -69,8 +46,7 @@ def main() -> None:
     args = ap.parse_args()
 
     device = AndroidDevice(args.serial)
-    _serve()
-    device.reverse(PORT)
+    server.acquire(device)
     try:
         device.force_stop()
         time.sleep(1.5)
@@ -99,10 +75,7 @@ def main() -> None:
         device.key(keys.BACK, wait=1.2)
         row(device, "6. BACK again")
     finally:
-        try:
-            device.reverse_remove(PORT)
-        except Exception:  # noqa: BLE001
-            pass
+        server.release()
 
 
 if __name__ == "__main__":
@@ -9,29 +9,19 @@ import re
 import sys
 import threading
 import time
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 import adb
-from framework import AndroidDevice
+from framework import AndroidDevice, server
 
-ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
-PORT = 8899
+PORT = server.PORT
 SERIAL = sys.argv[1] if len(sys.argv) > 1 else "R58R91GBTZK"
 CONFIG = sys.argv[2] if len(sys.argv) > 2 else "portrait"
 VALUE = sys.argv[3] if len(sys.argv) > 3 else "0"
 TIMEOUT_KEY = "pref_key_hide_tool_bar_timeout"
 
 
-class H(SimpleHTTPRequestHandler):
-    def __init__(self, *a, **k):
-        super().__init__(*a, directory=ASSETS_DIR, **k)
-
-    def log_message(self, *a):
-        pass
-
-
 def main() -> int:
     device = AndroidDevice(SERIAL)
     device.force_stop()
@@ -43,9 +33,7 @@ def main() -> int:
     device.write_prefs(path, xml)
     print(f"set {TIMEOUT_KEY}={VALUE} in {path}")
 
-    server = ThreadingHTTPServer(("127.0.0.1", PORT), H)
-    threading.Thread(target=server.serve_forever, daemon=True).start()
-    device.reverse(PORT)
+    server.acquire(device)
     device.launch()
     time.sleep(3)
     from framework import keys
@@ -57,10 +45,7 @@ def main() -> int:
     for i in range(1, 26):
         time.sleep(1.0)
         print(f"t={i:2d}s  field={device.field_text()!r}")
-    try:
-        device.reverse_remove(PORT)
-    except Exception:
-        pass
+    server.release()
     return 0
 
 
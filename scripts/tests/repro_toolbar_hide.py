@@ -23,62 +23,27 @@ from __future__ import annotations
 
 import argparse
 import os
-import re
 import sys
-import threading
 import time
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 import adb  # noqa: E402
-from framework import AndroidDevice  # noqa: E402
+from framework import AndroidDevice, server  # noqa: E402
 
 TIMEOUT_KEY = "pref_key_hide_tool_bar_timeout"
 DEFAULT_VALUE = "0"
-ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
-PORT = 8899
+PORT = server.PORT
 PAGE_TITLE = "flipper"  # mirrored into the toolbar label while it is visible
 WAIT_AFTER_LOAD = 15.0  # 3x the 5s timeout; a healthy arm must have fired by now
 OUT_DIR = os.path.join(os.path.dirname(__file__), "out")
 
 
-class _NoCacheHandler(SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=ASSETS_DIR, **kwargs)
-
-    def send_header(self, key, value):
-        if key.lower() == "last-modified":
-            return
-        super().send_header(key, value)
-
-    def end_headers(self):
-        self.send_header("Cache-Control", "no-store, must-revalidate")
-        super().end_headers()
-
-    def log_message(self, *args):
-        pass
-
-
-def _serve() -> None:
-    try:
-        server = ThreadingHTTPServer(("127.0.0.1", PORT), _NoCacheHandler)
-    except OSError:
-        # A previous run left the server up (and the page loaded): fine to reuse.
-        return
-    threading.Thread(target=server.serve_forever, daemon=True).start()
-
-
 def _set_timeout(device: AndroidDevice, config_file: str, value: str) -> None:
-    device.force_stop()
-    path = f"shared_prefs/{device.package}_preferences_{config_file}.xml"
-    xml = device.read_prefs(path)
-    if "<map" not in xml:
-        raise RuntimeError(f"prefs file {path} not initialized yet")
-    entry = f'<float name="{TIMEOUT_KEY}" value="{value}" />'
-    pattern = re.compile(rf'<float name="{re.escape(TIMEOUT_KEY)}" value="[^"]*" />')
-    xml = pattern.sub(entry, xml) if pattern.search(xml) else xml.replace("</map>", f"    {entry}\n</map>")
-    device.write_prefs(path, xml)
+    with device.prefs(f"{device.package}_preferences_{config_file}") as prefs:
+        if not prefs.exists:
+            raise RuntimeError(f"prefs file {prefs.path} not initialized yet")
+        prefs.set(TIMEOUT_KEY, value, "float")
 
 
 def _wait_loaded(device: AndroidDevice, timeout: float = 30.0) -> None:
@@ -108,8 +73,7 @@ def main() -> int:
     device = AndroidDevice(args.serial)
     tag = args.serial.replace(":", "_")
     os.makedirs(OUT_DIR, exist_ok=True)
-    _serve()
-    device.reverse(PORT)
+    server.acquire(device)
 
     _set_timeout(device, args.config, args.timeout)
     try:
@@ -137,10 +101,7 @@ def main() -> int:
             _set_timeout(device, args.config, DEFAULT_VALUE)
         except Exception as e:  # noqa: BLE001
             print(f"WARNING: could not reset timeout pref: {e}")
-        try:
-            device.reverse_remove(PORT)
-        except Exception:  # noqa: BLE001
-            pass
+        server.release()
     return 0 if hidden else 1
 
 
@@ -17,12 +17,36 @@ smallest-width-dp — see fulguris.settings.Config), which lets us track runs
 over time and spot regressions for a specific screen/orientation — the part
 that matters most for foldables, where each screen is a distinct configuration.
 
+Benchmarks (``*_bench.py``) are stored the same way, one file per benchmark +
+configuration + serial, under a ``bench/`` subfolder of the model folder:
+
+    scripts/tests/results/<MODEL>/bench/<bench>-<config-id>-<serial>.yaml
+    scripts/tests/results/<MODEL>/bench/<bench>-<config-id>-<serial>.md
+
+With ``run.py --flight-recorder`` a failed test's last seconds of screen video
+and log are saved under ``<MODEL>/flight/<config-id>-<serial>/<test>/`` and
+listed in the test's ``artifacts``; those files are not committed. The same
+folder takes each test's system trace with ``run.py --trace``; for an atrace
+capture the test also carries a ``trace`` block, the app main thread's busiest
+slices (see framework/trace.py).
+
+With ``run.py --sample`` each test also carries a ``process`` block: peak
+PSS / RSS, CPU seconds and thread counts of the app over the test, with short
+time series (see framework/sampler.py). The Markdown shows them as sparklines,
+per test and as a per-run trend, so a leak or a spinning thread is visible at a
+glance.
+
+A benchmark record carries a ``series`` (one row per measured point, e.g. one
+per tab count) and a ``summary`` of derived figures (slopes, percentiles), so a
+regression shows up as a diff of the committed file.
+
 Requires PyYAML (`pip install pyyaml`); everything else is stdlib.
 """
 from __future__ import annotations
 
 import os
 import re
+import statistics
 from datetime import datetime, timezone
 
 import yaml
@@ -30,6 +54,7 @@ import yaml
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
 
 _STATUS_MARK = {"pass": "✅ pass", "fail": "❌ fail", "error": "⚠️ error"}
+_SPARK = "▁▂▃▄▅▆▇█"
 
 
 def _sanitize(text: str) -> str:
@@ -42,6 +67,12 @@ def model_dir(model: str, results_dir: str = RESULTS_DIR) -> str:
     return os.path.join(results_dir, _sanitize(model))
 
 
+def artifact_dir(device: dict, serial: str, test: str, results_dir: str = RESULTS_DIR) -> str:
+    """Where a test's flight recording and trace go (not committed; see tests/.gitignore)."""
+    return os.path.join(model_dir(device["model"], results_dir), "flight",
+                        f"{_sanitize(device['config_id'])}-{_sanitize(serial)}", _sanitize(test))
+
+
 def _run_paths(record: dict, results_dir: str = RESULTS_DIR) -> tuple[str, str]:
     base = os.path.join(
         model_dir(record["device"]["model"], results_dir),
@@ -50,14 +81,8 @@ def _run_paths(record: dict, results_dir: str = RESULTS_DIR) -> tuple[str, str]:
     return base + ".yaml", base + ".md"
 
 
-def build_record(device: dict, package: str, options: dict,
-                 tests: list[dict], duration_s: float) -> dict:
-    """Assemble the record for one run from its per-test results.
-
-    Each entry in ``tests`` is {"name", "status", "duration_s", "message"?} where
-    status is "pass", "fail" or "error".
-    """
-    passed = sum(1 for t in tests if t["status"] == "pass")
+def _identity(device: dict) -> dict:
+    """The timestamp + device + config header shared by run and benchmark records."""
     return {
         "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
         "device": {
@@ -73,7 +98,22 @@ def build_record(device: dict, package: str, options: dict,
             "rotation": device["rotation"],
             "smallest_width_dp": device["smallest_width_dp"],
         },
+    }
+
+
+def build_record(device: dict, package: str, options: dict,
+                 tests: list[dict], duration_s: float, apk_sha256: str | None = None) -> dict:
+    """Assemble the record for one run from its per-test results.
+
+    Each entry in ``tests`` is {"name", "status", "duration_s", "message"?} where
+    status is "pass", "fail" or "error". ``apk_sha256`` fingerprints the build
+    that was tested (see Device.app_fingerprint).
+    """
+    passed = sum(1 for t in tests if t["status"] == "pass")
+    return {
+        **_identity(device),
         "package": package,
+        "apk_sha256": apk_sha256,
         "options": options,
         "summary": {
             "passed": passed,
@@ -96,6 +136,57 @@ def load_last_run(model: str, config_id: str, serial: str,
         return yaml.safe_load(fh)
 
 
+def sparkline(values: list) -> str:
+    """A one-line Unicode bar chart of ``values`` (None entries are skipped)."""
+    values = [v for v in values if v is not None]
+    if not values:
+        return ""
+    lo, hi = min(values), max(values)
+    if hi == lo:
+        return _SPARK[0] * len(values)
+    return "".join(_SPARK[int((v - lo) * (len(_SPARK) - 1) / (hi - lo))] for v in values)
+
+
+def _mb(kb: int | None) -> str:
+    return f"{kb / 1024:.0f} MB" if kb else "?"
+
+
+def _process_line(p: dict) -> str:
+    series = p.get("series", {})
+    parts = []
+    if p.get("peak_pss_kb"):
+        parts.append(f"PSS peak {_mb(p['peak_pss_kb'])} {sparkline(series.get('pss_kb', []))}")
+    parts.append(f"RSS peak {_mb(p['peak_rss_kb'])} {sparkline(series.get('rss_kb', []))}")
+    cpu = f"CPU {p['cpu_s']} s" + (f" ({p['cpu_pct']}%)" if p.get("cpu_pct") is not None else "")
+    parts.append(f"{cpu} {sparkline(series.get('cpu_s', []))}")
+    parts.append(f"threads {p['threads_end']} (max {p['threads_max']}) {sparkline(series.get('threads', []))}")
+    if p.get("restarts"):
+        parts.append(f"{p['restarts']} restart(s)")
+    return "process: " + ", ".join(parts)
+
+
+def _trace_line(trace: dict, top: int = 5) -> str:
+    slices = ", ".join(f"{name} {s['total_ms']:.0f} ms ×{s['count']} (max {s['max_ms']:.0f})"
+                       for name, s in list(trace.get("top", {}).items())[:top])
+    return f"main thread: {trace['slices']} slices, {trace['busy_ms']:.0f} ms busy" + (f"; {slices}" if slices else "")
+
+
+def _process_trend(tests: list[dict]) -> list[str]:
+    """Per-run trend of the sampled figures, one point per test in run order."""
+    sampled = [t["process"] for t in tests if t.get("process")]
+    if not sampled:
+        return []
+    lines = ["", "## Process trend", "", "One point per sampled test, in run order.", ""]
+    for label, key, fmt in (("Peak PSS", "peak_pss_kb", _mb), ("Peak RSS", "peak_rss_kb", _mb),
+                            ("CPU seconds", "cpu_s", str), ("Threads at end", "threads_end", str)):
+        values = [p.get(key) for p in sampled]
+        known = [v for v in values if v is not None]
+        if known:
+            lines.append(f"- **{label}:** `{sparkline(values)}` "
+                         f"{fmt(known[0])} → {fmt(known[-1])} (max {fmt(max(known))})")
+    return lines
+
+
 def render_markdown(record: dict, descriptions: dict) -> str:
     """Render a human-readable Markdown report for one run."""
     device, config, options = record["device"], record["config"], record["options"]
@@ -109,7 +200,8 @@ def render_markdown(record: dict, descriptions: dict) -> str:
         f"(serial `{device['serial']}`)",
         f"- **Config:** {config['orientation']}, rotation {config['rotation']}°, "
         f"smallest width {config['smallest_width_dp']}dp",
-        f"- **Package:** `{record['package']}`",
+        f"- **Package:** `{record['package']}`"
+        + (f" (APK sha256 `{record['apk_sha256'][:12]}`)" if record.get("apk_sha256") else ""),
         f"- **Options:** restart={options['restart']}, keep_tabs={options['keep_tabs']}, "
         f"orientation={options['orientation'] or 'default'}, "
         f"filter={options['test_filter'] or 'all'}",
@@ -126,6 +218,17 @@ def render_markdown(record: dict, descriptions: dict) -> str:
         lines.append(f"| `{t['name']}` | {desc} | {status} | {t['duration_s']}s |")
         if t["status"] != "pass" and t.get("message"):
             lines.append(f"| | _{t['message']}_ | | |")
+        if t.get("artifacts"):
+            lines.append(f"| | artifacts: {', '.join(f'`{a}`' for a in t['artifacts'])} | | |")
+        for name, value in (t.get("metrics") or {}).items():
+            if isinstance(value, dict):
+                value = ", ".join(f"{k}={v}" for k, v in value.items())
+            lines.append(f"| | {name}: {value} | | |")
+        if t.get("process"):
+            lines.append(f"| | {_process_line(t['process'])} | | |")
+        if t.get("trace"):
+            lines.append(f"| | {_trace_line(t['trace'])} | | |")
+    lines += _process_trend(record["tests"])
     lines.append("")
     return "\n".join(lines)
 
@@ -175,3 +278,102 @@ def compare(prev: dict | None, curr: dict) -> dict:
         "new": new,
         "removed": removed,
     }
+
+
+# --- Benchmarks ------------------------------------------------------------
+
+
+def _bench_paths(record: dict, results_dir: str = RESULTS_DIR) -> tuple[str, str]:
+    base = os.path.join(
+        model_dir(record["device"]["model"], results_dir), "bench",
+        f"{_sanitize(record['bench'])}-{_sanitize(record['config']['id'])}-"
+        f"{_sanitize(record['device']['serial'])}",
+    )
+    return base + ".yaml", base + ".md"
+
+
+def build_bench_record(device: dict, package: str, bench: str, params: dict,
+                       series: list[dict], summary: dict | None = None) -> dict:
+    """Assemble a benchmark record.
+
+    ``series`` is a list of flat dicts sharing the same keys (one row per measured
+    point); ``summary`` holds the derived figures (slopes, percentiles, verdicts).
+    """
+    return {
+        **_identity(device),
+        "package": package,
+        "bench": bench,
+        "params": params,
+        "summary": summary or {},
+        "series": series,
+    }
+
+
+
+def median(values: list) -> float | None:
+    """Median of the non-None ``values`` (2 decimals), None when there are none."""
+    valid = [v for v in values if v is not None]
+    return round(statistics.median(valid), 2) if valid else None
+
+
+def slope_per_100(series: list[dict], x_key: str, column: str, min_x: float = 0,
+                  digits: int = 1) -> float | None:
+    """Least-squares growth of ``column`` per 100 units of ``x_key`` over the rows with
+    ``x_key >= min_x`` (e.g. past a warm-up), None with < 2 points."""
+    points = [(row[x_key], row[column]) for row in series
+              if row[x_key] >= min_x and row.get(column) is not None]
+    if len(points) < 2:
+        return None
+    slope, _ = statistics.linear_regression([p[0] for p in points], [p[1] for p in points])
+    return round(slope * 100, digits)
+
+
+def load_last_bench(model: str, config_id: str, serial: str, bench: str,
+                    results_dir: str = RESULTS_DIR) -> dict | None:
+    """Return the previously-saved record of ``bench`` for this model + config + serial, if any."""
+    path = os.path.join(model_dir(model, results_dir), "bench",
+                        f"{_sanitize(bench)}-{_sanitize(config_id)}-{_sanitize(serial)}.yaml")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as fh:
+        return yaml.safe_load(fh)
+
+
+def render_bench_markdown(record: dict) -> str:
+    """Render a benchmark record as a Markdown summary plus one table of its series."""
+    device, config = record["device"], record["config"]
+    lines = [
+        f"# Benchmark {record['bench']} — {device['model']} · {config['id']}",
+        "",
+        f"- **When:** {record['timestamp']}",
+        f"- **Device:** {device.get('product_name') or device['model']} — Android {device['android']} "
+        f"(serial `{device['serial']}`)",
+        f"- **Package:** `{record['package']}`"
+        + (f" (APK sha256 `{record['apk_sha256'][:12]}`)" if record.get("apk_sha256") else ""),
+        f"- **Params:** " + (", ".join(f"{k}={v}" for k, v in record["params"].items()) or "defaults"),
+    ]
+    for key, value in record["summary"].items():
+        lines.append(f"- **{key}:** {value}")
+    series = record["series"]
+    if series:
+        columns = list(series[0])
+        lines += ["", "| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+        for row in series:
+            lines.append("| " + " | ".join(str(row.get(c, "")) for c in columns) + " |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def save_bench(record: dict, results_dir: str = RESULTS_DIR) -> tuple[str, str]:
+    """Write (overwrite) the YAML + Markdown for a benchmark; return (yaml_path, md_path)."""
+    yaml_path, md_path = _bench_paths(record, results_dir)
+    os.makedirs(os.path.dirname(yaml_path), exist_ok=True)
+
+    header = (f"# Fulguris benchmark {record['bench']} — "
+              f"{record['device']['model']} · {record['config']['id']}\n")
+    with open(yaml_path, "w", encoding="utf-8") as fh:
+        fh.write(header + yaml.safe_dump(record, sort_keys=False, allow_unicode=True, width=1000))
+
+    with open(md_path, "w", encoding="utf-8") as fh:
+        fh.write(render_bench_markdown(record))
+    return yaml_path, md_path
@@ -28,6 +28,22 @@ Examples:
     # Show a device notification with the test currently running
     python scripts/tests/run.py --device 192.168.178.67:5555 --notify
 
+    # Enforce the optional frame-timing budgets (jank / p90) of the cursor tests
+    python scripts/tests/run.py --device 192.168.178.67:5555 --group cursor-movement --perf
+
+    # Sample the app's CPU time, memory and threads every second, per test
+    python scripts/tests/run.py --device 192.168.178.67:5555 --group all --sample
+
+    # Capture a system trace (atrace text; or perfetto) around every test, saved
+    # next to the results, with the app main thread's slowest slices in the record
+    python scripts/tests/run.py --device 192.168.178.67:5555 --test toolbar --trace
+
+    # Keep the last 30s of screen video + log, saved only for failing tests
+    python scripts/tests/run.py --device 192.168.178.67:5555 --group all --flight-recorder 30
+
+    # Accept the current look of the screens checked with Device.assert_screen
+    python scripts/tests/run.py --device 192.168.178.67:5555 --test pill --update-screens
+
     # List available tests
     python scripts/tests/run.py --list
 
@@ -48,6 +64,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 import adb
 import framework
+from framework.flight import FlightRecorder
+from framework.sampler import ProcessSampler, summarize
+from framework.trace import Tracer
 import results as results_store
 import url_field_tests as suite
 import smoke_tests
@@ -104,8 +123,13 @@ def run_one(t, device, ctx: dict) -> tuple[float, str | None]:
 
     The tabs the test created are closed again afterwards (hygiene) unless
     --keep-tabs was passed; see framework.tabs_opened() / framework.keep_tabs().
+    Measurements a test reports in ``ctx["metrics"]`` (e.g. frame timing), and
+    its Device.assert_screen checks, are left there for the caller to attach to
+    the test's record.
     """
     framework.reset_tab_counter()
+    framework.begin_test(t.__name__)
+    ctx["metrics"] = {}
     t0 = time.monotonic()
     try:
         t(device, ctx)
@@ -116,11 +140,25 @@ def run_one(t, device, ctx: dict) -> tuple[float, str | None]:
         traceback.print_exc()
         result = f"ERROR {t.__name__}: {e}"
     elapsed = time.monotonic() - t0
+    for check in framework.screen_checks():
+        ctx["metrics"][f"screen {check.pop('name')}"] = check
     if not framework.keep_tabs() and framework.tabs_opened() > 0:
         device.close_tabs(framework.tabs_opened())
     return elapsed, result
 
 
+def _stop_diagnostics(recorder, sampler, tracer) -> None:
+    """Stop the flight recorder, process sampler and any trace still capturing."""
+    for name, stop in (("trace", tracer and tracer.cancel), ("flight recorder", recorder and recorder.stop),
+                       ("process sampler", sampler and sampler.stop)):
+        if not stop:
+            continue
+        try:
+            stop()
+        except Exception as e:  # noqa: BLE001 - keep stopping the others
+            print(f"  note: could not stop the {name} ({e})")
+
+
 def _status(error: str | None) -> str:
     if error is None:
         return "pass"
@@ -144,11 +182,27 @@ def main() -> int:
                         help="Do not append the run to scripts/tests/results/")
     parser.add_argument("--notify", action="store_true",
                         help="Show a device notification with the test currently running (dismissed at the end)")
+    parser.add_argument("--perf", action="store_true",
+                        help="Enforce the optional performance budgets (frame timing); default: measure and record only")
+    parser.add_argument("--flight-recorder", type=int, metavar="SECONDS", nargs="?", const=30,
+                        help="Keep a rolling screen recording + log of the last SECONDS (default 30) "
+                             "and save it next to the results of every failed test")
+    parser.add_argument("--sample", type=float, metavar="SECONDS", nargs="?", const=1.0,
+                        help="Sample the app's CPU time, RSS/PSS and threads every SECONDS (default 1) "
+                             "and attach the series to every test's record")
+    parser.add_argument("--trace", choices=adb.TRACE_MODES, nargs="?", const="atrace",
+                        help="Capture a system trace around every test (default atrace; perfetto needs Android 9) "
+                             "and save it next to the test's results")
+    parser.add_argument("--trace-categories", default=",".join(adb.TRACE_CATEGORIES),
+                        help="Comma-separated atrace categories for --trace")
+    parser.add_argument("--update-screens", action="store_true",
+                        help="Record the current screens as the new assert_screen baselines")
     parser.add_argument("--list", action="store_true", help="List available tests and exit")
     args = parser.parse_args()
 
     framework.reset_between_tests(args.restart)
     framework.set_keep_tabs(args.keep_tabs)
+    framework.set_screen_store(update=args.update_screens)
 
     if args.list:
         for t in ALL_TESTS:
@@ -174,35 +228,79 @@ def main() -> int:
         print(f"  config: {config['config_id']}  "
               f"({config['orientation']}, rot {config['rotation']}°, sw{config['smallest_width_dp']}dp, "
               f"Android {config['android']})")
-        ctx: dict = {"notes": []}
+        ctx: dict = {"notes": [], "perf": args.perf}
+        recorder = FlightRecorder(device, args.flight_recorder) if args.flight_recorder else None
+        sampler = ProcessSampler(device, args.sample) if args.sample else None
+        categories = tuple(c.strip() for c in args.trace_categories.split(",") if c.strip())
+        tracer = Tracer(device, args.trace, categories) if args.trace else None
         passed = 0
         timings: list[tuple[str, float]] = []
         test_records: list[dict] = []
         device_start = time.monotonic()
-        if args.notify:
-            # Clear any leftover from a previously crashed run, then show the run banner.
-            try:
-                adb.dismiss_test_notification(device.id)
-                adb.post_test_notification(device.id, f"Running {len(tests)} test(s) on {device.label()}")
-            except Exception as e:  # noqa: BLE001 - never let a notification fail a run
-                print(f"  note: --notify unavailable on this device ({e}); continuing without it")
-        for i, t in enumerate(tests, 1):
+        # The recorder's screenrecord loop and a trace keep running on the device
+        # after the host is gone: stop them however the loop ends (Ctrl+C included).
+        try:
+            if recorder:
+                recorder.start()
+            if sampler:
+                sampler.start()
             if args.notify:
+                # Clear any leftover from a previously crashed run, then show the run banner.
                 try:
-                    adb.post_test_notification(device.id, f"({i}/{len(tests)}) {t.__name__}")
-                except Exception:  # noqa: BLE001 - notification is cosmetic; never fail a run
-                    pass
-            elapsed, error = run_one(t, device, ctx)
-            timings.append((t.__name__, elapsed))
-            record = {"name": t.__name__, "status": _status(error), "duration_s": round(elapsed, 1)}
-            if error:
-                overall_ok = False
-                record["message"] = error.split(": ", 1)[-1]
-                print(f"  {error}  ({elapsed:.1f}s)")
-            else:
-                passed += 1
-                print(f"  PASS  {t.__name__}  ({elapsed:.1f}s)")
-            test_records.append(record)
+                    adb.dismiss_test_notification(device.id)
+                    adb.post_test_notification(device.id, f"Running {len(tests)} test(s) on {device.label()}")
+                except Exception as e:  # noqa: BLE001 - never let a notification fail a run
+                    print(f"  note: --notify unavailable on this device ({e}); continuing without it")
+            for i, t in enumerate(tests, 1):
+                if args.notify:
+                    try:
+                        adb.post_test_notification(device.id, f"({i}/{len(tests)}) {t.__name__}")
+                    except Exception:  # noqa: BLE001 - notification is cosmetic; never fail a run
+                        pass
+                mark = sampler.mark() if sampler else 0.0
+                if tracer:
+                    try:
+                        tracer.start()
+                    except Exception as e:  # noqa: BLE001 - the trace is a diagnostic; never fail a run on it
+                        print(f"  note: could not start the trace ({e})")
+                elapsed, error = run_one(t, device, ctx)
+                timings.append((t.__name__, elapsed))
+                record = {"name": t.__name__, "status": _status(error), "duration_s": round(elapsed, 1)}
+                if ctx["metrics"]:
+                    record["metrics"] = ctx["metrics"]
+                process = summarize(sampler.since(mark)) if sampler else None
+                if process:
+                    record["process"] = process
+                if tracer and tracer.running:
+                    dest = results_store.artifact_dir(config, device.id, t.__name__)
+                    try:
+                        path, slices = tracer.stop(dest, t.__name__)
+                        if path:
+                            record.setdefault("artifacts", []).append(os.path.basename(path))
+                        if slices:
+                            record["trace"] = slices
+                    except Exception as e:  # noqa: BLE001 - the trace is a diagnostic; never fail a run on it
+                        print(f"    note: could not save the trace ({e})")
+                if error:
+                    overall_ok = False
+                    record["message"] = error.split(": ", 1)[-1]
+                    print(f"  {error}  ({elapsed:.1f}s)")
+                    if recorder:
+                        dest = results_store.artifact_dir(config, device.id, t.__name__)
+                        try:
+                            saved = recorder.save(dest)
+                            record.setdefault("artifacts", []).extend(os.path.basename(p) for p in saved)
+                            print(f"    flight recording: {len(saved)} file(s) -> {os.path.relpath(dest)}")
+                        except Exception as e:  # noqa: BLE001 - the recording is a diagnostic; never fail a run on it
+                            print(f"    note: could not save the flight recording ({e})")
+                else:
+                    passed += 1
+                    print(f"  PASS  {t.__name__}  ({elapsed:.1f}s)")
+                test_records.append(record)
+        finally:
+            _stop_diagnostics(recorder, sampler, tracer)
+        if sampler and sampler.errors:
+            print(f"  note: {sampler.errors} process sample(s) failed")
         device_elapsed = time.monotonic() - device_start
         print(f"  -> {passed}/{len(tests)} passed in {device_elapsed:.1f}s")
         if timings:
@@ -225,8 +323,10 @@ def main() -> int:
                 config, package,
                 {"restart": args.restart, "keep_tabs": args.keep_tabs,
                  "orientation": args.orientation, "test_filter": args.test,
-                 "group": selected_group},
-                test_records, device_elapsed,
+                 "group": selected_group, "perf": args.perf,
+                 "update_screens": args.update_screens, "flight_recorder": args.flight_recorder,
+                 "sample_s": args.sample, "trace": tracer.mode if tracer else None},
+                test_records, device_elapsed, device.app_fingerprint(),
             )
             diff = results_store.compare(previous, record)
             yaml_path, md_path = results_store.save_run(record, TEST_DESCRIPTIONS)
@@ -242,6 +342,9 @@ def main() -> int:
 
         if saved_state is not None:
             device.restore_orientation(*saved_state)
+    pruned = framework.prune_screens()
+    if pruned:
+        print(f"\nscreen store: dropped {pruned} screen(s) no baseline references")
     print(f"\nTotal: {time.monotonic() - total_start:.1f}s across {len(devices)} device(s)")
 
     return 0 if overall_ok else 1
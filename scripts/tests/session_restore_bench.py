@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Benchmark: cold-start session restore time as the number of saved tabs grows.
+
+On a cold start Fulguris restores the previous session asynchronously, and
+``tools/repro_flake.py`` shows user input racing with it. This measures how the
+restore scales: for each step of ``--steps`` (default 1, 10, 50, 100, 200, 300
+tabs) it seeds a saved session of that many tabs, force-stops the app and cold
+starts it ``--repeats`` times, recording:
+
+  * interactive - host seconds from ``am start`` until the address field
+    (``:id/search``) is in the hierarchy *and* focusable;
+  * restored    - device seconds from ``am start`` until TabsManager logs
+    ``initializeTabs: created <n> tabs`` (the app's debug log is switched on
+    for the run, and switched back afterwards), with the tab count it logged.
+
+Seeding a step the first time opens the tabs through the harness against the
+local ``assets/tab_target.html`` (like tab_scaling_bench.py), backgrounds the
+app so it saves the session, and keeps a copy of the session files
+(``files/SESSION*``, read via ``run-as``) under
+``scripts/tests/out/session-seeds/<serial>/<apk>/<tabs>/``. Later runs of the
+same build write those files back instead, which takes seconds instead of half
+an hour. The median of each figure per step is saved to the results store
+(``results/<MODEL>/bench/session-restore-*``, see results.py) with its slope
+per 100 tabs.
+
+    python scripts/tests/session_restore_bench.py --device SERIAL
+    python scripts/tests/session_restore_bench.py --all --steps 1,50,300 --repeats 5
+    python scripts/tests/session_restore_bench.py --device SERIAL --reseed --no-save
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import framework  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import keys, server  # noqa: E402
+import results as results_store  # noqa: E402
+
+BENCH = "session-restore"
+DEFAULT_STEPS = (1, 10, 50, 100, 200, 300)
+SEED_DIR = os.path.join(os.path.dirname(__file__), "out", "session-seeds")
+SESSION_DIR = "files"
+SESSION_FILES = ("SESSION", "SAVED_TABS")   # SESSIONS (the list) + SESSION_<name> + the legacy file
+LOGS_KEY = "pref_key_logs"
+RESTORED_MARKER = "initializeTabs: created"
+INTERACTIVE_TIMEOUT = 120.0
+RESTORE_TIMEOUT = 180.0
+SAVE_WAIT_S = 3.0      # HOME -> onStop -> the session is written
+
+
+def _seed_path(device, tabs: int) -> str:
+    build = (device.app_fingerprint() or "unknown")[:12]
+    return os.path.join(SEED_DIR, device.safe_id, build, str(tabs))
+
+
+def save_seed(device, path: str) -> int:
+    """Background the app (it saves its session) and copy the session files to ``path``.
+
+    Raises RuntimeError (and keeps no seed) if a session file cannot be read.
+    """
+    device.key(keys.HOME, wait=SAVE_WAIT_S)
+    names = [n for n in device.list_app_files(SESSION_DIR) if n.startswith(SESSION_FILES)]
+    files = {}
+    for name in names:
+        data = device.read_app_bytes(f"{SESSION_DIR}/{name}")
+        if data is None:
+            raise RuntimeError(f"could not read {SESSION_DIR}/{name} on {device.id}; no seed saved")
+        files[name] = data
+    os.makedirs(path, exist_ok=True)
+    for name, data in files.items():
+        with open(os.path.join(path, name), "wb") as fh:
+            fh.write(data)
+    return len(names)
+
+
+def load_seed(device, path: str) -> bool:
+    """Write a saved seed back into the (stopped) app; False if there is none or it
+    could not be written (the step is then seeded through the harness)."""
+    if not os.path.isdir(path) or not os.listdir(path):
+        return False
+    device.force_stop()
+    for name in os.listdir(path):
+        with open(os.path.join(path, name), "rb") as fh:
+            data = fh.read()
+        try:
+            device.write_app_bytes(f"{SESSION_DIR}/{name}", data)   # verified by reading it back
+        except RuntimeError as e:
+            print(f"  seed {os.path.relpath(path)} not restored ({e}); re-seeding")
+            return False
+    return True
+
+
+def open_tabs(device, srv, tabs: int, opened: int) -> int:
+    """Open tabs (typed URLs) until ``tabs`` are open; return the new count."""
+    while opened < tabs:
+        opened += 1
+        device.navigate(srv.url("tab_target.html", bust=False, n=opened), reset=False)
+    return opened
+
+
+def _interactive(device) -> bool:
+    if not device.view_present("search"):
+        return False
+    node = device.field_node()
+    return bool(node and node.focusable)
+
+
+def measure(device) -> dict:
+    """Force-stop and cold start once; the interactive and restored times."""
+    device.force_stop()
+    time.sleep(0.5)
+    t0 = time.monotonic()
+    device_t0 = device.cold_start()
+    interactive = None
+    while time.monotonic() - t0 < INTERACTIVE_TIMEOUT:
+        if _interactive(device):
+            interactive = time.monotonic() - t0
+            break
+        time.sleep(0.1)
+    restored, count = None, None
+    while time.monotonic() - t0 < RESTORE_TIMEOUT:
+        lines = device.logcat_epoch(RESTORED_MARKER)
+        if lines:
+            at, line = lines[0]
+            restored = at - device_t0
+            m = re.search(r"created (\d+) tabs", line)
+            count = int(m.group(1)) if m else None
+            break
+        time.sleep(0.5)
+    return {"interactive_s": interactive, "restored_s": restored, "restored_tabs": count}
+
+
+def bench_device(device, steps: list[int], repeats: int, reseed: bool) -> list[dict]:
+    srv = server.acquire(device)   # the restored current tab reloads its page from here
+    series = []
+    opened = None   # tabs currently open through open_tabs (None: not built this run)
+    try:
+        for tabs in steps:
+            path = _seed_path(device, tabs)
+            if reseed and os.path.isdir(path):
+                shutil.rmtree(path)
+            if load_seed(device, path):
+                print(f"  {tabs} tabs: seeded from {os.path.relpath(path)}")
+                opened = None
+            else:
+                if opened is None:
+                    device.restart()
+                    if not device.clean_tabs():   # leaves the app's single home tab
+                        print("  !! could not reach a clean tab slate")
+                    framework.reset_tab_counter()
+                    opened = 1
+                else:
+                    device.launch()
+                print(f"  {tabs} tabs: opening {tabs - opened} tab(s) to seed the session ...")
+                opened = open_tabs(device, srv, tabs, opened)
+                saved = save_seed(device, path)
+                print(f"  {tabs} tabs: saved {saved} session file(s) -> {os.path.relpath(path)}")
+            runs = [measure(device) for _ in range(repeats)]
+            row = {"tabs": tabs,
+                   "interactive_s": results_store.median([r["interactive_s"] for r in runs]),
+                   "restored_s": results_store.median([r["restored_s"] for r in runs]),
+                   "restored_tabs": runs[-1]["restored_tabs"],
+                   "runs": len(runs)}
+            series.append(row)
+            print(f"  {tabs:4d} tabs: interactive {row['interactive_s']} s, all restored {row['restored_s']} s "
+                  f"({row['restored_tabs']} tabs logged)")
+            # The measured cold starts reloaded the current tab; extending this session
+            # for the next step must start from what the app now has open.
+            if opened is not None:
+                opened = row["restored_tabs"] or opened
+    finally:
+        server.release()
+    return series
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", help="Target a specific adb device serial")
+    parser.add_argument("--all", action="store_true", help="Benchmark all connected devices")
+    parser.add_argument("--package", help="Override the app package to test")
+    parser.add_argument("--steps", default=",".join(str(s) for s in DEFAULT_STEPS),
+                        help="Comma-separated saved-tab counts (ascending)")
+    parser.add_argument("--repeats", type=int, default=3, help="Cold starts per step (median is kept)")
+    parser.add_argument("--reseed", action="store_true", help="Rebuild the session seeds through the harness")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results to scripts/tests/results/")
+    args = parser.parse_args()
+
+    steps = sorted({int(s) for s in args.steps.split(",") if s.strip()})
+    for device in framework.resolve_devices(args.device, args.all, args.package):
+        config = device.config()
+        print(f"\n=== {BENCH} on {device.label()}  steps={steps} x{args.repeats} ===")
+        # The restore marker is a debug log line: turn the app's logs on for the run.
+        with device.prefs(restore=True) as prefs:
+            prefs.set(LOGS_KEY, True)
+            prefs.commit()
+            series = bench_device(device, steps, args.repeats, args.reseed)
+        summary = {"interactive_s_per_100_tabs":
+                       results_store.slope_per_100(series, "tabs", "interactive_s", digits=2),
+                   "restored_s_per_100_tabs":
+                       results_store.slope_per_100(series, "tabs", "restored_s", digits=2),
+                   **{f"restored_s_at_{row['tabs']}": row["restored_s"] for row in series}}
+        print("  " + ", ".join(f"{k}={v}" for k, v in summary.items()))
+        if not args.no_save:
+            record = results_store.build_bench_record(
+                config, device.package, BENCH, {"steps": steps, "repeats": args.repeats}, series, summary)
+            yaml_path, md_path = results_store.save_bench(record)
+            print(f"  saved -> {os.path.relpath(yaml_path)}  [+ {os.path.basename(md_path)}]")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
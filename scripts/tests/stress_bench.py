@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Benchmark: the browser under generated stress pages, at increasing scale.
+
+Loads the host server's generated stress page (``/gen/stress.html``, see
+framework/pages.py and assets/stress.js) over the ``adb reverse`` tunnel with
+one parameter swept per scenario:
+
+  * ``rearm``   - theme-color churn every ``--theme-rates`` ms (0 = none) with a
+    ``--hide-timeout`` s "Hide tool bar after": the seconds from the page's load
+    event until the tool bar hides. Every theme change is reported through the
+    console and handled as a tab change; if that re-arms the countdown, the hide
+    comes late or never (the theme_flipper.html regression, at higher rates).
+  * ``console`` - console spam (``--console-burst`` messages every
+    ``--console-rates`` ms) while the page is wheel-scrolled: the app's frame
+    timing (Device.frame_stats) and the page's own scroll frame intervals, i.e.
+    what handling the messages costs the UI.
+  * ``scroll``  - DOM size (``--nodes`` elements, with images and iframes in
+    proportion): the load time, and the same app / page frame figures for a
+    wheel scroll through the page.
+
+Scrolling uses cursor mode's media-key wheel (rewind = wheel down), the path the
+cursor suite already covers. Each scenario is saved to the results store as its
+own benchmark (``results/<MODEL>/bench/stress-<scenario>-*``, see results.py).
+
+    python scripts/tests/stress_bench.py --device SERIAL
+    python scripts/tests/stress_bench.py --all --scenarios scroll --nodes 1000,20000,100000
+    python scripts/tests/stress_bench.py --device SERIAL --scenarios rearm --theme-rates 0,1000,100 --no-save
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import framework  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import keys, pages, server  # noqa: E402
+import results as results_store  # noqa: E402
+import toolbar_hide_tests as th  # noqa: E402  (hide-timeout pref + hide detection)
+
+SCENARIOS = ("rearm", "console", "scroll")
+LOAD_TIMEOUT = 120.0     # the RPi TV needs a while for the largest DOMs
+REARM_GRACE = 15.0       # watch this long past the timeout before calling it "never"
+SCROLL_REPORT_TIMEOUT = 5.0
+BASE = {"nodes": 2000, "height": 20000, "timers": 2}   # the page the rate sweeps run on
+
+
+def _ints(text: str) -> list[int]:
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def load(device, srv, **params) -> dict | None:
+    """Open the stress page for ``params``; its load timing, or None if it never reported."""
+    since = time.time()
+    device.navigate(srv.url(pages.STRESS, device=device, **params), reset=False)
+    event = device.wait_page_event("timing", timeout=LOAD_TIMEOUT, since=since)
+    return event["data"] if event else None
+
+
+def scroll(device, steps: int) -> tuple[dict, dict | None]:
+    """Wheel-scroll the page ``steps`` times in cursor mode; (app frame summary, page report)."""
+    device.key_longpress(keys.MEDIA_PLAY_PAUSE, wait=1.0)   # cursor on
+    since = time.time()
+    try:
+        with device.frame_stats() as frames:
+            for _ in range(steps):
+                device.key(keys.MEDIA_REWIND, wait=0.15)
+        event = device.wait_page_event("scroll", timeout=SCROLL_REPORT_TIMEOUT, since=since)
+    finally:
+        device.key_longpress(keys.MEDIA_PLAY_PAUSE, wait=1.0)   # cursor off
+    return frames.summary(), (event["data"] if event else None)
+
+
+def _scroll_row(app: dict, page: dict | None) -> dict:
+    page = page or {}
+    return {"app_jank_pct": app["jank_pct"], "app_p90_ms": app["p90_ms"], "app_frames": app["frames"],
+            "page_p50_ms": page.get("p50"), "page_p90_ms": page.get("p90"), "page_long": page.get("long"),
+            "scrolled_px": page.get("distance")}
+
+
+def bench_rearm(device, srv, rates: list[int], timeout_s: int) -> list[dict]:
+    th.set_hide_timeout(device, str(timeout_s))
+    device.launch()
+    series = []
+    try:
+        for rate in rates:
+            timing = load(device, srv, **BASE, theme_ms=rate)
+            hidden = th.wait_toolbar_hidden(device, timeout_s + REARM_GRACE) if timing else None
+            row = {"theme_ms": rate, "loaded": timing is not None,
+                   "hide_s": round(hidden, 2) if hidden is not None else None,
+                   "rearmed": hidden is None or hidden > timeout_s + 3.0}
+            series.append(row)
+            when = f"{row['hide_s']} s after load" if hidden is not None else f"not within {timeout_s + REARM_GRACE:.0f} s"
+            print(f"  theme every {rate or '-'} ms: tool bar hid {when}{'  <- re-armed' if row['rearmed'] else ''}")
+    finally:
+        th.restore_hide_timeout(device)
+    return series
+
+
+def bench_console(device, srv, rates: list[int], burst: int, steps: int) -> list[dict]:
+    device.launch()
+    series = []
+    for rate in rates:
+        timing = load(device, srv, **BASE, console_ms=rate, console_burst=burst)
+        app, page = scroll(device, steps) if timing else ({"jank_pct": None, "p90_ms": None, "frames": 0}, None)
+        row = {"console_ms": rate, "msgs_per_s": round(burst * 1000 / rate) if rate else 0, **_scroll_row(app, page)}
+        series.append(row)
+        print(f"  {row['msgs_per_s']:>5} msg/s: app jank {row['app_jank_pct']}% p90 {row['app_p90_ms']} ms, "
+              f"page frames p90 {row['page_p90_ms']} ms")
+    return series
+
+
+def bench_scroll(device, srv, sizes: list[int], steps: int) -> list[dict]:
+    device.launch()
+    series = []
+    for nodes in sizes:
+        timing = load(device, srv, nodes=nodes, images=nodes // 500, iframes=nodes // 5000)
+        app, page = scroll(device, steps) if timing else ({"jank_pct": None, "p90_ms": None, "frames": 0}, None)
+        row = {"nodes": nodes, "dom_nodes": (timing or {}).get("nodes"),
+               "load_ms": (timing or {}).get("load"), **_scroll_row(app, page)}
+        series.append(row)
+        print(f"  {nodes:>7} nodes: load {row['load_ms']} ms, app jank {row['app_jank_pct']}% "
+              f"p90 {row['app_p90_ms']} ms, page frames p90 {row['page_p90_ms']} ms ({row['page_long']} > 50 ms)")
+    return series
+
+
+def _summary(scenario: str, series: list[dict]) -> dict:
+    if scenario == "rearm":
+        return {f"hide_s_at_{r['theme_ms']}ms": r["hide_s"] for r in series}
+    if scenario == "console":
+        return {f"app_jank_pct_at_{r['msgs_per_s']}_msgs": r["app_jank_pct"] for r in series}
+    return {**{f"load_ms_at_{r['nodes']}": r["load_ms"] for r in series},
+            **{f"page_p90_ms_at_{r['nodes']}": r["page_p90_ms"] for r in series}}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", help="Target a specific adb device serial")
+    parser.add_argument("--all", action="store_true", help="Benchmark all connected devices")
+    parser.add_argument("--package", help="Override the app package to test")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated, of {', '.join(SCENARIOS)}")
+    parser.add_argument("--theme-rates", default="0,2000,500,100", help="rearm: theme-color flip periods (ms, 0 = none)")
+    parser.add_argument("--hide-timeout", type=int, default=5, help='rearm: "Hide tool bar after" (s)')
+    parser.add_argument("--console-rates", default="0,100,20,5", help="console: message periods (ms, 0 = none)")
+    parser.add_argument("--console-burst", type=int, default=5, help="console: messages per period")
+    parser.add_argument("--nodes", default="1000,10000,50000", help="scroll: DOM sizes (elements)")
+    parser.add_argument("--steps", type=int, default=20, help="console/scroll: wheel steps per scroll")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results to scripts/tests/results/")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s) {', '.join(unknown)}; known: {', '.join(SCENARIOS)}")
+    for device in framework.resolve_devices(args.device, args.all, args.package):
+        config = device.config()
+        srv = server.acquire(device)
+        try:
+            pages.install(srv)
+            for scenario in scenarios:
+                print(f"\n=== stress-{scenario} on {device.label()} ===")
+                if scenario == "rearm":
+                    params = {"theme_rates": _ints(args.theme_rates), "hide_timeout": args.hide_timeout, **BASE}
+                    series = bench_rearm(device, srv, params["theme_rates"], args.hide_timeout)
+                elif scenario == "console":
+                    params = {"console_rates": _ints(args.console_rates), "burst": args.console_burst,
+                              "steps": args.steps, **BASE}
+                    series = bench_console(device, srv, params["console_rates"], args.console_burst, args.steps)
+                else:
+                    params = {"nodes": _ints(args.nodes), "steps": args.steps}
+                    series = bench_scroll(device, srv, params["nodes"], args.steps)
+                # Every load opened a tab (a typed URL does); close them before the next scenario.
+                device.close_tabs(framework.tabs_opened(), wait=0.3)
+                framework.reset_tab_counter()
+                if not args.no_save:
+                    record = results_store.build_bench_record(
+                        config, device.package, f"stress-{scenario}", params, series, _summary(scenario, series))
+                    yaml_path, md_path = results_store.save_bench(record)
+                    print(f"  saved -> {os.path.relpath(yaml_path)}  [+ {os.path.basename(md_path)}]")
+        finally:
+            server.release()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Benchmark: memory and tab-UI latency as the number of open tabs grows.
+
+``adb.KEEP_TABS`` claims the tab count has no performance impact. This checks it:
+starting from a clean tab slate it opens tabs against the local asset server
+(``assets/tab_target.html?n=<i>``, served over an ``adb reverse`` tunnel like the
+cursor suite) up to each step of ``--steps`` (default 1, 10, 50, 100, 200), and at
+every step records:
+
+  * memory - ``dumpsys meminfo <package>`` App Summary (total PSS, Java heap,
+    native heap, graphics), the live WebView count, and the PSS of the WebView
+    renderer processes (``sandboxed_process``; not part of the app's own dump);
+  * latency - the median over ``--repeats`` of opening the tab switcher (tap ->
+    tab rows in the top activity, polled with ``dumpsys activity top`` so a sample
+    is up to one ~0.2 s poll late) and of a CTRL+TAB switch (key -> the toolbar
+    label shows another tab's "tab <n>" title).
+
+The curve is saved to the results store (``results/<MODEL>/bench/tab-scaling-*``,
+see results.py) with the PSS and Java-heap slopes per 100 tabs, so a regression in
+per-tab memory shows up as a diff of the committed file.
+
+    python scripts/tests/tab_scaling_bench.py --device SERIAL
+    python scripts/tests/tab_scaling_bench.py --all --steps 1,10,50
+    python scripts/tests/tab_scaling_bench.py --device SERIAL --no-save --keep-tabs
+
+Opening a tab is a full typed navigation (several adb round trips), so the
+default 200-tab run takes the better part of half an hour on the RPi TV.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import framework  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import keys  # noqa: E402
+import cursor_tests  # noqa: E402  (local asset server + reverse tunnel)
+import results as results_store  # noqa: E402
+
+BENCH = "tab-scaling"
+DEFAULT_STEPS = (1, 10, 50, 100, 200)
+SETTLE_S = 3.0          # let the last page finish loading before sampling memory
+SWITCH_TIMEOUT = 15.0   # give up on a single latency sample after this long
+
+
+def _tab_url(n: int) -> str:
+    return f"http://localhost:{cursor_tests.PORT}/tab_target.html?n={n}"
+
+
+def _time_switcher(device) -> float | None:
+    """Seconds from the tabs-button tap until the switcher's tab rows are in the top
+    activity (then closes it). The button is found before the clock starts and the
+    rows are polled with ``dumpsys activity top``, not uiautomator dumps."""
+    button = device.find_node(":id/tabs_button")
+    if not button or not button.bounds:
+        return None
+    x1, y1, x2, y2 = button.bounds
+    t0 = time.monotonic()
+    device.tap((x1 + x2) // 2, (y1 + y2) // 2, wait=0.0)
+    while time.monotonic() - t0 < SWITCH_TIMEOUT:
+        if device.view_present("textTab"):
+            elapsed = time.monotonic() - t0
+            device.key(keys.BACK, wait=0.8)
+            return elapsed
+    device.key(keys.BACK, wait=0.8)
+    return None
+
+
+def _time_ctrl_tab(device) -> float | None:
+    """Seconds from CTRL+TAB until the toolbar label shows a different tab's title."""
+    before = device.field_text().strip()
+    t0 = time.monotonic()
+    device.ctrl_tab(wait=0.0)
+    while time.monotonic() - t0 < SWITCH_TIMEOUT:
+        text = device.field_text().strip()
+        if text and text != before:
+            return time.monotonic() - t0
+        time.sleep(0.1)
+    return None
+
+
+def bench_device(device, steps: list[int], repeats: int) -> list[dict]:
+    """Open tabs up to each step and sample memory + latency; return the series rows."""
+    cursor_tests._ensure_server()
+    cursor_tests._ensure_reverse(device)
+    device.restart()
+    if not device.clean_tabs():
+        print("  !! could not reach a clean tab slate")
+    framework.reset_tab_counter()
+    device.settle()
+
+    series: list[dict] = []
+    opened = 0
+    for step in steps:
+        while opened < step:
+            opened += 1
+            device.navigate(_tab_url(opened), reset=False)
+        time.sleep(SETTLE_S)
+        mem = device.meminfo()
+        row = {
+            "tabs": opened,
+            "pss_kb": mem.get("pss_kb"),
+            "java_heap_kb": mem.get("java_heap_kb"),
+            "native_heap_kb": mem.get("native_heap_kb"),
+            "graphics_kb": mem.get("graphics_kb"),
+            "webviews": mem.get("webviews"),
+            "webview_pss_kb": device.webview_pss(),
+            "switcher_s": results_store.median([_time_switcher(device) for _ in range(repeats)]),
+            "ctrl_tab_s": (results_store.median([_time_ctrl_tab(device) for _ in range(repeats)])
+                           if opened > 1 else None),
+        }
+        series.append(row)
+        print(f"  {opened:4d} tabs: PSS {row['pss_kb']} kB (java {row['java_heap_kb']}, "
+              f"native {row['native_heap_kb']}, webview {row['webview_pss_kb']}), "
+              f"switcher {row['switcher_s']}s, ctrl+tab {row['ctrl_tab_s']}s")
+    return series
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", help="Target a specific adb device serial")
+    parser.add_argument("--all", action="store_true", help="Benchmark all connected devices")
+    parser.add_argument("--package", help="Override the app package to test")
+    parser.add_argument("--steps", default=",".join(str(s) for s in DEFAULT_STEPS),
+                        help="Comma-separated tab counts to sample at (ascending)")
+    parser.add_argument("--repeats", type=int, default=3, help="Latency samples per step (median is kept)")
+    parser.add_argument("--keep-tabs", action="store_true", help="Leave the benchmark tabs open afterwards")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the curve to scripts/tests/results/")
+    args = parser.parse_args()
+
+    steps = sorted({int(s) for s in args.steps.split(",") if s.strip()})
+    for device in framework.resolve_devices(args.device, args.all, args.package):
+        config = device.config()
+        print(f"\n=== {BENCH} on {device.label()}  steps={steps} ===")
+        try:
+            series = bench_device(device, steps, args.repeats)
+        finally:
+            if not args.keep_tabs and framework.tabs_opened() > 0:
+                device.close_tabs(framework.tabs_opened(), wait=0.3)
+        summary = {
+            "pss_kb_per_100_tabs": results_store.slope_per_100(series, "tabs", "pss_kb"),
+            "java_heap_kb_per_100_tabs": results_store.slope_per_100(series, "tabs", "java_heap_kb"),
+            "webview_pss_kb_per_100_tabs": results_store.slope_per_100(series, "tabs", "webview_pss_kb"),
+        }
+        print("  " + ", ".join(f"{k}={v}" for k, v in summary.items()))
+        if not args.no_save:
+            record = results_store.build_bench_record(
+                config, device.package, BENCH, {"steps": steps, "repeats": args.repeats}, series, summary)
+            yaml_path, md_path = results_store.save_bench(record)
+            print(f"  saved -> {os.path.relpath(yaml_path)}  [+ {os.path.basename(md_path)}]")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -54,8 +54,15 @@ Every scenario captures screenshots under scripts/tests/out/ for vision
 verification. Both preferences are reset to their defaults afterwards and the
 run ends with a cursor on/off sanity check (leaving the mode off).
 
+Offline / reproducible runs: ``--web record`` loads the sites through the
+host server's web archive (framework/archive.py) and stores every response
+under ``--archive``; ``--web replay`` then serves the stored copies, so each
+run sees the same pages and needs no internet (add ``--replay-timing`` to keep
+the recorded response times, i.e. the slow loads).
+
     python scripts/tests/toolbar_field_test.py                # default: the TV
     python scripts/tests/toolbar_field_test.py --sites bbc,wikipedia
+    python scripts/tests/toolbar_field_test.py --web record   # then: --web replay
 """
 from __future__ import annotations
 
@@ -66,7 +73,7 @@ import sys
 import time
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from framework import AndroidDevice, keys  # noqa: E402  (also puts scripts/tools on sys.path)
+from framework import AndroidDevice, archive, keyrate, keys, server  # noqa: E402  (also puts scripts/tools on sys.path)
 import adb  # noqa: E402
 
 TIMEOUT_KEY = "pref_key_hide_tool_bar_timeout"
@@ -74,6 +81,7 @@ FADE_KEY = "pref_key_cursor_fade_timeout"
 DEFAULT_TIMEOUT = "0"
 DEFAULT_FADE = "3000"   # the code default (ms); 0 = never fade
 OUT_DIR = os.path.join(os.path.dirname(__file__), "out")
+ARCHIVE_DIR = os.path.join(OUT_DIR, "web-archive")
 
 SITES = {
     "bbc": "https://www.bbc.com/",
@@ -116,17 +124,11 @@ def _set_pref(device, key: str, value: str, kind: str, suffixed: bool) -> None:
     suffixed=True  -> {package}_preferences_{orientation}.xml (ConfigurationPreferences)
     suffixed=False -> {package}_preferences.xml              (UserPreferences/@UserPrefs)
     """
-    device.force_stop()
-    cfg = device.config()["orientation"]
-    suffix = f"_{cfg}" if suffixed else ""
-    path = f"shared_prefs/{device.package}_preferences{suffix}.xml"
-    xml = device.read_prefs(path)
-    if "<map" not in xml:
-        raise RuntimeError(f"prefs file {path} not initialized yet")
-    entry = f'<{kind} name="{key}" value="{value}" />'
-    pattern = re.compile(rf'<{kind} name="{re.escape(key)}" value="[^"]*" />')
-    xml = pattern.sub(entry, xml) if pattern.search(xml) else xml.replace("</map>", f"    {entry}\n</map>")
-    device.write_prefs(path, xml)
+    suffix = f"_{device.config()['orientation']}" if suffixed else ""
+    with device.prefs(f"{device.package}_preferences{suffix}") as prefs:
+        if not prefs.exists:
+            raise RuntimeError(f"prefs file {prefs.path} not initialized yet")
+        prefs.set(key, value, kind)
 
 
 def _shot(device, serial: str, tag: str) -> str:
@@ -174,25 +176,19 @@ def _accept_cookies_once(device, serial: str, tag: str) -> None:
             return
 
 
-def _tab_count(device) -> int:
-    """Number of open tabs (0 if the switcher could not be opened)."""
-    if not device.open_tab_switcher(wait=1.5):
-        return 0
-    time.sleep(1.0)
-    count = len(device.tab_entries())
-    device.key(keys.BACK, wait=0.8)
-    return count
-
-
-def _clean_tabs(device) -> None:
-    """Close every tab restored from the previous session (v4's stale-tab fix)."""
-    for _ in range(25):
-        count = _tab_count(device)
-        if count == 0:
-            return
-        device.close_tabs(count, wait=0.5)
-        time.sleep(1.0)
-    print("    !! could not reach a clean tab slate")
+def _key_delivery_record(device) -> dict | None:
+    """This device's last saved key-delivery bench record; None without one, or
+    without PyYAML (the results store needs it, this test does not)."""
+    try:
+        import yaml
+        import results as results_store
+    except ImportError:
+        return None
+    config = device.config()
+    try:
+        return results_store.load_last_bench(config["model"], config["config_id"], device.id, keyrate.BENCH)
+    except (OSError, yaml.YAMLError):
+        return None
 
 
 def _wait_loaded(device, serial: str, tag: str, expect: str) -> tuple[float, str]:
@@ -400,7 +396,8 @@ RAIL_Y_MIN, RAIL_Y_MAX = 150, 400
 PX_PER_PRESS = 8.0       # observed travel per D-pad press (drops included)
 STEER_BURST = 10         # max presses per burst (bursts are sized proportionally)
 DEAD_BAND = 10           # within this of the zone, a single-press nudge replaces a burst
-STEER_WAIT = 0.12        # s between presses (the proven suite cadence is 0.15)
+STEER_WAIT = 0.12        # s between presses (the proven suite cadence is 0.15); fallback when
+                         # the device has no key_delivery_bench.py "sequence" recommendation saved
 
 
 def _log_cursor_pos(serial: str) -> tuple[float, float] | None:
@@ -434,6 +431,10 @@ def _steer_to_rail(device, serial: str, tag: str, old_title: str) -> bool:
     print(f"    overlay origin in screen space = ({off_x},{off_y})")
     zx0, zx1 = RAIL_X_MIN - off_x, RAIL_X_MAX - off_x
     zy0, zy1 = RAIL_Y_MIN - off_y, RAIL_Y_MAX - off_y   # zone in overlay space
+    # The fastest key_sequence cadence this device was measured to deliver reliably
+    # (key_delivery_bench.py, "sequence" path - the path the bursts below use).
+    steer_wait = keyrate.recommended_wait(_key_delivery_record(device), STEER_WAIT, path="sequence")
+    print(f"    steering cadence {steer_wait:.3f}s per press")
     adb.logcat(serial, "Cursor:", clear=True)  # fresh slate for the click lines
     x = y = None
     misses = 0
@@ -478,10 +479,14 @@ def _steer_to_rail(device, serial: str, tag: str, old_title: str) -> bool:
         else:
             d = int(abs(cy - y) / PX_PER_PRESS) + 1
             dy = (1 if cy > y else -1) * min(STEER_BURST, d)
-        for _ in range(abs(dx)):
-            device.key(keys.DPAD_RIGHT if dx > 0 else keys.DPAD_LEFT, wait=STEER_WAIT)
-        for _ in range(abs(dy)):
-            device.key(keys.DPAD_UP if dy < 0 else keys.DPAD_DOWN, wait=STEER_WAIT)
+        # Each axis is one device-side burst at the steering cadence (no per-press round trip).
+        step_ms = int(steer_wait * 1000)
+        if dx:
+            device.key_sequence([keys.DPAD_RIGHT if dx > 0 else keys.DPAD_LEFT], repeat=abs(dx),
+                                inter_key_ms=step_ms, wait=steer_wait)
+        if dy:
+            device.key_sequence([keys.DPAD_UP if dy < 0 else keys.DPAD_DOWN], repeat=abs(dy),
+                                inter_key_ms=step_ms, wait=steer_wait)
     _shot(device, serial, f"{tag}_steer_gave_up")
     print(f"    steering gave up; last known overlay position {('(%d,%d)' % (x, y)) if x is not None else 'unknown'}")
     return False
@@ -523,6 +528,10 @@ def main() -> int:
     ap.add_argument("--serial", default="192.168.178.67:5555", help="device serial (default: the RPi TV)")
     ap.add_argument("--timeout", type=float, default=10.0, help='"Hide tool bar after" value in seconds (default 10, the feature max)')
     ap.add_argument("--sites", default=",".join(SITES), help="comma-separated site keys to include")
+    ap.add_argument("--web", choices=("live",) + archive.MODES, default="live",
+                    help="live sites, or record them into / replay them from the web archive")
+    ap.add_argument("--archive", default=ARCHIVE_DIR, help=f"web archive directory (default {ARCHIVE_DIR})")
+    ap.add_argument("--replay-timing", action="store_true", help="replay with the recorded response times")
     args = ap.parse_args()
 
     wanted = {s.strip() for s in args.sites.split(",") if s.strip()}
@@ -530,7 +539,10 @@ def main() -> int:
 
     device = AndroidDevice(args.serial)
     os.makedirs(OUT_DIR, exist_ok=True)
-    print(f"=== toolbar field test v6 on {device.label()}  timeout={args.timeout}s ===")
+    print(f"=== toolbar field test v6 on {device.label()}  timeout={args.timeout}s  web={args.web} ===")
+    web = None
+    if args.web != "live":
+        web = archive.install(server.acquire(device), args.web, args.archive, args.replay_timing)
     # hide timeout -> orientation-suffixed file; cursor fade -> default file.
     _set_pref(device, TIMEOUT_KEY, f"{args.timeout:g}", "float", suffixed=True)
     _set_pref(device, FADE_KEY, "0", "int", suffixed=False)
@@ -542,9 +554,10 @@ def main() -> int:
         # Prove the toggle + detection work before trusting any scenario.
         _cursor_sanity(device, args.serial)
         # v4 fix: close the tabs restored from the previous session.
-        _clean_tabs(device)
+        if not device.clean_tabs():
+            print("    !! could not reach a clean tab slate")
         for i, (site, cursor, click) in enumerate(scenarios, 1):
-            url = SITES[site]
+            url = web.url(SITES[site]) if web else SITES[site]
             name = "cursor-ON " if cursor else "cursor-OFF"
             print(f"[{i}/{len(scenarios)}] {site} ({name}) {url}")
             try:
@@ -596,6 +609,10 @@ def main() -> int:
         _set_pref(device, TIMEOUT_KEY, DEFAULT_TIMEOUT, "float", suffixed=True)
         _set_pref(device, FADE_KEY, DEFAULT_FADE, "int", suffixed=False)
         print(f"timeout pref reset to {DEFAULT_TIMEOUT}, cursor fade reset to {DEFAULT_FADE}")
+        if web is not None:
+            print(f"web archive ({args.web}): {len(web.entries)} responses in {web.save()}"
+                  + (f", {len(web.misses)} requests not archived" if web.misses else ""))
+            server.release()
 
     print("\n=== summary ===")
     failed = False
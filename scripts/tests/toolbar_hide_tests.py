@@ -15,11 +15,13 @@ has finished loading, and again every time the web view regains input focus. It
 
 Toolbar visibility is observed over adb through the mirrored address-field text: while the
 tool bar is visible the field shows the page title, and once the tool bar has hidden the
-field is empty. The pages are served from the host over an ``adb reverse`` tunnel
-(Fulguris blocks file://). The "busy page" case uses ``assets/theme_flipper.html``, which
-changes its <meta name="theme-color"> every 2 seconds; each change is reported through the
-console and the app treats it as a tab change, so a build with the bug re-arms the
-countdown forever and never hides, while a fixed build hides ~timeout s after load.
+field is empty. The load itself is timed by the page's report to the host server's
+``/beacon`` (``Device.wait_page_event``), not by that 1-3 s uiautomator read. The pages are
+served from the host over an ``adb reverse`` tunnel (Fulguris blocks file://). The "busy
+page" case uses ``assets/theme_flipper.html``, which changes its <meta name="theme-color">
+every 2 seconds; each change is reported through the console and the app treats it as a tab
+change, so a build with the bug re-arms the countdown forever and never hides, while a fixed
+build hides ~timeout s after load.
 
     python scripts/tests/run.py --all --group toolbar-hide
     python scripts/tests/run.py --device SERIAL --group toolbar-hide
@@ -27,91 +29,41 @@ countdown forever and never hides, while a fixed build hides ~timeout s after lo
 """
 from __future__ import annotations
 
-import atexit
 import os
-import re
 import sys
-import threading
 import time
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from framework import keys  # noqa: E402
+from framework import keys, server  # noqa: E402
 
-ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
-PORT = 8899
+PORT = server.PORT
 
 TIMEOUT_KEY = "pref_key_hide_tool_bar_timeout"
 FADE_KEY = "pref_key_cursor_fade_timeout"
 DEFAULT_VALUE = "0"
 DEFAULT_FADE = "3000"  # the code default; 0 = never fade (deterministic overlay checks)
+TOOLBAR_SHOWN_TIMEOUT = 5.0  # after the load report, for the field to show the page title
 
-_server: ThreadingHTTPServer | None = None
-_reversed: dict = {}  # device.id -> device, for reverse-tunnel teardown at exit
-
-
-class _NoCacheHandler(SimpleHTTPRequestHandler):
-    """Serve the assets dir and forbid caching, so each navigation fetches a fresh page."""
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=ASSETS_DIR, **kwargs)
-
-    def send_header(self, key, value):  # suppress Last-Modified so the client never sends 304
-        if key.lower() == "last-modified":
-            return
-        super().send_header(key, value)
-
-    def end_headers(self):
-        self.send_header("Cache-Control", "no-store, must-revalidate")
-        self.send_header("Expires", "0")
-        super().end_headers()
-
-    def log_message(self, *args):  # keep the test output clean
-        pass
+_server = None  # this suite's reference on the shared host server (framework.server)
 
 
 def _ensure_server() -> None:
-    """Start a host HTTP server serving the assets dir once, in a daemon thread.
-
-    If another suite (e.g. cursor_tests) already bound the port serving the same dir,
-    reuse it: the bind raises OSError and we simply carry on.
-    """
+    """Start (or share, e.g. with cursor_tests) the host HTTP server serving the assets dir."""
     global _server
-    if _server is not None:
-        return
-    try:
-        _server = ThreadingHTTPServer(("127.0.0.1", PORT), _NoCacheHandler)
-    except OSError:
-        return
-    threading.Thread(target=_server.serve_forever, daemon=True).start()
-    atexit.register(_teardown)
-
+    if _server is None:
+        _server = server.acquire()
 
-def _teardown() -> None:
-    for device in list(_reversed.values()):
-        try:
-            device.reverse_remove(PORT)
-        except Exception:  # noqa: BLE001
-            pass
-    if _server is not None:
-        _server.shutdown()
 
+def _url(name: str, device=None) -> str:
+    return server.shared().url(name, device=device)
 
-def _url(name: str) -> str:
-    return f"http://localhost:{PORT}/{name}?cb={int(time.time()*1000)}"
 
-
-def _set_timeout(device, config_file: str, value: str) -> None:
-    """Rewrite the hide-timeout float in the configuration prefs file (app stopped)."""
-    device.force_stop()
-    path = f"shared_prefs/{device.package}_preferences_{config_file}.xml"
-    xml = device.read_prefs(path)
-    if "<map" not in xml:
-        raise RuntimeError(f"prefs file {path} not initialized yet")
-    entry = f'<float name="{TIMEOUT_KEY}" value="{value}" />'
-    pattern = re.compile(rf'<float name="{re.escape(TIMEOUT_KEY)}" value="[^"]*" />')
-    xml = pattern.sub(entry, xml) if pattern.search(xml) else xml.replace("</map>", f"    {entry}\n</map>")
-    device.write_prefs(path, xml)
+def set_hide_timeout(device, value: str) -> None:
+    """Rewrite the hide-timeout float in the current configuration's prefs file (app stopped)."""
+    with device.prefs(f"{device.package}_preferences_{_config_file(device)}") as prefs:
+        if not prefs.exists:
+            raise RuntimeError(f"prefs file {prefs.path} not initialized yet")
+        prefs.set(TIMEOUT_KEY, value, "float")
 
 
 def _config_file(device) -> str:
@@ -119,25 +71,44 @@ def _config_file(device) -> str:
     return device.config()["orientation"]
 
 
-def _prepare(device, page: str, value: str) -> None:
-    """Stop, set the timeout, start serving, open the tunnel and load the page."""
+def _prepare(device, page: str, value: str) -> float:
+    """Stop, set the timeout, start serving, open the tunnel and load the page.
+
+    Returns the host time just before the navigation, for :func:`_wait_loaded`.
+    """
     _ensure_server()
-    _set_timeout(device, _config_file(device), value)
-    device.reverse(PORT)
-    _reversed[device.id] = device
+    set_hide_timeout(device, value)
+    server.shared().attach(device)
     device.launch()
     time.sleep(1.0)
-    device.navigate(_url(page), reset=False)
+    since = time.time()
+    device.navigate(_url(page, device), reset=False)
+    return since
 
 
-def _wait_loaded(device, title: str, timeout: float = 30.0) -> float:
-    """Return t0 once the field shows the mirrored page title (loaded + toolbar visible)."""
-    deadline = time.time() + timeout
+def _wait_loaded(device, title: str, since: float, timeout: float = 30.0) -> float:
+    """Return t0, when the page reported its load event as ``title`` to the host's
+    /beacon, once the field also shows the title (the tool bar is visible).
+
+    When another process serves the port the beacons never reach us; t0 is then
+    the first field read showing the title, up to one read (1-3 s) late.
+    """
+    if not server.shared().local:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if device.field_text().strip().lower() == title:
+                return time.time()
+            time.sleep(0.25)
+        raise AssertionError(f"page did not show '{title}' within {timeout:.0f} s")
+    event = device.wait_page_event(title, timeout=timeout, since=since)
+    if event is None:
+        raise AssertionError(f"page did not report '{title}' within {timeout:.0f} s")
+    deadline = time.time() + TOOLBAR_SHOWN_TIMEOUT
     while time.time() < deadline:
         if device.field_text().strip().lower() == title:
-            return time.time()
+            return event["t"]
         time.sleep(0.25)
-    raise AssertionError(f"page did not report '{title}' (field text: {device.field_text()!r})")
+    raise AssertionError(f"tool bar not showing '{title}' after load (field text: {device.field_text()!r})")
 
 
 def _wait_webview_focused(device, timeout: float = 10.0) -> None:
@@ -150,12 +121,14 @@ def _wait_webview_focused(device, timeout: float = 10.0) -> None:
     raise AssertionError("web view never gained input focus after load")
 
 
-def _wait_toolbar_hidden(device, timeout: float) -> float | None:
-    """Seconds from now until the toolbar hides (field text goes empty), or None."""
+def wait_toolbar_hidden(device, timeout: float, since: float | None = None) -> float | None:
+    """Seconds from ``since`` (default: now) until the toolbar hides (field text goes
+    empty), or None if it has not within ``timeout`` s from now."""
     start = time.time()
+    origin = start if since is None else since
     while time.time() - start < timeout:
         if device.field_text().strip() == "":
-            return time.time() - start
+            return time.time() - origin
         time.sleep(0.2)
     return None
 
@@ -166,15 +139,9 @@ def _set_cursor_fade(device, value: str) -> None:
     cursorFadeTimeoutMs lives in UserPreferences (@UserPrefs) - the default,
     unsuffixed prefs file - not the orientation-suffixed configuration file.
     """
-    device.force_stop()
-    path = f"shared_prefs/{device.package}_preferences.xml"
-    xml = device.read_prefs(path)
-    if "<map" not in xml:
-        return  # prefs not initialized yet; the code default applies
-    entry = f'<int name="{FADE_KEY}" value="{value}" />'
-    pattern = re.compile(rf'<int name="{re.escape(FADE_KEY)}" value="-?\d+" />')
-    xml = pattern.sub(entry, xml) if pattern.search(xml) else xml.replace("</map>", f"    {entry}\n</map>")
-    device.write_prefs(path, xml)
+    with device.prefs() as prefs:
+        if prefs.exists:   # else prefs not initialized yet; the code default applies
+            prefs.set(FADE_KEY, value, "int")
 
 
 def _cursor_overlay(device) -> bool:
@@ -187,26 +154,26 @@ def _cursor_toggle(device) -> None:
     device.key_longpress(keys.MEDIA_PLAY_PAUSE, wait=1.2)
 
 
-def _finish(device) -> None:
+def restore_hide_timeout(device) -> None:
     """Restore the default timeout so the device is left in a known state."""
     try:
-        _set_timeout(device, _config_file(device), DEFAULT_VALUE)
+        set_hide_timeout(device, DEFAULT_VALUE)
     except Exception as e:  # noqa: BLE001
         print(f"  WARNING: could not reset timeout pref: {e}")
 
 
 def test_toolbar_hides_after_timeout(device, ctx: dict) -> None:
     """With a 10 s timeout the tool bar hides ~10 s after the page has loaded."""
-    _prepare(device, "timeout_target.html", "10")
+    since = _prepare(device, "timeout_target.html", "10")
     try:
-        t0 = _wait_loaded(device, "loaded")
-        hidden = _wait_toolbar_hidden(device, 17.0)
+        t0 = _wait_loaded(device, "loaded", since)
+        hidden = wait_toolbar_hidden(device, 17.0, since=t0)
         assert hidden is not None, "tool bar never hid within 17 s of load"
-        # navigate() returns a few seconds after the true load, so "10 s after load"
-        # reads as ~7-8 s from t0; this window catches both under- and over-shooting.
-        assert 6.5 <= hidden <= 12.0, f"tool bar hid {hidden:.2f} s after load (expected ~10 s)"
+        # t0 is the page's load event (beacon); the hide is seen up to one field
+        # read (1-3 s on the TV) late, so ~10 s after load reads as 10-13 s.
+        assert 9.0 <= hidden <= 13.5, f"tool bar hid {hidden:.2f} s after load (expected ~10 s)"
     finally:
-        _finish(device)
+        restore_hide_timeout(device)
 
 
 def test_toolbar_not_starved_on_busy_page(device, ctx: dict) -> None:
@@ -216,53 +183,55 @@ def test_toolbar_not_starved_on_busy_page(device, ctx: dict) -> None:
     fix this kept restarting the 5 s countdown forever, so the tool bar never hid; the fix
     arms only on the load->loaded edge, so the tool bar hides ~5 s after load regardless.
     """
-    _prepare(device, "theme_flipper.html", "5")
+    since = _prepare(device, "theme_flipper.html", "5")
     try:
-        _wait_loaded(device, "flipper")
+        _wait_loaded(device, "flipper", since)
         # The web view must hold focus for the countdown to fire; the theme-color flips can
         # briefly perturb focus, so wait for it to settle (a fixed build keeps it held, so the
         # countdown armed at load runs to completion). On a buggy build the countdown is
         # re-armed by the spurious tab-state callbacks and never completes.
         _wait_webview_focused(device)
-        hidden = _wait_toolbar_hidden(device, 13.0)
+        hidden = wait_toolbar_hidden(device, 13.0)
         assert hidden is not None, (
             "tool bar never hid on the busy (theme-color flipping) page - the countdown is "
             "being re-armed by spurious tab-state callbacks"
         )
         assert hidden <= 10.0, f"tool bar took {hidden:.2f} s to hide on the busy page (expected ~5 s)"
     finally:
-        _finish(device)
+        restore_hide_timeout(device)
 
 
 def test_toolbar_not_reset_by_interaction(device, ctx: dict) -> None:
     """A D-pad press after load must not restart the countdown (it stays anchored at load)."""
-    _prepare(device, "timeout_target.html", "10")
+    since = _prepare(device, "timeout_target.html", "10")
     try:
-        t0 = _wait_loaded(device, "loaded")
-        time.sleep(2.0)
+        t0 = _wait_loaded(device, "loaded", since)
+        time.sleep(3.0)
         if device.field_text().strip() == "":
             raise AssertionError("tool bar already hid before the interaction - retry the test")
         device.key(keys.DPAD_CENTER, wait=0.5)
         t_press = time.time()
-        hidden = _wait_toolbar_hidden(device, 17.0)
+        hidden = wait_toolbar_hidden(device, 17.0)
         assert hidden is not None, "tool bar never hid within 17 s of the press"
         from_load = (t_press + hidden) - t0
-        # Anchored at load (~10 s after), not at the press (~2 s after load, which would
-        # read as ~12 s after load under the old interaction-reset semantics).
-        assert 6.5 <= from_load <= 11.5, (
+        # Anchored at load: ~10 s after it, plus up to one field read (1-3 s) to see
+        # the hide. Under the old interaction-reset semantics the countdown would
+        # restart at the press, which comes more than 3.5 s after load (the sleep,
+        # two field reads and the key), so the hide would read as 13.5 s or more.
+        assert 9.0 <= from_load <= 13.0, (
             f"tool bar hid {hidden:.2f} s after the press ({from_load:.2f} s after load); "
             "expected the countdown to stay anchored at load (~10 s after load)"
         )
     finally:
-        _finish(device)
+        restore_hide_timeout(device)
 
 
 def test_toolbar_rearms_on_focus_gain(device, ctx: dict) -> None:
     """After a first auto-hide, regaining web-view focus restarts the countdown."""
-    _prepare(device, "timeout_target.html", "10")
+    since = _prepare(device, "timeout_target.html", "10")
     try:
-        t0 = _wait_loaded(device, "loaded")
-        hidden1 = _wait_toolbar_hidden(device, 17.0)
+        _wait_loaded(device, "loaded", since)
+        hidden1 = wait_toolbar_hidden(device, 17.0)
         assert hidden1 is not None, "no first auto-hide to re-arm from"
         # Re-show the tool bar (back, no history navigation / focus change)...
         device.key(keys.BACK, wait=1.5)
@@ -273,25 +242,25 @@ def test_toolbar_rearms_on_focus_gain(device, ctx: dict) -> None:
         device.key(keys.SEARCH, wait=1.5)
         w, h = device.screen_size()
         device.tap(w // 2, int(h * 0.30), wait=1.5)
-        hidden2 = _wait_toolbar_hidden(device, 17.0)
+        hidden2 = wait_toolbar_hidden(device, 17.0)
         assert hidden2 is not None, "tool bar never hid again within 17 s of the re-arm"
         assert 7.5 <= hidden2 <= 12.0, f"tool bar hid {hidden2:.2f} s after the re-arm (expected ~10 s)"
     finally:
-        _finish(device)
+        restore_hide_timeout(device)
 
 
 def test_toolbar_disabled_at_zero(device, ctx: dict) -> None:
     """A timeout of 0 disables the feature: the tool bar never auto-hides."""
-    _prepare(device, "timeout_target.html", "0")
+    since = _prepare(device, "timeout_target.html", "0")
     try:
-        _wait_loaded(device, "loaded")
+        _wait_loaded(device, "loaded", since)
         time.sleep(6.0)
         text = device.field_text().strip()
         assert text.lower() == "loaded", (
             f"tool bar hid despite a 0 (disabled) timeout (field={text!r})"
         )
     finally:
-        _finish(device)
+        restore_hide_timeout(device)
 
 
 def test_toolbar_rehides_after_back_reshow(device, ctx: dict) -> None:
@@ -303,22 +272,22 @@ def test_toolbar_rehides_after_back_reshow(device, ctx: dict) -> None:
     can make the tool bar hide again. Before the fix showActionBar() only
     restored visibility, so the tool bar stayed stuck.
     """
-    _prepare(device, "timeout_target.html", "10")
+    since = _prepare(device, "timeout_target.html", "10")
     try:
-        _wait_loaded(device, "loaded")
-        hidden1 = _wait_toolbar_hidden(device, 17.0)
+        _wait_loaded(device, "loaded", since)
+        hidden1 = wait_toolbar_hidden(device, 17.0)
         assert hidden1 is not None, "no first auto-hide to re-show from"
         device.key(keys.BACK, wait=1.5)
         if device.field_text().strip().lower() != "loaded":
             raise AssertionError(f"tool bar did not re-appear after back (field={device.field_text()!r})")
-        hidden2 = _wait_toolbar_hidden(device, 17.0)
+        hidden2 = wait_toolbar_hidden(device, 17.0)
         assert hidden2 is not None, (
             "tool bar stayed visible after back re-showed it - the hide countdown was "
             "consumed by the first hide and never re-armed when the tool bar came back"
         )
         assert hidden2 <= 13.0, f"tool bar took {hidden2:.2f} s to hide after the re-show (expected ~10 s)"
     finally:
-        _finish(device)
+        restore_hide_timeout(device)
 
 
 def test_cursor_toolbar_rehides_after_back_reshow(device, ctx: dict) -> None:
@@ -335,18 +304,18 @@ def test_cursor_toolbar_rehides_after_back_reshow(device, ctx: dict) -> None:
     # Fade disabled so the overlay (and thus cursor mode) is detectable at any
     # moment and the toggle state can be asserted reliably.
     _set_cursor_fade(device, "0")
-    _prepare(device, "timeout_target.html", "10")
+    since = _prepare(device, "timeout_target.html", "10")
     try:
-        _wait_loaded(device, "loaded")
+        _wait_loaded(device, "loaded", since)
         _cursor_toggle(device)
         if not _cursor_overlay(device):
             raise AssertionError("cursor mode could not be enabled for the test")
-        hidden1 = _wait_toolbar_hidden(device, 17.0)
+        hidden1 = wait_toolbar_hidden(device, 17.0)
         assert hidden1 is not None, "no first auto-hide in cursor mode"
         device.key(keys.BACK, wait=1.5)
         if device.field_text().strip().lower() != "loaded":
             raise AssertionError(f"tool bar did not re-appear after back (field={device.field_text()!r})")
-        hidden2 = _wait_toolbar_hidden(device, 17.0)
+        hidden2 = wait_toolbar_hidden(device, 17.0)
         assert hidden2 is not None, (
             "cursor mode: tool bar stayed visible after back re-showed it"
         )
@@ -355,7 +324,7 @@ def test_cursor_toolbar_rehides_after_back_reshow(device, ctx: dict) -> None:
         if _cursor_overlay(device):
             _cursor_toggle(device)
         _set_cursor_fade(device, DEFAULT_FADE)
-        _finish(device)
+        restore_hide_timeout(device)
 
 
 FEATURE_GROUPS = {
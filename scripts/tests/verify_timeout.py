@@ -39,49 +39,19 @@ from __future__ import annotations
 
 import argparse
 import os
-import re
 import sys
-import threading
 import time
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 import adb
-from framework import AndroidDevice, keys
+from framework import AndroidDevice, keys, server
 
-ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
-PORT = 8899
+PORT = server.PORT
 TIMEOUT_KEY = "pref_key_hide_tool_bar_timeout"
 DEFAULT_VALUE = "0"
 
 
-class _NoCacheHandler(SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=ASSETS_DIR, **kwargs)
-
-    def send_header(self, key, value):
-        if key.lower() == "last-modified":
-            return
-        super().send_header(key, value)
-
-    def end_headers(self):
-        self.send_header("Cache-Control", "no-store, must-revalidate")
-        super().end_headers()
-
-    def log_message(self, *args):
-        pass
-
-
-def _serve() -> None:
-    try:
-        server = ThreadingHTTPServer(("127.0.0.1", PORT), _NoCacheHandler)
-    except OSError:
-        # A previous run left the tunnel up (and the page loaded): fine to reuse.
-        return
-    threading.Thread(target=server.serve_forever, daemon=True).start()
-
-
 def _run(device: AndroidDevice, config_file: str, value: str, scenario: str) -> bool:
     _set_timeout(device, config_file, value)
     try:
@@ -180,15 +150,10 @@ def _run(device: AndroidDevice, config_file: str, value: str, scenario: str) ->
 
 def _set_timeout(device: AndroidDevice, config_file: str, value: str) -> None:
     """Rewrite the hide-timeout float in the configuration prefs file (app stopped)."""
-    device.force_stop()
-    path = f"shared_prefs/{device.package}_preferences_{config_file}.xml"
-    xml = device.read_prefs(path)
-    if "<map" not in xml:
-        raise RuntimeError(f"prefs file {path} not initialized yet")
-    entry = f'<float name="{TIMEOUT_KEY}" value="{value}" />'
-    pattern = re.compile(rf'<float name="{re.escape(TIMEOUT_KEY)}" value="[^"]*" />')
-    xml = pattern.sub(entry, xml) if pattern.search(xml) else xml.replace("</map>", f"    {entry}\n</map>")
-    device.write_prefs(path, xml)
+    with device.prefs(f"{device.package}_preferences_{config_file}") as prefs:
+        if not prefs.exists:
+            raise RuntimeError(f"prefs file {prefs.path} not initialized yet")
+        prefs.set(TIMEOUT_KEY, value, "float")
 
 
 def _wait_loaded(device: AndroidDevice, timeout: float = 25.0) -> float:
@@ -211,12 +176,6 @@ def _wait_toolbar_hidden(device: AndroidDevice, timeout: float) -> float | None:
     return None
 
 
-
-
-
-
-
-
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument("--serial", required=True)
@@ -225,17 +184,13 @@ def main() -> int:
     args = parser.parse_args()
 
     device = AndroidDevice(args.serial)
-    _serve()
-    device.reverse(PORT)
+    server.acquire(device)
     try:
         print(f"[{args.serial}] scenario={args.scenario} config={args.config}")
         value = "0" if args.scenario == "zero" else "10"
         ok = _run(device, args.config, value, args.scenario)
     finally:
-        try:
-            device.reverse_remove(PORT)
-        except Exception:  # noqa: BLE001
-            pass
+        server.release()
     print("PASS" if ok else "FAIL")
     return 0 if ok else 1
 
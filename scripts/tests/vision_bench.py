@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Benchmark: run-based blob labelling (framework.vision) versus the old flood fill.
+
+The cursor probes used to label white pixels with a Python ``set`` and a
+stack-based flood fill (kept below as :func:`flood_fill_blobs`, the reference).
+This times both on the calibration screenshots and checks that they agree on
+every blob (area and bounding box). Host only; no device needed.
+
+    python scripts/tests/vision_bench.py                  # calibration shots in scripts/tests/out/
+    python scripts/tests/vision_bench.py shot.png ... --repeats 5
+    python scripts/tests/vision_bench.py --synthetic      # a generated white-heavy 1920x1080 page
+
+Missing calibration shots are skipped; with none left the synthetic page is used.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from framework import vision  # noqa: E402
+import probe_cursor_blobs  # noqa: E402  (the calibration shot list)
+
+
+def flood_fill_blobs(img: Image.Image, thresh: int = 240, min_area: int = 60) -> list[tuple]:
+    """The pre-vision implementation: ``(area, (x0, y0, x1, y1))`` per white blob."""
+    a = np.asarray(img.convert("RGB"), dtype=np.int16)
+    white = (a[:, :, 0] > thresh) & (a[:, :, 1] > thresh) & (a[:, :, 2] > thresh)
+    ys, xs = np.nonzero(white)
+    pts = set(zip(ys.tolist(), xs.tolist()))
+    seen = set()
+    blobs = []
+    for p in pts:
+        if p in seen:
+            continue
+        stack = [p]
+        comp = []
+        seen.add(p)
+        while stack:
+            cy, cx = stack.pop()
+            comp.append((cy, cx))
+            for ny, nx in ((cy + 1, cx), (cy - 1, cx), (cy, cx + 1), (cy, cx - 1)):
+                if (ny, nx) in pts and (ny, nx) not in seen:
+                    seen.add((ny, nx))
+                    stack.append((ny, nx))
+        if len(comp) >= min_area:
+            ca = np.array(comp)
+            blobs.append((len(comp), (int(ca[:, 1].min()), int(ca[:, 0].min()),
+                                      int(ca[:, 1].max()), int(ca[:, 0].max()))))
+    return sorted(blobs)
+
+
+def synthetic_page(width: int = 1920, height: int = 1080, seed: int = 7) -> Image.Image:
+    """A white page with grey text-like strokes and a white cursor arrow in a black outline."""
+    rng = np.random.default_rng(seed)
+    a = np.full((height, width, 3), 255, dtype=np.uint8)
+    for y in range(40, height - 40, 28):          # "lines of text": short dark dashes
+        xs = np.cumsum(rng.integers(6, 30, size=width // 8))
+        for x in xs[xs < width - 20]:
+            a[y:y + 14, x:x + rng.integers(2, 12)] = 40
+    a[600:660, 958:1000] = 0                      # the arrow: black outline ...
+    a[602:658, 960:998] = 255                     # ... around a 38x56 white fill
+    return Image.fromarray(a)
+
+
+def _time(fn, repeats: int) -> tuple[float, object]:
+    samples, result = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples), result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("shots", nargs="*", help="Screenshots to label (default: the calibration shots)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per implementation (median kept)")
+    parser.add_argument("--min-area", type=int, default=60, help="Smallest blob compared")
+    parser.add_argument("--synthetic", action="store_true", help="Also time a generated 1920x1080 page")
+    args = parser.parse_args()
+
+    images = []
+    for label, path in ([(os.path.basename(p), p) for p in args.shots] or probe_cursor_blobs.DEFAULTS):
+        if os.path.exists(path):
+            images.append((label, Image.open(path)))
+        else:
+            print(f"== {label}: MISSING {path}")
+    if args.synthetic or not images:
+        images.append(("synthetic 1920x1080", synthetic_page()))
+
+    mismatches = 0
+    for label, img in images:
+        img.load()
+        old_s, old = _time(lambda: flood_fill_blobs(img, min_area=args.min_area), args.repeats)
+        new_s, new = _time(lambda: vision.white_blobs(img, min_area=args.min_area), args.repeats)
+        same = old == sorted((int(b["area"]), (int(b["x0"]), int(b["y0"]), int(b["x1"]), int(b["y1"])))
+                             for b in new)
+        mismatches += not same
+        print(f"== {label}  ({img.size[0]}x{img.size[1]}, {len(new)} blobs >= {args.min_area}px)")
+        print(f"  flood fill {old_s * 1000:9.1f} ms   vision {new_s * 1000:7.1f} ms   "
+              f"x{old_s / new_s:.0f}   {'same blobs' if same else '!! BLOBS DIFFER'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
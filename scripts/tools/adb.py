@@ -6,10 +6,14 @@ and the tests in ../tests import from here so we never call adb directly from th
 from __future__ import annotations
 
 import glob
+import hashlib
 import os
 import re
+import shlex
+import struct
 import subprocess
 import sys
+import tempfile
 import time
 import xml.etree.ElementTree as ET
 from collections.abc import Callable
@@ -23,6 +27,8 @@ MAIN_ACTIVITY = "fulguris.activity.MainActivity"
 # Gradle assemble task and where its APK lands.
 GRADLE_TASK = ":app:assembleSlionsFullDownloadDebug"
 APK_GLOB = "app/build/outputs/apk/slionsFullDownload/debug/*.apk"
+# Version catalog holding the app's minSdk.
+VERSIONS_TOML = "gradle/libs.versions.toml"
 
 # Key codes we use.
 KEY_BACK = 4
@@ -62,14 +68,174 @@ def apk_path() -> str | None:
     return max(matches, key=os.path.getmtime)
 
 
-def install_apk(serial: str, apk: str) -> bool:
-    result = subprocess.run(
-        ["adb", "-s", serial, "install", "-r", "-t", apk],
+_local_sha256: dict = {}
+
+
+def apk_sha256(path: str) -> str:
+    """SHA-256 of a local file, cached per (path, size, mtime)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _local_sha256:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _local_sha256[key] = h.hexdigest()
+    return _local_sha256[key]
+
+
+def installed_apk_path(serial: str, package: str) -> str | None:
+    """On-device path of the package's base APK (``pm path``), or None if not installed."""
+    out = _adb(serial, ["shell", "pm", "path", package])
+    paths = [l.strip()[len("package:"):] for l in out.splitlines() if l.strip().startswith("package:")]
+    base = [p for p in paths if p.endswith("/base.apk")]
+    return (base or paths or [None])[0]
+
+
+def installed_apk_sha256(serial: str, package: str) -> str | None:
+    """SHA-256 of the installed base APK, hashed on the device (no pull); None if unknown.
+
+    ``sha256sum`` is in toybox from Android 8; older devices return None.
+    """
+    path = installed_apk_path(serial, package)
+    if not path:
+        return None
+    m = re.match(r"([0-9a-f]{64})\s", _adb(serial, ["shell", "sha256sum", path], timeout=60))
+    return m.group(1) if m else None
+
+
+def apk_up_to_date(serial: str, apk: str, package: str = DEFAULT_PACKAGE) -> bool:
+    """True when the APK installed for ``package`` is byte-identical to the local ``apk``."""
+    return installed_apk_sha256(serial, package) == apk_sha256(apk)
+
+
+def min_sdk() -> int | None:
+    """The app's minSdk from the Gradle version catalog, or None if it cannot be read."""
+    try:
+        with open(os.path.join(repo_root(), VERSIONS_TOML), encoding="utf-8") as fh:
+            m = re.search(r'^minSdk\s*=\s*"(\d+)"', fh.read(), re.MULTILINE)
+    except OSError:
+        return None
+    return int(m.group(1)) if m else None
+
+
+def free_space_kb(serial: str, path: str = "/data") -> int | None:
+    """Available KiB on the filesystem holding ``path`` (``df -k``), or None if unknown."""
+    lines = _adb(serial, ["shell", "df", "-k", path]).strip().splitlines()
+    fields = lines[-1].split() if len(lines) > 1 else []
+    # Filesystem 1K-blocks Used Available Use% Mounted-on
+    return int(fields[3]) if len(fields) >= 4 and fields[3].isdigit() else None
+
+
+# Room needed on /data per byte of APK: the copy itself plus the dexopt output.
+INSTALL_SPACE_FACTOR = 3
+
+# How ``adb install`` gets the APK to the package manager, fastest first:
+#   incremental - API 30+ with a v4 signature (<apk>.idsig): the app is launchable once
+#                 the blocks needed to start it have landed, the rest streams in after
+#   streaming   - API 28+: the APK is piped straight into ``pm install``, no temp copy
+#   push        - legacy: copy to /data/local/tmp, then install from there
+INSTALL_MODES = ("incremental", "streaming", "push")
+_INSTALL_FLAGS = {"incremental": ["--incremental"], "streaming": ["--streaming"], "push": ["--no-streaming"]}
+
+
+def install_mode(serial: str, apk: str) -> str:
+    """The fastest of :data:`INSTALL_MODES` the device supports for ``apk``."""
+    api = _api_level(serial)
+    if api >= 30 and os.path.exists(apk + ".idsig"):
+        return "incremental"
+    return "streaming" if api >= 28 else "push"
+
+
+def install_preflight(serial: str, apk: str) -> str | None:
+    """Why ``apk`` cannot be installed on the device (API level, free space), or None."""
+    api, need = _api_level(serial), min_sdk()
+    if need and api < need:
+        return f"API {api} is below the app's minSdk {need}"
+    free = free_space_kb(serial)
+    want = os.path.getsize(apk) * INSTALL_SPACE_FACTOR // 1024
+    if free is not None and free < want:
+        return f"only {free // 1024} MiB free on /data, need about {want // 1024} MiB"
+    return None
+
+
+def install_apk(serial: str, apk: str, package: str = DEFAULT_PACKAGE, force: bool = False,
+                mode: str | None = None) -> bool:
+    """Install ``apk`` unless the device already has this exact build (see apk_up_to_date).
+
+    ``adb install`` pushes the whole APK and re-runs dexopt even when nothing
+    changed (30-90 s over Wi-Fi); comparing the fingerprints costs two shell calls.
+    ``mode`` is one of :data:`INSTALL_MODES` (default: :func:`install_mode`); an
+    incremental install the device refuses is retried streamed.
+    """
+    if not force and apk_up_to_date(serial, apk, package):
+        return True
+    mode = mode or install_mode(serial, apk)
+    # An incremental install leaves adb serving the remaining blocks in the
+    # background with our stdout inherited: read a file, not a pipe, or we would
+    # wait for the whole APK after all.
+    with tempfile.TemporaryFile("w+", encoding="utf-8", errors="replace") as out:
+        subprocess.run(["adb", "-s", serial, "install", "-r", "-t", *_INSTALL_FLAGS[mode], apk],
+                       stdout=out, stderr=subprocess.STDOUT)
+        out.seek(0)
+        ok = "Success" in out.read()
+    if not ok and mode == "incremental":
+        return install_apk(serial, apk, package, force=True, mode="streaming")
+    return ok
+
+
+# --- App sandbox files -----------------------------------------------------
+# Files under the app's data dir (shared_prefs/, databases/, ...) are only
+# reachable as the app's user, through ``run-as`` (debuggable builds).
+
+
+def read_app_file(serial: str, package: str, rel_path: str) -> str:
+    return _adb(serial, ["shell", "run-as", package, "cat", rel_path])
+
+
+def write_app_file(serial: str, package: str, rel_path: str, content: str) -> bool:
+    """Replace ``rel_path`` in the app sandbox with ``content``, streamed over one
+    ``exec-in`` (no temp file on either side). Returns True on success."""
+    return write_app_bytes(serial, package, rel_path, content.encode("utf-8"))
+
+
+# Printed after a successful ``run-as cat`` so a read can tell its data from an error.
+_READ_OK = b"--run-as-read-ok--"
+
+
+def read_app_bytes(serial: str, package: str, rel_path: str) -> bytes | None:
+    """The raw bytes of ``rel_path`` (binary-safe ``exec-out``), None if it cannot be read.
+
+    ``exec-out`` passes on neither the remote exit status nor a separate stderr, so
+    a refused ``run-as`` or a missing file would come back as its error text; the
+    read only counts when the device appended :data:`_READ_OK` after ``cat``.
+    """
+    script = f"run-as {package} cat {shlex.quote(rel_path)} && printf %s {_READ_OK.decode()}"
+    out = subprocess.run(["adb", "-s", serial, "exec-out", script], capture_output=True, timeout=60).stdout
+    return out[:-len(_READ_OK)] if out.endswith(_READ_OK) else None
+
+
+def write_app_bytes(serial: str, package: str, rel_path: str, data: bytes) -> bool:
+    """Replace ``rel_path`` with ``data``; True once the file reads back identical.
+
+    ``exec-in`` does not pass on the remote exit status (a ``run-as`` refused by a
+    non-debuggable build, or a bad path, still returns 0), so the write is
+    checked by reading the file back over a separate call.
+    """
+    script = f"cat > {shlex.quote(rel_path)}"
+    subprocess.run(
+        ["adb", "-s", serial, "exec-in", f"run-as {package} sh -c {shlex.quote(script)}"],
+        input=data,
         capture_output=True,
-        encoding="utf-8",
-        errors="replace",
+        timeout=60,
     )
-    return "Success" in (result.stdout or "")
+    return read_app_bytes(serial, package, rel_path) == data
+
+
+def list_app_files(serial: str, package: str, rel_dir: str) -> list[str]:
+    """File names in ``rel_dir`` of the app sandbox ([] if it does not exist)."""
+    out = _adb(serial, ["shell", f"run-as {package} ls {shlex.quote(rel_dir)} 2>/dev/null"])
+    return [line.strip() for line in out.splitlines() if line.strip()]
 
 
 # --- adb plumbing ----------------------------------------------------------
@@ -189,6 +355,17 @@ def wait_until(predicate: Callable[[], bool], timeout: float = 10.0, interval: f
     return predicate()
 
 
+def cold_start(serial: str, package: str) -> float:
+    """Clear the log and start the app (it must be stopped); return the device clock
+    (epoch seconds, the clock of :func:`logcat_epoch`) at the start."""
+    out = _adb(serial, ["shell", f"logcat -c; date +%s.%N; am start -n {package}/{LAUNCH_ACTIVITY} >/dev/null"])
+    first = out.strip().splitlines()[0] if out.strip() else ""
+    try:
+        return float(first)
+    except ValueError:   # a toybox without %N
+        return float(first.split(".")[0] or 0)
+
+
 def _start_app(serial: str, package: str) -> None:
     _adb(serial, ["shell", "am", "start", "-n", f"{package}/{LAUNCH_ACTIVITY}"])
     time.sleep(2.0)
@@ -323,7 +500,8 @@ RESTART_BETWEEN_TESTS = True
 
 # Whether the runner auto-closes the tabs a test created (see TABS_OPENED).
 # Closing is pure hygiene — the tab count has NO performance impact (Fulguris
-# runs hundreds fine) — but tests should leave the app as they found it.
+# runs hundreds fine; tests/tab_scaling_bench.py measures it per device) — but
+# tests should leave the app as they found it.
 # --keep-tabs turns the auto-close off.
 KEEP_TABS = False
 
@@ -396,16 +574,18 @@ def navigate(serial: str, package: str, url: str, reset: bool | None = None) ->
     TABS_OPENED += 1
 
 
+KEY_MOVE_END = 123
+KEY_DEL = 67
+
+
 def clear_field(serial: str) -> None:
     """Clear the focused edit field: move to the end then delete a generous number of chars.
 
-    Uses the `input keyevent -n <count>` repeat flag so the deletes are one adb
-    call instead of one per key (161 round trips -> 2), which is much faster on
+    One :func:`key_sequence` (MOVE_END, then DEL x160) so the whole clear is a single
+    adb call instead of one per key (161 round trips -> 1), which is much faster on
     Windows where each adb invocation is a subprocess.
     """
-    _adb(serial, ["shell", "input", "keyevent", "123"])  # KEYCODE_MOVE_END
-    _adb(serial, ["shell", "input", "keyevent", "-n", "160", "67"])  # KEYCODE_DEL x160
-    time.sleep(0.3)
+    key_sequence(serial, [KEY_MOVE_END] + [KEY_DEL] * 160, wait=0.3)
 
 
 def key(serial: str, keycode: int, wait: float = 0.5) -> None:
@@ -493,9 +673,12 @@ def close_tabs(serial: str, count: int, wait: float = 0.9) -> None:
 
     Pure session hygiene — the tab count has no performance impact — it just
     keeps tests from leaving a pile-up behind (the session persists tabs).
+    All the chords (``wait`` apart, timed on the device) go out in one adb call.
     """
-    for _ in range(count):
-        key_combination(serial, KEY_CTRL_LEFT, KEY_CTRL_W, wait=wait)
+    if count <= 0:
+        return
+    steps = [("chord", (KEY_CTRL_LEFT, KEY_CTRL_W)), ("wait", wait)] * count
+    play_script(serial, input_script(serial, steps))
 
 
 def open_tab_switcher(serial: str, wait: float = 1.0) -> bool:
@@ -525,6 +708,125 @@ def type_text(serial: str, text: str, wait: float = 0.5) -> None:
     time.sleep(wait)
 
 
+# Key codes per `input keyevent` invocation. The tool takes any number, but each
+# invocation injects its codes synchronously and pre-7.0 adbd caps a shell command
+# at 4 KiB; scripts go through stdin (no cap), so this only bounds one invocation.
+KEYEVENT_MAX_CODES = 100
+
+
+def _keyevent_lines(codes: list[int]) -> list[str]:
+    """``input keyevent`` lines for back-to-back ``codes``, chunked by KEYEVENT_MAX_CODES."""
+    return [
+        "input keyevent " + " ".join(str(c) for c in codes[i:i + KEYEVENT_MAX_CODES])
+        for i in range(0, len(codes), KEYEVENT_MAX_CODES)
+    ]
+
+
+def key_sequence(serial: str, codes: list[int], repeat: int = 1, inter_key_ms: int = 0,
+                 wait: float = 0.5) -> None:
+    """Send ``codes`` (in order, ``repeat`` times over) in a single adb call.
+
+    With ``inter_key_ms`` 0 the codes are batched into as few ``input keyevent``
+    invocations as :data:`KEYEVENT_MAX_CODES` allows; otherwise each key gets its
+    own invocation followed by an on-device ``sleep``. Either way the script is
+    piped through one ``adb shell`` (see :func:`play_script`).
+    """
+    seq = list(codes) * repeat
+    if not seq:
+        return
+    steps = [("key", c, 1, inter_key_ms / 1000.0) for c in seq]
+    play_script(serial, input_script(serial, steps))
+    time.sleep(wait)
+
+
+def _sh_quote(text: str) -> str:
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+def input_script(serial: str, steps: list[tuple]) -> str:
+    """Compile input macro steps (see framework/macro.py) into one device shell script.
+
+    Back-to-back presses (``interval`` 0, also across consecutive key steps) are
+    batched into ``input keyevent`` invocations of up to :data:`KEYEVENT_MAX_CODES`
+    codes; spaced presses get one line each followed by a ``sleep``. Every ``input``
+    line starts a small VM on the device (tens of ms on a phone, more on the RPi), so
+    the real cadence is ``interval`` plus that start-up - but it is the same on every
+    run, unlike host round trips.
+    """
+    lines: list[str] = []
+    burst: list[int] = []  # back-to-back codes waiting to be batched
+    for step in steps:
+        kind = step[0]
+        if kind == "key" and step[3] <= 0:
+            burst += [step[1]] * step[2]
+            continue
+        lines += _keyevent_lines(burst)
+        burst = []
+        if kind == "key":
+            _, code, repeat, interval = step
+            for _ in range(repeat):
+                lines += [f"input keyevent {code}", f"sleep {interval:g}"]
+        elif kind == "hold":
+            _, code, ms = step
+            if _api_level(serial) >= 34:
+                lines.append(f"input keyevent --duration {ms} {code}")
+            else:
+                lines.append(f"input keycombination -t {ms} {KEY_CTRL_LEFT} {code}")
+        elif kind == "chord":
+            lines.append("input keycombination " + " ".join(str(c) for c in step[1]))
+        elif kind == "tap":
+            lines.append(f"input tap {step[1]} {step[2]}")
+        elif kind == "text":
+            lines.append("input text " + _sh_quote(step[1].replace(" ", "%s")))
+        elif kind == "wait":
+            lines.append(f"sleep {step[1]:g}")
+        else:
+            raise ValueError(f"unknown macro step '{kind}'")
+    lines += _keyevent_lines(burst)
+    return "\n".join(lines) + "\n"
+
+
+# Start-up of one `input` invocation (its app_process VM): tens of ms on a phone,
+# up to about a second on the RPi TV under load. Scripts are budgeted with this
+# per line on top of their own sleeps and holds.
+INPUT_STARTUP_S = 1.0
+
+
+def script_timeout(script: str) -> float:
+    """A timeout for :func:`play_script`: the script's sleeps and holds plus a
+    start-up per ``input`` line, doubled, plus a fixed margin for adb itself."""
+    sleeps = sum(float(v) for v in re.findall(r"^sleep ([\d.]+)", script, re.M))
+    holds = sum(int(v) for v in re.findall(r"(?:--duration|-t) (\d+)", script)) / 1000.0
+    inputs = len(re.findall(r"^input ", script, re.M))
+    return 30 + (sleeps + holds + inputs * INPUT_STARTUP_S) * 2
+
+
+def play_script(serial: str, script: str, timeout: float | None = None) -> bool:
+    """Run a shell script on the device in one adb call, fed through stdin.
+
+    ``timeout`` defaults to :func:`script_timeout`. Deliberately not retried like
+    :func:`_adb`: a burst that timed out half-way has already delivered part of
+    its input, and replaying it would double that part. A timeout is reported
+    and returns False rather than raising, so cleanup (closing tabs) cannot
+    abort a run.
+    """
+    timeout = script_timeout(script) if timeout is None else timeout
+    try:
+        subprocess.run(
+            ["adb", "-s", serial, "shell", "sh"],
+            input=script,
+            capture_output=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        print(f"WARNING: input script ({script.count(chr(10))} lines) timed out after {timeout:.0f}s "
+              f"on {device_label(serial)}; part of it may have been delivered")
+        return False
+    return True
+
+
 def dump_ui(serial: str) -> str:
     _adb(serial, ["shell", "uiautomator", "dump", "/sdcard/w.xml"], timeout=30)
     return _adb(serial, ["shell", "cat", "/sdcard/w.xml"])
@@ -537,6 +839,7 @@ class Node:
     text: str
     focused: bool
     bounds: tuple[int, int, int, int] | None
+    focusable: bool = False
 
 
 def _parse_bounds(value: str) -> tuple[int, int, int, int] | None:
@@ -561,6 +864,7 @@ def nodes(serial: str) -> list[Node]:
                 text=el.get("text", ""),
                 focused=el.get("focused", "false") == "true",
                 bounds=_parse_bounds(el.get("bounds", "")),
+                focusable=el.get("focusable", "false") == "true",
             )
         )
     return result
@@ -625,6 +929,85 @@ def screenshot(serial: str, path: str) -> None:
         f.write(subprocess.run(cmd, capture_output=True).stdout)
 
 
+# screencap pixel formats (android.graphics.PixelFormat) that are 4 bytes per pixel.
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+PIXEL_FORMAT_BGRA_8888 = 5
+
+
+@dataclass
+class RawScreen:
+    """Undecoded ``screencap`` output: the pixels start at ``offset`` in ``data``."""
+    width: int
+    height: int
+    pixel_format: int
+    offset: int
+    data: bytes
+
+
+def screencap_raw(serial: str, timeout: int = 30) -> RawScreen | None:
+    """Grab the framebuffer as raw pixels (``exec-out screencap`` without ``-p``).
+
+    Skips the device-side PNG encode, which dominates ``screenshot`` on slow
+    devices. The header is width, height and pixel format as little-endian
+    uint32s, plus a colour-space word since Android 9 (16 bytes instead of 12);
+    the header size is inferred from the payload length. None on a short read.
+    """
+    cmd = ["adb", "-s", serial, "exec-out", "screencap"]
+    try:
+        data = subprocess.run(cmd, capture_output=True, timeout=timeout).stdout
+    except subprocess.TimeoutExpired:
+        return None
+    if len(data) < 12:
+        return None
+    width, height, pixel_format = struct.unpack_from("<3I", data)
+    pixels = width * height * 4
+    for offset in (16, 12):
+        if len(data) - offset == pixels:
+            return RawScreen(width, height, pixel_format, offset, data)
+    return None
+
+
+def screencap_header_size(serial: str) -> int:
+    """Bytes of ``screencap`` header before the pixels (16 from Android 9 on, else 12)."""
+    return 16 if _api_level(serial) >= 28 else 12
+
+
+def screencap_stream(serial: str) -> subprocess.Popen:
+    """Start a device-side ``screencap`` loop whose raw frames share one exec-out pipe.
+
+    Saves the adb process start per frame; read the frames back with
+    :func:`read_raw_frame` and ``terminate()`` the process when done. The loop
+    ends with the first failed ``screencap`` (a broken pipe once the host side
+    is gone), so it cannot spin on the device if adbd leaves the shell running.
+    """
+    cmd = ["adb", "-s", serial, "exec-out", "while screencap; do :; done"]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+def _read_exact(pipe, size: int) -> bytes | None:
+    chunks, left = [], size
+    while left:
+        chunk = pipe.read(left)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        left -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_raw_frame(pipe, header_size: int) -> RawScreen | None:
+    """Read the next frame of a :func:`screencap_stream` pipe, or None at end of stream."""
+    header = _read_exact(pipe, header_size)
+    if header is None:
+        return None
+    width, height, pixel_format = struct.unpack_from("<3I", header)
+    pixels = _read_exact(pipe, width * height * 4)
+    if pixels is None:
+        return None
+    return RawScreen(width, height, pixel_format, 0, pixels)
+
+
 def logcat(serial: str, grep: str, clear: bool = False) -> str:
     """Dump the (optionally pre-cleared) device log, keeping only lines matching ``grep``."""
     if clear:
@@ -633,6 +1016,134 @@ def logcat(serial: str, grep: str, clear: bool = False) -> str:
     return "\n".join(l for l in out.splitlines() if grep in l)
 
 
+def logcat_epoch(serial: str, grep: str) -> list[tuple[float, str]]:
+    """(device epoch seconds, line) of the log lines containing ``grep``, oldest first."""
+    out = _adb(serial, ["logcat", "-d", "-v", "epoch"], timeout=60)
+    lines = []
+    for line in out.splitlines():
+        if grep in line:
+            try:
+                lines.append((float(line.split(None, 1)[0]), line))
+            except (ValueError, IndexError):
+                pass
+    return lines
+
+
+def logcat_window(serial: str, seconds: float) -> str:
+    """The whole device log of the last ``seconds`` (``logcat -t`` from the device clock)."""
+    since = f'"$(( $(date +%s) - {int(seconds)} )).0"'
+    return _adb(serial, ["shell", f"logcat -d -v threadtime -t {since}"], timeout=60)
+
+
+# --- Flight recorder (see framework/flight.py) -------------------------------
+
+FLIGHT_DIR = "/data/local/tmp/flight"
+
+
+def flight_start(serial: str, segment_s: int, keep: int, bit_rate: int = 4_000_000) -> None:
+    """Start a detached device-side loop of ``screenrecord`` segments, keeping the last ``keep``.
+
+    Each segment is ``segment_s`` seconds; the segment ``keep`` back is deleted
+    as each one completes, so at most ``keep`` finished segments (plus the one
+    recording) sit in :data:`FLIGHT_DIR`. The loop's pid is kept there for
+    :func:`flight_stop`.
+    """
+    loop = (f"echo $$ > {FLIGHT_DIR}/pid; i=0; while true; do "
+            f"screenrecord --bit-rate {bit_rate} --time-limit {segment_s} "
+            f"{FLIGHT_DIR}/seg_$(printf %05d $i).mp4; "
+            f"rm -f {FLIGHT_DIR}/seg_$(printf %05d $((i - {keep}))).mp4; i=$((i + 1)); done")
+    _adb(serial, ["shell", f"rm -rf {FLIGHT_DIR}; mkdir -p {FLIGHT_DIR}; "
+                           f"nohup sh -c '{loop}' > /dev/null 2>&1 &"])
+
+
+def flight_stop(serial: str) -> None:
+    """Stop the loop, then interrupt the running segment so its mp4 is finalised."""
+    _adb(serial, ["shell", f"kill $(cat {FLIGHT_DIR}/pid) 2>/dev/null; "
+                           "kill -INT $(pidof screenrecord) 2>/dev/null"])
+    time.sleep(1.0)   # screenrecord writes the mp4 index on exit
+
+
+def flight_pull(serial: str, dest_dir: str) -> list[str]:
+    """Copy the recorded segments (oldest first) into ``dest_dir``; return the local paths."""
+    names = sorted(n.strip() for n in _adb(serial, ["shell", f"ls {FLIGHT_DIR}"]).split() if n.endswith(".mp4"))
+    os.makedirs(dest_dir, exist_ok=True)
+    paths = []
+    for name in names:
+        local = os.path.join(dest_dir, name)
+        _adb(serial, ["pull", f"{FLIGHT_DIR}/{name}", local], timeout=120)
+        if os.path.exists(local):
+            paths.append(local)
+    return paths
+
+
+def flight_clear(serial: str) -> None:
+    _adb(serial, ["shell", f"rm -rf {FLIGHT_DIR}"])
+
+
+# --- System tracing (see framework/trace.py) --------------------------------
+# "atrace" keeps an in-kernel ring buffer and dumps it as ftrace text, which the
+# host parses; "perfetto" (Android 9+) writes a protobuf trace for the Perfetto
+# UI / trace_processor. Both record the atrace categories plus the app's own
+# Trace.beginSection slices (-a <package>).
+
+TRACE_MODES = ("atrace", "perfetto")
+TRACE_CATEGORIES = ("gfx", "input", "view", "wm", "am", "dalvik", "sched")
+TRACE_BUFFER_KB = 16384
+PERFETTO_TRACE = "/data/misc/perfetto-traces/fulguris-test.pftrace"
+PERFETTO_PID = "/data/local/tmp/fulguris-perfetto.pid"
+
+
+def trace_mode(serial: str, wanted: str = "atrace") -> str:
+    """``wanted``, except that perfetto falls back to atrace before Android 9 (API 28)."""
+    return "perfetto" if wanted == "perfetto" and _api_level(serial) >= 28 else "atrace"
+
+
+def trace_start(serial: str, package: str, mode: str = "atrace",
+                categories: tuple[str, ...] = TRACE_CATEGORIES, buffer_kb: int = TRACE_BUFFER_KB) -> None:
+    cats = " ".join(shlex.quote(c) for c in categories)
+    pkg = shlex.quote(package)
+    if mode == "perfetto":
+        # --background prints the daemon's pid; -t is only an upper bound, trace_stop ends it.
+        _adb(serial, ["shell", f"rm -f {PERFETTO_TRACE}; perfetto --background -o {PERFETTO_TRACE} "
+                               f"-t 600s -b {buffer_kb // 1024}mb -a {pkg} {cats} > {PERFETTO_PID}"])
+    else:
+        _adb(serial, ["shell", f"atrace --async_start -c -b {buffer_kb} -a {pkg} {cats}"])
+
+
+def trace_stop(serial: str, mode: str, dest: str) -> str | None:
+    """End the capture and write it to ``dest`` (text for atrace, protobuf for perfetto).
+
+    Returns ``dest``, or None when nothing was captured.
+    """
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    if mode == "perfetto":
+        _adb(serial, ["shell", f"kill -TERM $(cat {PERFETTO_PID}) 2>/dev/null; "
+                               f"while kill -0 $(cat {PERFETTO_PID}) 2>/dev/null; do sleep 0.2; done"], timeout=60)
+        _adb(serial, ["pull", PERFETTO_TRACE, dest], timeout=120)
+        _adb(serial, ["shell", f"rm -f {PERFETTO_TRACE} {PERFETTO_PID}"])
+    else:
+        result = subprocess.run(["adb", "-s", serial, "exec-out", "atrace --async_stop"],
+                                capture_output=True, timeout=120)
+        if not result.stdout.strip():
+            return None
+        with open(dest, "wb") as fh:
+            fh.write(result.stdout)
+    return dest if os.path.exists(dest) and os.path.getsize(dest) else None
+
+
+def trace_cancel(serial: str, mode: str) -> None:
+    """End a capture and drop it (a run that stopped before its test finished)."""
+    if mode == "perfetto":
+        _adb(serial, ["shell", f"kill -TERM $(cat {PERFETTO_PID}) 2>/dev/null; "
+                               f"rm -f {PERFETTO_TRACE} {PERFETTO_PID}"])
+    else:
+        _adb(serial, ["shell", "atrace --async_stop > /dev/null"], timeout=60)
+
+
+def app_pids(serial: str, package: str) -> list[int]:
+    return [int(p) for p in _adb(serial, ["shell", f"pidof {shlex.quote(package)}"]).split() if p.isdigit()]
+
+
 def ssl_icon_visible(serial: str) -> bool:
     """True if the SSL status icon in the address bar is currently visible (not GONE).
 
@@ -841,3 +1352,161 @@ def reload_button_center(serial: str) -> tuple[int, int] | None:
     w = x2 - x1
     return x1 - w // 2, (y1 + y2) // 2
 
+
+
+# --- Memory sampling -------------------------------------------------------
+# `dumpsys meminfo <package>` ends with an "App Summary" block (kB). The summary
+# lines carry a colon ("Java Heap:"), which keeps them apart from the detailed
+# table rows of the same name above it. Pre-Android 11 prints "TOTAL:" where
+# newer versions print "TOTAL PSS:".
+_MEMINFO_FIELDS = {
+    "java_heap_kb": r"Java Heap:\s+(\d+)",
+    "native_heap_kb": r"Native Heap:\s+(\d+)",
+    "code_kb": r"Code:\s+(\d+)",
+    "graphics_kb": r"Graphics:\s+(\d+)",
+    "pss_kb": r"TOTAL(?: PSS)?:\s+(\d+)",
+    "webviews": r"WebViews:\s+(\d+)",
+}
+
+
+def parse_meminfo(out: str) -> dict[str, int]:
+    """Parse the App Summary (plus the WebViews object count) of a meminfo dump.
+
+    Returns an empty dict when the process was not running ("No process found").
+    """
+    result: dict[str, int] = {}
+    for name, pattern in _MEMINFO_FIELDS.items():
+        m = re.search(pattern, out)
+        if m:
+            result[name] = int(m.group(1))
+    return result
+
+
+def meminfo(serial: str, package: str) -> dict[str, int]:
+    """PSS / Java heap / native heap / graphics (kB) and the live WebView count of the app."""
+    return parse_meminfo(_adb(serial, ["shell", "dumpsys", "meminfo", package], timeout=60))
+
+
+def webview_pss(serial: str) -> int:
+    """Total PSS (kB) of the WebView renderer processes, 0 if none.
+
+    Chromium renders in isolated ``…:sandboxed_process<N>`` processes that
+    ``dumpsys meminfo <package>`` does not include, so this reads the system-wide
+    "Total PSS by process" table instead (a few seconds on the RPi). Renderers of
+    other WebView apps are counted too — keep the device otherwise idle.
+    """
+    out = _adb(serial, ["shell", "dumpsys", "meminfo"], timeout=120)
+    section = out.split("Total PSS by process:", 1)[-1].split("\n\n", 1)[0] if "Total PSS by process:" in out else ""
+    return sum(
+        int(m.group(1).replace(",", ""))
+        for m in re.finditer(r"([\d,]+)K: (\S+) \(pid", section)
+        if "sandboxed_process" in m.group(2)
+    )
+
+
+# `dumpsys meminfo --checkin <package>` prints one CSV line per process:
+# version, pid, name, then (native, dalvik, other, total) for max heap, allocated
+# heap, free heap and PSS, in kB, followed by more blocks we do not use.
+_CHECKIN_FIELDS = {"native_heap_kb": 7, "java_heap_kb": 8, "native_pss_kb": 15, "java_pss_kb": 16, "pss_kb": 18}
+
+
+def parse_meminfo_checkin(out: str, package: str) -> dict[str, int]:
+    """Allocated native / Java heap and PSS (kB) of ``package``'s main process, {} if absent."""
+    for line in out.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) > 18 and parts[0].isdigit() and parts[2] == package:
+            try:
+                return {"pid": int(parts[1]), **{k: int(parts[i]) for k, i in _CHECKIN_FIELDS.items()}}
+            except ValueError:
+                return {}
+    return {}
+
+
+def meminfo_checkin(serial: str, package: str) -> dict[str, int]:
+    """The app's heap and PSS figures from the compact ``--checkin`` meminfo format."""
+    return parse_meminfo_checkin(
+        _adb(serial, ["shell", "dumpsys", "meminfo", "--checkin", package], timeout=60), package)
+
+
+def trim_memory(serial: str, package: str, level: str = "COMPLETE") -> None:
+    """Ask the app to release memory and collect garbage before a measurement.
+
+    ``am send-trim-memory`` delivers onTrimMemory(level) (caches are dropped);
+    SIGUSR1 makes ART run a full GC, which a debuggable app accepts via run-as.
+    """
+    pkg = shlex.quote(package)
+    _adb(serial, ["shell", f"am send-trim-memory {pkg} {level};"
+                           f" for p in $(pidof {pkg}); do run-as {pkg} kill -USR1 $p; done"], timeout=30)
+
+
+# One /proc read of the app's processes (plus, optionally, its meminfo) per
+# shell round trip: the sampler (framework/sampler.py) polls this every second
+# or so, and a separate adb call per file would cost more than the reads.
+# utime/stime in /proc/<pid>/stat are in clock ticks; Android's USER_HZ is 100.
+CLOCK_TICKS = 100
+_STATUS_FIELDS = {"VmRSS": "rss_kb", "VmHWM": "hwm_kb", "Threads": "threads"}
+
+
+def _proc_script(package: str, with_meminfo: bool) -> str:
+    pkg = shlex.quote(package)
+    script = (f"for p in $(pidof {pkg}); do echo \"@pid $p\"; cat /proc/$p/stat;"
+              " grep -E '^(VmRSS|VmHWM|Threads):' /proc/$p/status; done; echo @uptime; cat /proc/uptime")
+    if with_meminfo:
+        script += f"; echo @meminfo; dumpsys meminfo {pkg}"
+    return script
+
+
+def parse_proc_sample(out: str) -> dict:
+    """Parse the output of :func:`proc_sample`'s script into summed figures.
+
+    Returns ``{"uptime_s", "pids", "cpu_s", "rss_kb", "hwm_kb", "threads"}`` plus
+    the :func:`parse_meminfo` fields when meminfo was read. No running process
+    gives ``pids == []`` and zeros.
+    """
+    sample = {"uptime_s": None, "pids": [], "cpu_s": 0.0, "rss_kb": 0, "hwm_kb": 0, "threads": 0}
+    head, _, mem = out.partition("@meminfo")
+    section = ""
+    for line in head.splitlines():
+        line = line.strip()
+        if line.startswith("@"):
+            section = line
+            if line.startswith("@pid "):
+                sample["pids"].append(int(line[5:]))
+        elif section == "@uptime" and line:
+            sample["uptime_s"] = float(line.split()[0])
+        elif section.startswith("@pid") and ") " in line:
+            # pid (comm) state ppid ... : utime and stime are fields 14 and 15.
+            fields = line.rsplit(") ", 1)[1].split()
+            sample["cpu_s"] += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        elif section.startswith("@pid") and ":" in line:
+            name, _, value = line.partition(":")
+            if name in _STATUS_FIELDS:
+                sample[_STATUS_FIELDS[name]] += int(value.split()[0])
+    sample["cpu_s"] = round(sample["cpu_s"], 2)
+    if mem:
+        sample.update(parse_meminfo(mem))
+    return sample
+
+
+def proc_sample(serial: str, package: str, with_meminfo: bool = False) -> dict:
+    """CPU seconds, RSS / peak RSS, thread count (and meminfo) of the app, in one round trip."""
+    return parse_proc_sample(_adb(serial, ["shell", _proc_script(package, with_meminfo)],
+                                  timeout=60 if with_meminfo else 15))
+
+
+# --- Frame timing ----------------------------------------------------------
+
+
+def gfxinfo_reset(serial: str, package: str) -> None:
+    """Clear the app's frame statistics so the next read covers only what follows."""
+    _adb(serial, ["shell", "dumpsys", "gfxinfo", package, "reset"])
+
+
+def gfxinfo_framestats(serial: str, package: str) -> str:
+    """Raw ``dumpsys gfxinfo <package> framestats`` output (summary + per-frame CSV).
+
+    The renderer keeps only the most recent ~120 frames in the CSV part; the
+    "Total frames rendered" / "Janky frames" summary counts everything since the
+    last :func:`gfxinfo_reset`.
+    """
+    return _adb(serial, ["shell", "dumpsys", "gfxinfo", package, "framestats"], timeout=60)
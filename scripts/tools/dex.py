@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""String tables of the dex files in an APK, for checking which build is which.
+
+Every string constant the app uses (log messages, keys, class and method names)
+is listed once in the ``string_ids`` section of a dex file. Reading those
+tables gives an exact, sorted index of an APK's strings, so checking for a
+marker is a binary search instead of a scan of every dex blob, and a marker
+cannot "match" the middle of some unrelated string:
+
+    index = dex.load(apk)
+    "ASSIST branch entered" in index          # exact string
+    index.prefix("handleAssistLongPress ")    # strings starting with it
+    added, removed = index.diff(dex.load(old_apk))
+
+Indexes are cached on disk by the APK's SHA-256, so an APK is only parsed once.
+Kotlin string templates compile to their literal pieces (``"rep=$n"`` is the
+constant ``rep=``), which is why marker checks use :meth:`StringIndex.find`
+(exact, else prefix). A piece from the middle of a template (``" en="`` in
+``"... act=$a en=$b"``) is neither: pass ``fragment=True`` to also accept it
+inside a string, a linear scan that only runs when the fast lookups miss.
+
+Command line:
+
+    python scripts/tools/dex.py strings APP.apk [--prefix TEXT | --contains TEXT]
+    python scripts/tools/dex.py diff OLD.apk NEW.apk
+
+Pure standard library.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import zipfile
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "fulguris-dex-strings")
+CACHE_FORMAT = 2   # bumped when the parsed strings change (2: surrogate pairs joined)
+
+# header_item: magic[8] checksum signature[20] file_size header_size endian_tag
+# link_size link_off map_off string_ids_size string_ids_off ...
+_STRING_IDS = struct.Struct("<II")
+_STRING_IDS_AT = 56
+
+
+def _uleb128(data: bytes, pos: int) -> int:
+    """Position just past the ULEB128 value at ``pos`` (we only need to skip it)."""
+    while data[pos] & 0x80:
+        pos += 1
+    return pos + 1
+
+
+def _mutf8(raw: bytes) -> str:
+    # Modified UTF-8: NUL is C0 80 and supplementary characters are surrogate pairs,
+    # each half encoded on its own; the UTF-16 round trip joins the pairs, so a
+    # fresh index holds the same strings as one read back from the JSON cache.
+    text = raw.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+    return text.encode("utf-16", "surrogatepass").decode("utf-16", "surrogatepass")
+
+
+def dex_strings(data: bytes) -> list[str]:
+    """Every string in one dex file's ``string_ids`` section, in table order (sorted)."""
+    if data[:4] != b"dex\n":
+        raise ValueError("not a dex file")
+    size, offset = _STRING_IDS.unpack_from(data, _STRING_IDS_AT)
+    out = []
+    for (at,) in struct.iter_unpack("<I", data[offset:offset + 4 * size]):
+        start = _uleb128(data, at)
+        end = data.index(b"\0", start)
+        try:
+            out.append(_mutf8(data[start:end]))
+        except UnicodeDecodeError:
+            out.append(data[start:end].decode("utf-8", "replace"))
+    return out
+
+
+class StringIndex:
+    """Sorted, de-duplicated strings of an APK with exact and prefix lookups."""
+
+    def __init__(self, strings):
+        self.strings = sorted(set(strings))
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __contains__(self, text: str) -> bool:
+        i = bisect.bisect_left(self.strings, text)
+        return i < len(self.strings) and self.strings[i] == text
+
+    def prefix(self, text: str) -> list[str]:
+        """Every string starting with ``text`` (``text`` itself included)."""
+        i = bisect.bisect_left(self.strings, text)
+        j = i
+        while j < len(self.strings) and self.strings[j].startswith(text):
+            j += 1
+        return self.strings[i:j]
+
+    def containing(self, text: str) -> list[str]:
+        """Every string with ``text`` anywhere in it (a linear scan)."""
+        return [s for s in self.strings if text in s]
+
+    def find(self, marker: str, fragment: bool = False) -> str | None:
+        """How ``marker`` occurs: "exact", "prefix" (some string starts with it),
+        with ``fragment`` "substring" (some string contains it), or None."""
+        if marker in self:
+            return "exact"
+        if self.prefix(marker):
+            return "prefix"
+        if fragment and any(marker in s for s in self.strings):
+            return "substring"
+        return None
+
+    def diff(self, older: StringIndex) -> tuple[list[str], list[str]]:
+        """(added, removed): strings in this index but not ``older``, and vice versa."""
+        mine, theirs = set(self.strings), set(older.strings)
+        return sorted(mine - theirs), sorted(theirs - mine)
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load(apk: str, cache_dir: str = CACHE_DIR) -> StringIndex:
+    """The string index of every ``classes*.dex`` in ``apk``, cached by the APK's SHA-256."""
+    path = os.path.join(cache_dir, f"{_sha256(apk)}.v{CACHE_FORMAT}.json.gz")
+    if os.path.exists(path):
+        with gzip.open(path, "rt", encoding="utf-8", errors="surrogatepass") as fh:
+            index = StringIndex([])
+            index.strings = json.load(fh)   # stored already sorted
+            return index
+    strings: set[str] = set()
+    with zipfile.ZipFile(apk) as z:
+        for name in z.namelist():
+            if name.startswith("classes") and name.endswith(".dex"):
+                strings.update(dex_strings(z.read(name)))
+    index = StringIndex(strings)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8", errors="surrogatepass") as fh:
+        json.dump(index.strings, fh)
+    os.replace(tmp, path)
+    return index
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("strings", help="List an APK's dex strings")
+    p.add_argument("apk")
+    p.add_argument("--prefix", default="", help="Only strings starting with this")
+    p.add_argument("--contains", help="Only strings containing this (overrides --prefix)")
+    p = sub.add_parser("diff", help="Strings added / removed between two APKs")
+    p.add_argument("old")
+    p.add_argument("new")
+    args = parser.parse_args()
+
+    if args.command == "strings":
+        index = load(args.apk)
+        for s in index.containing(args.contains) if args.contains else index.prefix(args.prefix):
+            print(repr(s)[1:-1])
+        return 0
+    added, removed = load(args.new).diff(load(args.old))
+    for s in removed:
+        print(f"- {repr(s)[1:-1]}")
+    for s in added:
+        print(f"+ {repr(s)[1:-1]}")
+    print(f"{len(added)} added, {len(removed)} removed", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
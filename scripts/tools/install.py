@@ -5,19 +5,63 @@
     python scripts/tools/install.py --all
     python scripts/tools/install.py --device SERIAL
     python scripts/tools/install.py --build         # build first, then install
+    python scripts/tools/install.py --force         # install even if the device has this exact build
+    python scripts/tools/install.py --all --mode push   # force the legacy copy-then-install
+
+Devices are installed concurrently, one thread each, with a line per step
+prefixed by the device. Each device first gets a pre-flight check (API level
+against the app's minSdk, free space on /data), then the fastest install it
+supports: incremental on API 30+ when the build has a v4 signature (the app is
+launchable before the whole APK has landed), streamed on API 28+, else pushed.
+The summary reports time-to-installed per device.
+
+A device whose installed APK has the same SHA-256 as the local build (hashed on
+the device, no pull) is skipped.
 """
 from __future__ import annotations
 
 import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import adb
 
+_print_lock = threading.Lock()
+
+
+def _say(label: str, text: str) -> None:
+    with _print_lock:
+        print(f"[{label}] {text}", flush=True)
+
+
+def install_one(serial: str, apk: str, force: bool, mode: str | None) -> tuple[str, str, float]:
+    """Install on one device; return (label, outcome, seconds) with outcome OK/SKIP/FAIL."""
+    t0 = time.monotonic()
+    label = adb.device_label(serial)
+    if not force and adb.apk_up_to_date(serial, apk):
+        _say(label, "identical build already installed")
+        return label, "SKIP", time.monotonic() - t0
+    problem = adb.install_preflight(serial, apk)
+    if problem:
+        _say(label, f"not installing: {problem}")
+        return label, "FAIL", time.monotonic() - t0
+    mode = mode or adb.install_mode(serial, apk)
+    _say(label, f"installing ({mode}) ...")
+    success = adb.install_apk(serial, apk, force=True, mode=mode)
+    elapsed = time.monotonic() - t0
+    _say(label, f"{'installed' if success else 'install FAILED'} after {elapsed:.1f}s")
+    return label, "OK" if success else "FAIL", elapsed
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument("--device", help="Target a specific adb device serial")
     parser.add_argument("--all", action="store_true", help="Install on all connected devices")
     parser.add_argument("--build", action="store_true", help="Build before installing")
+    parser.add_argument("--force", action="store_true", help="Install even when the device already has this build")
+    parser.add_argument("--mode", choices=adb.INSTALL_MODES, help="Install mode (default: fastest each device supports)")
     args = parser.parse_args()
 
     if args.build:
@@ -31,12 +75,17 @@ def main() -> int:
         print("No APK found; run build first.")
         return 2
 
-    ok = True
-    for serial in adb.resolve_devices(args.device, args.all):
-        success = adb.install_apk(serial, apk)
-        print(f"{'OK  ' if success else 'FAIL'} {adb.device_label(serial)}")
-        ok = ok and success
-    return 0 if ok else 1
+    serials = adb.resolve_devices(args.device, args.all)
+    print(f"APK sha256 {adb.apk_sha256(apk)[:12]}  ({os.path.basename(apk)}, "
+          f"{os.path.getsize(apk) / 1e6:.1f} MB) -> {len(serials)} device(s)")
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(serials)) as pool:
+        outcomes = list(pool.map(lambda s: install_one(s, apk, args.force, args.mode), serials))
+    print()
+    for label, outcome, elapsed in outcomes:
+        print(f"{outcome:<4} {label}  ({elapsed:.1f}s)")
+    print(f"All done in {time.monotonic() - t0:.1f}s")
+    return 0 if all(outcome != "FAIL" for _, outcome, _ in outcomes) else 1
 
 
 if __name__ == "__main__":
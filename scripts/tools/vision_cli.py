@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Offline vision tools over saved captures (framework.vision / framework.batch).
+
+``batch`` runs one analyser over every image in the given files/directories,
+one process per core, and writes one row per image:
+
+    python scripts/tools/vision_cli.py batch scripts/tests/out --analyser cursor --out cursor.csv
+    python scripts/tools/vision_cli.py batch captures/ --analyser blobs --set thresh=230 --set min_area=100 --out blobs.npz
+    python scripts/tools/vision_cli.py batch captures/ --analyser diff --set baseline=ref.png --out diff.csv
+    python scripts/tools/vision_cli.py batch captures/ --analyser mymodule:analyse --workers 4 --out rows.csv
+
+Analysers: ``cursor`` (template-match tip + blob-filter tip; options density,
+step, min_score), ``blobs`` (white-blob counts and the largest blob; thresh,
+min_area, step) and ``diff`` (tile SSIM against baseline=<image>; tile,
+min_ssim), or any ``module:function`` taking (path, **options) and returning a
+dict. ``--out`` ending in .npz writes NumPy arrays per column, else CSV; without
+``--out`` the rows are printed.
+
+Requires NumPy and Pillow.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from framework import batch  # noqa: E402
+
+
+def _option(text: str) -> tuple[str, object]:
+    """``key=value``, with the value parsed as a Python literal when it is one."""
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected key=value, got '{text}'")
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+def cmd_batch(args) -> int:
+    paths = batch.collect(args.paths)
+    if not paths:
+        print("No images found.")
+        return 1
+    t0 = time.monotonic()
+    rows = batch.run(args.analyser, paths, dict(args.set), args.workers)
+    elapsed = time.monotonic() - t0
+    errors = sum(1 for r in rows if "error" in r)
+    if args.out:
+        (batch.write_npz if args.out.endswith(".npz") else batch.write_csv)(rows, args.out)
+        print(f"Saved {len(rows)} row(s) -> {args.out}")
+    else:
+        names = batch.columns(rows)
+        print("\t".join(names))
+        for row in rows:
+            print("\t".join("" if row.get(n) is None else str(row[n]) for n in names))
+    print(f"{len(rows)} image(s) in {elapsed:.1f}s ({errors} error(s)) with '{args.analyser}'")
+    return 1 if errors else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("batch", help="Run an analyser over many captures in parallel")
+    p.add_argument("paths", nargs="+", help="Image files and/or directories (searched recursively)")
+    p.add_argument("--analyser", default="cursor",
+                   help=f"One of {', '.join(batch.ANALYSERS)}, or module:function")
+    p.add_argument("--set", action="append", type=_option, default=[], metavar="KEY=VALUE",
+                   help="Analyser option (repeatable), e.g. --set thresh=230")
+    p.add_argument("--workers", type=int, help="Worker processes (default: one per core; 1 = in-process)")
+    p.add_argument("--out", help="Output .csv or .npz (default: print the rows)")
+    p.set_defaults(func=cmd_batch)
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())